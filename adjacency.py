@@ -0,0 +1,312 @@
+from array import array
+from bisect import bisect_right
+from collections import Counter
+from operator import eq
+from math import radians, sin, cos, sqrt, atan2, asin, isnan
+
+EARTH_RADIUS = 6371  # km
+DEFAULT_METRIC = "great_circle"
+BASE_METRICS = ("great_circle", "file")  # calculadas al construir la adyacencia
+
+
+class CSR:
+    # Grafo CSR mínimo (p. ej. el grafo invertido) con una sola columna de pesos
+    def __init__(self, node_count, offsets, targets, weights):
+        self.node_count = node_count
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+
+
+class Adjacency:
+    # Grafo compacto en formato CSR (compressed sparse row): los vecinos del nodo i
+    # son targets[offsets[i]:offsets[i + 1]] y sus costes weights[...] en las mismas posiciones
+    def __init__(self, latitudes, longitudes, sources, destinations, distances=None, unique=False):
+        self._set_coordinates(latitudes, longitudes)
+
+        if distances is None:
+            distances = [float('nan')] * len(sources)
+
+        # Aristas únicas (se ignoran las repetidas, como hacía add_neighbor); la primera aparición
+        # de cada par conserva su distancia. Con unique las aristas ya vienen deduplicadas y sin
+        # lazos (las de AirSpace)
+        pairs = None if unique else list(zip(sources, destinations))
+        if pairs is not None and (len(set(pairs)) < len(pairs) or any(map(eq, sources, destinations))):
+            first = {}
+            for k, (u, v) in enumerate(pairs):
+                if u != v and (u, v) not in first:
+                    first[(u, v)] = k
+            keep = list(first.values())
+            sources = [sources[k] for k in keep]
+            destinations = [destinations[k] for k in keep]
+            distances = [distances[k] for k in keep]
+
+        # Orden estable por origen: dentro de cada nodo se mantiene el orden de inserción
+        order = sorted(range(len(sources)), key=sources.__getitem__)
+        counts = Counter(sources)
+        offsets = [0] * (self.node_count + 1)
+        for i in range(self.node_count):
+            offsets[i + 1] = offsets[i] + counts.get(i, 0)
+        self.offsets = array('l', offsets)
+        self.targets = array('l', map(destinations.__getitem__, order))
+        file_weights = array('d', map(distances.__getitem__, order))
+
+        # Pesos precalculados una sola vez por métrica: distancia ortodrómica o la del fichero
+        # de segmentos (si una arista no trae distancia se usa la ortodrómica)
+        great_circle = self._great_circle_weights()
+        if any(map(isnan, file_weights)):
+            for k, distance in enumerate(file_weights):
+                if isnan(distance):
+                    file_weights[k] = great_circle[k]
+        self.metrics = {"great_circle": great_circle, "file": file_weights}
+        self.weights = great_circle
+        self._reverse = {}
+        self._symmetric = {}
+        self._incoming = None
+        self.closed = None  # bytearray por arista: 1 si está cerrada (ver close_edges)
+        self._masked = {}  # métrica -> pesos con inf en las aristas cerradas
+
+        # Factor que mantiene admisible la heurística ortodrómica con cada métrica
+        self.heuristic_scales = {name: self._heuristic_scale(weights, great_circle)
+                                 for name, weights in self.metrics.items()}
+
+    @classmethod
+    def from_arrays(cls, latitudes, longitudes, offsets, targets, metrics, heuristic_scales, trig=None):
+        # Adyacencia ya construida (p. ej. leída de un snapshot): sin ordenar ni recalcular pesos.
+        # Con trig = (lat_rad, lon_rad, cos_lat) tampoco se copian las coordenadas, así que
+        # sirve sobre memoryviews de un fichero mapeado
+        adjacency = cls.__new__(cls)
+        if trig is None:
+            adjacency._set_coordinates(latitudes, longitudes)
+        else:
+            adjacency.node_count = len(latitudes)
+            adjacency.latitudes, adjacency.longitudes = latitudes, longitudes
+            adjacency.lat_rad, adjacency.lon_rad, adjacency.cos_lat = trig
+        adjacency.offsets = offsets
+        adjacency.targets = targets
+        adjacency.metrics = dict(metrics)
+        adjacency.weights = adjacency.metrics[DEFAULT_METRIC]
+        adjacency._reverse = {}
+        adjacency._symmetric = {}
+        adjacency._incoming = None
+        adjacency.closed = None
+        adjacency._masked = {}
+        adjacency.heuristic_scales = dict(heuristic_scales)
+        return adjacency
+
+    def _set_coordinates(self, latitudes, longitudes):
+        self.node_count = len(latitudes)
+        self.latitudes = array('d', latitudes)
+        self.longitudes = array('d', longitudes)
+
+        # Trigonometría cacheada por nodo para los pesos y la heurística
+        self.lat_rad = array('d', map(radians, self.latitudes))
+        self.lon_rad = array('d', map(radians, self.longitudes))
+        self.cos_lat = array('d', map(cos, self.lat_rad))
+
+    def _great_circle_weights(self):
+        # Haversine de todas las aristas con las variables locales (mismo cálculo que great_circle)
+        lat_rad, lon_rad, cos_lat = self.lat_rad, self.lon_rad, self.cos_lat
+        offsets, targets = self.offsets, self.targets
+        weights = array('d', [0.0]) * len(targets)
+        for u in range(self.node_count):
+            lat_u, lon_u, cos_u = lat_rad[u], lon_rad[u], cos_lat[u]
+            for k in range(offsets[u], offsets[u + 1]):
+                v = targets[k]
+                a = sin((lat_rad[v] - lat_u) / 2) ** 2 + cos_u * cos_lat[v] * sin((lon_rad[v] - lon_u) / 2) ** 2
+                weights[k] = EARTH_RADIUS * 2 * atan2(sqrt(a), sqrt(1 - a))
+        return weights
+
+    def _heuristic_scale(self, weights, great_circle):
+        if weights is great_circle:
+            return 1.0
+        scale = min((w / g for w, g in zip(weights, great_circle) if g > 0), default=1.0)
+        return max(min(scale, 1.0), 0.0)
+
+    def metric_weights(self, metric=None):
+        # Pesos de la métrica con las aristas cerradas a inf (las columnas de metrics no cambian)
+        if metric is None:
+            return self.weights
+        if metric not in self.metrics:
+            raise ValueError(f"Unknown metric: {metric}")
+        return self._masked.get(metric, self.metrics[metric])
+
+    def add_metric(self, name, weights):
+        # Columna de pesos con nombre sobre la misma topología (un valor por arista, en el orden
+        # de targets). Si ya existe se sustituye; las dos métricas de base no se pueden cambiar
+        if name in BASE_METRICS:
+            raise ValueError(f"Metric {name} cannot be replaced")
+        weights = array('d', weights)
+        if len(weights) != len(self.targets):
+            raise ValueError(f"Metric {name} has {len(weights)} weights for {len(self.targets)} edges")
+        if any(isnan(w) or w < 0 for w in weights):
+            raise ValueError(f"Metric {name} has negative or NaN weights")
+        self.metrics[name] = weights
+        # Sin el tope de 1 de las métricas de base: tiempos o tasas no son kilómetros y la cota
+        # min(w / ortodrómica) sigue siendo inferior con cualquier escala
+        scale = min((w / g for w, g in zip(weights, self.metrics[DEFAULT_METRIC]) if g > 0), default=0.0)
+        self.heuristic_scales[name] = scale if scale != float('inf') else 0.0
+        if self.closed is not None and any(self.closed):
+            self._masked[name] = array('d', (float('inf') if closed else w
+                                             for w, closed in zip(weights, self.closed)))
+        self._reverse.pop(name, None)
+        self._symmetric.pop(name, None)
+
+    def remove_metric(self, name):
+        if name in BASE_METRICS:
+            raise ValueError(f"Metric {name} cannot be removed")
+        for table in (self.metrics, self.heuristic_scales, self._masked, self._reverse, self._symmetric):
+            table.pop(name, None)
+
+    def close_edges(self, pairs, closed=True):
+        # Cierra (o reabre) las aristas (u, v) sin tocar la topología: su peso pasa a ser inf y
+        # ninguna búsqueda las relaja. Las columnas enmascaradas se copian en cada cambio, así
+        # quien guardó las anteriores sigue viendo los pesos con los que calculó. Devuelve los
+        # índices de las aristas que cambiaron
+        if self.closed is None:
+            self.closed = bytearray(len(self.targets))
+        changed = []
+        for u, v in pairs:
+            k = self.edge_index(u, v)
+            if k is not None and self.closed[k] != closed:
+                self.closed[k] = closed
+                changed.append(k)
+        if not changed:
+            return changed
+        masked = {}
+        if any(self.closed):
+            for metric, weights in self.metrics.items():
+                values = array('d', self._masked.get(metric, weights))
+                for k in changed:
+                    values[k] = float('inf') if closed else weights[k]
+                masked[metric] = values
+        self._masked = masked
+        self.weights = self.metric_weights(DEFAULT_METRIC)
+        self._reverse = {}
+        self._symmetric = {}
+        return changed
+
+    def neighbors(self, node):
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def edge_index(self, u, v):
+        # Posición de la arista u -> v en targets (y en las columnas de pesos), o None
+        for k in range(self.offsets[u], self.offsets[u + 1]):
+            if self.targets[k] == v:
+                return k
+        return None
+
+    def weight(self, u, v, metric=None):
+        k = self.edge_index(u, v)
+        return None if k is None else self.metric_weights(metric)[k]
+
+    def reverse(self, metric=None):
+        # Grafo con todas las aristas invertidas (v -> u) y los pesos de la métrica
+        if metric in self._reverse:
+            return self._reverse[metric]
+        weights = self.metric_weights(metric)
+        counts = [0] * (self.node_count + 1)
+        for v in self.targets:
+            counts[v + 1] += 1
+        for i in range(self.node_count):
+            counts[i + 1] += counts[i]
+        position = counts[:-1]
+        targets = array('l', [0]) * len(self.targets)
+        reverse_weights = array('d', [0.0]) * len(self.targets)
+        for k, (u, v) in enumerate(self.edges()):
+            targets[position[v]] = u
+            reverse_weights[position[v]] = weights[k]
+            position[v] += 1
+        self._reverse[metric] = CSR(self.node_count, array('l', counts), targets, reverse_weights)
+        return self._reverse[metric]
+
+    def is_symmetric(self, metric=None):
+        # Cada arista u -> v tiene su inversa v -> u con el mismo peso, así que la ruta más corta
+        # de B a A es la de A a B al revés. Se comprueba una vez por métrica
+        if metric not in self._symmetric:
+            weights = self.metric_weights(metric)
+            offsets, targets = self.offsets, self.targets
+
+            def has_reverse(u, k):
+                v, w = targets[k], weights[k]
+                return any(targets[j] == u and weights[j] == w for j in range(offsets[v], offsets[v + 1]))
+
+            self._symmetric[metric] = all(has_reverse(u, k) for u in range(self.node_count)
+                                          for k in range(offsets[u], offsets[u + 1]))
+        return self._symmetric[metric]
+
+    def incoming(self):
+        # Aristas de entrada de cada nodo en formato CSR: (offsets, origen, índice de la arista).
+        # Solo depende de la topología; los pesos se leen con el índice en la columna que toque
+        if self._incoming is None:
+            counts = [0] * (self.node_count + 1)
+            for v in self.targets:
+                counts[v + 1] += 1
+            for i in range(self.node_count):
+                counts[i + 1] += counts[i]
+            position = counts[:-1]
+            sources = array('l', [0]) * len(self.targets)
+            edges = array('l', [0]) * len(self.targets)
+            for k, (u, v) in enumerate(self.edges()):
+                sources[position[v]] = u
+                edges[position[v]] = k
+                position[v] += 1
+            self._incoming = (array('l', counts), sources, edges)
+        return self._incoming
+
+    def edge_count(self):
+        return len(self.targets)
+
+    def edges(self):
+        offsets, targets = self.offsets, self.targets
+        for u in range(self.node_count):
+            for k in range(offsets[u], offsets[u + 1]):
+                yield u, targets[k]
+
+    def edge_source(self, k):
+        # Nodo de origen de la arista en la posición k
+        return bisect_right(self.offsets, k) - 1
+
+    def segment_lines(self, nodes=None, edges=None):
+        # Coordenadas de todas las aristas (una vez por par) separadas por NaN,
+        # para dibujarlas con una sola llamada a plot; edges limita a esas posiciones CSR
+        xs, ys = [], []
+        if edges is not None:
+            for k in edges:
+                u, v = self.edge_source(k), self.targets[k]
+                xs += (self.longitudes[u], self.longitudes[v], float('nan'))
+                ys += (self.latitudes[u], self.latitudes[v], float('nan'))
+            return xs, ys
+        for u, v in self.edges():
+            if u < v or u not in self.neighbors(v):
+                if nodes is None or (u in nodes and v in nodes):
+                    xs += (self.longitudes[u], self.longitudes[v], float('nan'))
+                    ys += (self.latitudes[u], self.latitudes[v], float('nan'))
+        return xs, ys
+
+    def great_circle(self, u, v):
+        # Haversine entre los nodos u y v, en km
+        lat1, lat2 = self.lat_rad[u], self.lat_rad[v]
+        a = (sin((lat2 - lat1) / 2) ** 2 +
+             self.cos_lat[u] * self.cos_lat[v] * sin((self.lon_rad[v] - self.lon_rad[u]) / 2) ** 2)
+        return EARTH_RADIUS * 2 * atan2(sqrt(a), sqrt(1 - a))
+
+    def heuristic_to(self, target, metric=None):
+        # Cota inferior ortodrómica hasta target con los valores del destino ya resueltos
+        lat_rad, lon_rad, cos_lat = self.lat_rad, self.lon_rad, self.cos_lat
+        target_lat, target_lon, target_cos = lat_rad[target], lon_rad[target], cos_lat[target]
+        if (metric or DEFAULT_METRIC) not in self.heuristic_scales:
+            raise ValueError(f"Unknown metric: {metric}")
+        scale = 2 * EARTH_RADIUS * self.heuristic_scales[metric or DEFAULT_METRIC]
+
+        def heuristic(node):
+            a = (sin((target_lat - lat_rad[node]) * 0.5) ** 2 +
+                 target_cos * cos_lat[node] * sin((target_lon - lon_rad[node]) * 0.5) ** 2)
+            return scale * asin(sqrt(min(a, 1.0)))
+        return heuristic
+
+    def memory_size(self):
+        arrays = [self.offsets, self.targets, self.latitudes, self.longitudes,
+                  self.lat_rad, self.lon_rad, self.cos_lat]
+        arrays.extend(self.metrics.values())
+        return sum(a.itemsize * len(a) for a in arrays)
@@ -2,8 +2,25 @@ from navPoint import NavPoint
 from navSegment import NavSegment
 from navAirport import NavAirport
 from path import Path
+from adjacency import Adjacency, DEFAULT_METRIC, BASE_METRICS
+from contraction import ContractionHierarchy
+from landmarks import Landmarks
+from fingerprint import dataset_fingerprint
+from cache import LRUCache
+from components import Components, ReachableSet
+from spatial import SpatialIndex, GridIndex
+from loader import LoadReport, read_columns, paused_gc
+from snapshot import Snapshot, snapshot_path, source_stats, pack_strings, unpack_strings
+from route_store import RouteStore, route_store_path
+from tiles import build_tiles, DEFAULT_CELL_SIZE
+import routing
+import batch_routing
+from array import array
+from itertools import repeat, compress, islice
+from operator import eq, not_
 import os
 import platform
+import sqlite3
 import subprocess
 import matplotlib.pyplot as plt
 from segment import Segment
@@ -11,91 +28,386 @@ from navAirport import NavAirport
 import random
 from datetime import datetime, timedelta
 
+_MISSING = object()  # resultado ausente en route_cache (None es una ruta cacheada: no hay ruta)
+
 
 class AirSpace:
-    def __init__(self):
+    def __init__(self, metric=DEFAULT_METRIC, tree_cache_size=16, route_cache_size=256):
+        self.metric = metric  # "great_circle" (ortodrómica), "file" (distancia del fichero) o una de add_metric
+        self.metric_builders = {}  # nombre -> función que calcula los pesos de la métrica (ver metrics.py)
+        self.tree_cache = LRUCache(tree_cache_size)  # (origen, métrica) -> ShortestPathTree
+        self.leg_cache = LRUCache(256)  # (origen, destino, métrica) -> RouteResult de un tramo
+        # (tipo, origen, destino, métrica, versión) -> Path o None de find_shortest_path
+        self.route_cache = LRUCache(route_cache_size)
+        self.version = 0  # sube con cada cambio de topología o de segmentos cerrados
+        self.closed_segments = set()  # aristas (id origen, id destino) cerradas, ver close_segment
+        # (id origen, id destino, métrica) -> IncrementalRoute de las rutas ya reparadas alguna vez
+        self.route_repairs = LRUCache(route_cache_size)
+        self.last_repair = (0, 0)  # rutas cacheadas conservadas y reparadas en el último cierre/reapertura
         self.nav_points = {}
         self.nav_segments = []
         self.nav_airports = {}
+        self.name_index = {}  # nombre -> NavPoint
+        self.number_by_name = {}  # nombre -> número (índice inverso de nav_points)
+        self.duplicate_names = {}  # nombre -> números de todos los puntos que lo comparten
+        self.point_list = []  # id -> NavPoint
+        self._edge_sources = array('l')
+        self._edge_destinations = array('l')
+        self._edge_distances = array('d')
+        self._edge_set = set()
+        self.components = Components()  # componentes conexas, mantenidas al añadir aristas
+        self._adjacency = None
+        self._point_grid = None  # GridIndex de puntos y de cajas de segmentos, para consultas por caja
+        self._segment_grid = None
+        self._spatial = None  # SpatialIndex sobre las coordenadas (independiente de las aristas)
+        self.source_files = None  # (nav, seg, aer) de la última carga desde ficheros
+        self._fingerprint = None  # hash de esos ficheros tal como se cargaron
+        self.load_report = None  # LoadReport de la última carga
+        self.route_store = None  # RouteStore con las rutas de sesiones anteriores, si se abrió
+        self._store_version = None  # versión del grafo que corresponde al dataset del RouteStore
+        self.hierarchy = None  # ContractionHierarchy contraída (da el orden), si la hay
+        self.landmarks = None  # Landmarks (heurística ALT) elegidos, si los hay
+        # métrica -> jerarquía y landmarks listos para consultar, personalizados desde los anteriores
+        self.hierarchies = {}
+        self.landmark_sets = {}
         self.figure = None
         self.ax = None
+        self.last_expanded = 0
 
-    def load_from_files(self, nav_file, seg_file, airport_file):
-        try:
-            self.nav_points = {}
-            self.nav_segments = []
-            self.nav_airports = {}
-
-            if os.path.exists(nav_file):
-                with open(nav_file, 'r') as f:
-                    for line in f:
-                        parts = line.strip().split()
-                        if len(parts) >= 4:
-                            number = int(parts[0])
-                            name = parts[1]
-                            lat = float(parts[2])
-                            lon = float(parts[3])
-                            self.nav_points[number] = NavPoint(number, name, lat, lon)
-            else:
-                raise FileNotFoundError(f"Navigation points file not found: {nav_file}")
-
-            print(f"Loaded NavPoints: {len(self.nav_points)}")
-
-            if os.path.exists(seg_file):
-                with open(seg_file, 'r') as f:
-                    for line in f:
-                        parts = line.strip().split()
-                        if len(parts) >= 3:
-                            origin = int(parts[0])
-                            dest = int(parts[1])
-                            distance = float(parts[2])
-                            segment = NavSegment(origin, dest, distance,
-                                                 origin_point=self.nav_points.get(origin),
-                                                 destination_point=self.nav_points.get(dest))
-                            self.nav_segments.append(segment)
-
-                            if origin in self.nav_points and dest in self.nav_points:
-                                self.nav_points[origin].add_neighbor(self.nav_points[dest])
-                                self.nav_points[dest].add_neighbor(self.nav_points[origin])  # Bidirectional
-                            else:
-                                print(f"Segment ignored: {origin} → {dest} (node not found)")
-            else:
-                raise FileNotFoundError(f"Segments file not found: {seg_file}")
-
-            print(f"Valid NavSegments loaded: {len(self.nav_segments)}")
-
-            if airport_file and os.path.exists(airport_file):
-                with open(airport_file, 'r') as f:
-                    current_airport = None
-                    for line in f:
-                        line = line.strip()
-                        if not line:
-                            continue
-                        if line.isupper() and len(line) == 4:  # Airport code
-                            current_airport = NavAirport(line)
-                            self.nav_airports[line] = current_airport
-                        elif line.endswith('.D'):  # Departure point
-                            point = self.find_point_by_name(line)
-                            if point and current_airport:
-                                current_airport.sids.append(point)
-                        elif line.endswith('.A'):  # Arrival point
-                            point = self.find_point_by_name(line)
-                            if point and current_airport:
-                                current_airport.stars.append(point)
-            else:
-                print(f"⚠️ Airport file not found or not specified: {airport_file}")
-
-            print(f"Airports loaded: {len(self.nav_airports)}")
+    def clear(self):
+        self.nav_points = {}
+        self.nav_segments = []
+        self.nav_airports = {}
+        self.name_index = {}
+        self.number_by_name = {}
+        self.duplicate_names = {}
+        self.point_list = []
+        self._edge_sources = array('l')
+        self._edge_destinations = array('l')
+        self._edge_distances = array('d')
+        self._edge_set = set()
+        self.components = Components()
+        self.closed_segments = set()
+        self._spatial = None
+        self.source_files = None
+        self._fingerprint = None
+        self.close_route_store()
+        self._topology_changed()
+
+    def _topology_changed(self):
+        # Invalida la adyacencia CSR y todo lo preprocesado sobre ella. Las rutas cacheadas
+        # llevan la versión en la clave: las de versiones anteriores ya no se encuentran y
+        # salen de la caché por antigüedad, sin recorrerla en cada edición
+        self.version += 1
+        self._adjacency = None
+        self._point_grid = None
+        self._segment_grid = None
+        self.hierarchy = None
+        self.landmarks = None
+        self.hierarchies.clear()
+        self.landmark_sets.clear()
+        self.tree_cache.clear()
+        self.leg_cache.clear()
+        self.route_repairs.clear()
+
+    def add_point(self, point):
+        previous = self.nav_points.get(point.number)
+        if previous is not None:
+            point.id = previous.id
+            previous.airspace = None
+            if self.name_index.get(previous.name) is previous:
+                del self.name_index[previous.name]
+                del self.number_by_name[previous.name]
+        else:
+            point.id = len(self.point_list)
+            self.point_list.append(None)
+            self.components.add_node()
+        self.point_list[point.id] = point
+        point.airspace = self
+        if self._spatial is not None:
+            self._spatial.update(point.id, point.latitude, point.longitude)
+        self._topology_changed()
+
+        self.nav_points[point.number] = point
+        first = self.name_index.get(point.name)
+        if first is None:
+            self.name_index[point.name] = point
+            self.number_by_name[point.name] = point.number
+        elif first.number != point.number:
+            # Nombre duplicado: se conserva el primer punto cargado y se registran todos
+            self.duplicate_names.setdefault(point.name, [first.number]).append(point.number)
+
+    def report_duplicate_names(self):
+        if self.duplicate_names:
+            names = ", ".join(sorted(self.duplicate_names)[:10])
+            print(f"⚠️ {len(self.duplicate_names)} duplicated NavPoint names, "
+                  f"lookups return the first loaded point: {names}")
+
+    def load_from_files(self, nav_file, seg_file, airport_file, snapshot=True, route_store=False):
+        # Carga por columnas: cada fichero se lee de una vez y las filas descartadas se
+        # resumen al final en self.load_report. Con snapshot se usa (o se escribe) el volcado
+        # binario junto a nav_file mientras los ficheros fuente no cambien; con route_store se
+        # abre además el almacén de rutas de sesiones anteriores (ver open_route_store)
+        paths = (nav_file, seg_file, airport_file)
+        filename = snapshot_path(nav_file) if snapshot else None
+        if filename and self._load_snapshot(filename, paths):
+            if route_store:
+                self.open_route_store()
             return True
+        try:
+            with paused_gc():
+                self.clear()
+                report = LoadReport()
+                if filename or route_store:
+                    # Claves tomadas antes de leer: si un fichero cambia durante la carga el
+                    # snapshot (o el almacén de rutas) no coincidirá con él
+                    sources, fingerprint = source_stats(paths), dataset_fingerprint(paths)
+
+                self._load_points(nav_file, report)
+                print(f"Loaded NavPoints: {len(self.nav_points)}")
+                self.report_duplicate_names()
+
+                self._load_segments(seg_file, report)
+                print(f"Valid NavSegments loaded: {self._segment_count()}")
+
+                self._load_airports(airport_file, report)
+                print(f"Airports loaded: {len(self.nav_airports)}")
+
+                self.load_report = report
+                if report:
+                    print(report)
+                self.build_adjacency()
+                self.build_spatial_index()
+                self.source_files = paths
+                if filename or route_store:
+                    self._fingerprint = fingerprint
+                if filename:
+                    self._save_snapshot(filename, sources, fingerprint)
+                if route_store:
+                    self.open_route_store()
+                return True
 
         except Exception as e:
             print(f" Error loading files: {e}")
             raise e
 
+    def _save_snapshot(self, filename, sources, fingerprint):
+        adjacency, spatial = self.adjacency, self.spatial
+        name_offsets, names = pack_strings(p.name for p in self.point_list)
+        airports = list(self.nav_airports.values())
+        arrays = {
+            "numbers": array('l', (p.number for p in self.point_list)),
+            "latitudes": adjacency.latitudes, "longitudes": adjacency.longitudes,
+            "name_offsets": name_offsets, "names": names,
+            "name_ids": array('l', (p.id for p in self.name_index.values())),
+            # Los mismos ids ordenados por nombre (bytes UTF-8), para buscar sin diccionario
+            "name_order": array('l', (p.id for p in sorted(self.name_index.values(),
+                                                          key=lambda p: p.name.encode('utf-8')))),
+            "lat_rad": adjacency.lat_rad, "lon_rad": adjacency.lon_rad, "cos_lat": adjacency.cos_lat,
+            "edge_sources": self._edge_sources, "edge_destinations": self._edge_destinations,
+            "edge_distances": self._edge_distances,
+            "offsets": adjacency.offsets, "targets": adjacency.targets,
+            "labels": self.components.labels(),
+            **self._segment_arrays(),
+            "airport_names": pack_strings(a.name for a in airports)[1],
+            "sid_counts": array('l', (len(a.sids) for a in airports)),
+            "sids": array('l', (p.id for a in airports for p in a.sids)),
+            "star_counts": array('l', (len(a.stars) for a in airports)),
+            "stars": array('l', (p.id for a in airports for p in a.stars)),
+            "spatial_xs": spatial.xs, "spatial_ys": spatial.ys, "spatial_zs": spatial.zs,
+            "spatial_order": spatial.order, "spatial_axes": array('B', spatial.axes),
+            "spatial_splits": spatial.splits,
+        }
+        for metric in BASE_METRICS:
+            arrays[f"weights:{metric}"] = adjacency.metrics[metric]
+        header = {"metrics": list(BASE_METRICS),
+                  "heuristic_scales": {metric: adjacency.heuristic_scales[metric] for metric in BASE_METRICS},
+                  "one_way": self.components.one_way, "duplicate_names": self.duplicate_names,
+                  "report": self.load_report.ignored if self.load_report else {}}
+        try:
+            Snapshot.capture(header, arrays, sources, fingerprint).save(filename)
+        except OSError as e:
+            print(f"⚠️ Could not write snapshot {filename}: {e}")
+
+    def _load_snapshot(self, filename, paths):
+        if not os.path.exists(filename):
+            return False
+        try:
+            snapshot = Snapshot.load(filename)
+            if not snapshot.matches(paths):
+                return False
+            with paused_gc():
+                self._restore(snapshot)
+        except (OSError, ValueError, KeyError, EOFError) as e:
+            print(f"⚠️ Ignoring unreadable snapshot {filename}: {e}")
+            self.clear()
+            return False
+        self.source_files = paths
+        self._fingerprint = snapshot.header["fingerprint"]
+        print(f"Loaded NavPoints: {len(self.nav_points)}")
+        self.report_duplicate_names()
+        print(f"Valid NavSegments loaded: {self._segment_count()}")
+        print(f"Airports loaded: {len(self.nav_airports)}")
+        if self.load_report:
+            print(self.load_report)
+        return True
+
+    def _segment_count(self):
+        if self._segment_columns is not None:
+            return len(self._segment_columns[0])
+        return len(self._nav_segments)
+
+    def _segment_arrays(self):
+        # Columnas de segmentos (ids de extremos y distancia) para el snapshot, sin crear los
+        # NavSegment si aún no se han pedido
+        if self._segment_columns is not None:
+            origins, destinations, distances = self._segment_columns
+        else:
+            segments = self._nav_segments
+            origins = array('l', (s.origin.id for s in segments))
+            destinations = array('l', (s.destination.id for s in segments))
+            distances = array('d', (s.distance for s in segments))
+        return {"segment_origins": origins, "segment_destinations": destinations,
+                "segment_distances": distances}
+
+    @property
+    def nav_segments(self):
+        # Tras cargar (de texto o de un snapshot) los NavSegment se crean la primera vez que se
+        # piden: muchos usos solo necesitan la adyacencia
+        if self._segment_columns is not None:
+            origins, destinations, distances = self._segment_columns
+            self._segment_columns = None
+            points = self.point_list
+            numbers = [p.number for p in points]
+            self._nav_segments = list(map(NavSegment, map(numbers.__getitem__, origins),
+                                          map(numbers.__getitem__, destinations), distances,
+                                          map(points.__getitem__, origins), map(points.__getitem__, destinations)))
+        return self._nav_segments
+
+    @nav_segments.setter
+    def nav_segments(self, segments):
+        self._segment_columns = None
+        self._nav_segments = segments
+
+    def _restore(self, snapshot):
+        # Reconstruye el estado de load_from_files a partir de las columnas del snapshot,
+        # sin volver a deduplicar, ordenar ni calcular pesos
+        header, arrays = snapshot.header, snapshot.arrays
+        self.clear()
+        points = list(map(NavPoint, arrays["numbers"], unpack_strings(arrays["names"]),
+                          arrays["latitudes"], arrays["longitudes"]))
+        for node, point in enumerate(points):
+            point.id = node
+            point.airspace = self
+        self.point_list = points
+        self.nav_points = {p.number: p for p in points}
+        self.name_index = {points[node].name: points[node] for node in arrays["name_ids"]}
+        self.number_by_name = {name: p.number for name, p in self.name_index.items()}
+        self.duplicate_names = header["duplicate_names"]
+
+        self._segment_columns = (arrays["segment_origins"], arrays["segment_destinations"],
+                                 arrays["segment_distances"])
+
+        sids, stars = iter(arrays["sids"]), iter(arrays["stars"])
+        for name, sid_count, star_count in zip(unpack_strings(arrays["airport_names"]),
+                                               arrays["sid_counts"], arrays["star_counts"]):
+            airport = NavAirport(name)
+            airport.sids = [points[node] for node in islice(sids, sid_count)]
+            airport.stars = [points[node] for node in islice(stars, star_count)]
+            self.nav_airports[name] = airport
+
+        self._edge_sources = arrays["edge_sources"]
+        self._edge_destinations = arrays["edge_destinations"]
+        self._edge_distances = arrays["edge_distances"]
+        self._edge_set = None  # se construye al añadir la siguiente arista
+        self.components = Components.from_labels(arrays["labels"], header["one_way"])
+        self.load_report = LoadReport()
+        for reason, (total, examples) in header["report"].items():
+            self.load_report.ignored[reason] = [total, [tuple(example) for example in examples]]
+
+        self._adjacency = Adjacency.from_arrays(
+            arrays["latitudes"], arrays["longitudes"], arrays["offsets"], arrays["targets"],
+            {metric: arrays[f"weights:{metric}"] for metric in header["metrics"]},
+            header["heuristic_scales"], (arrays["lat_rad"], arrays["lon_rad"], arrays["cos_lat"]))
+        self._build_metrics(self._adjacency)
+        self._spatial = SpatialIndex.from_arrays(
+            arrays["spatial_xs"], arrays["spatial_ys"], arrays["spatial_zs"],
+            arrays["spatial_order"], bytearray(arrays["spatial_axes"]), arrays["spatial_splits"])
+
+    def _load_points(self, nav_file, report):
+        if not os.path.exists(nav_file):
+            raise FileNotFoundError(f"Navigation points file not found: {nav_file}")
+        numbers, names, latitudes, longitudes = read_columns(nav_file, ('l', str, 'd', 'd'), report)
+        if self.point_list or len(set(numbers)) < len(numbers):
+            # Números repetidos (el último sustituye al anterior): punto a punto
+            for number, name, lat, lon in zip(numbers, names, latitudes, longitudes):
+                self.add_point(NavPoint(number, name, lat, lon))
+            return
+        # Alta en bloque con el mismo resultado que add_point uno a uno
+        points = list(map(NavPoint, numbers, names, latitudes, longitudes))
+        for node, point in enumerate(points):
+            point.id = node
+            point.airspace = self
+        self.point_list = points
+        self.nav_points = dict(zip(numbers, points))
+        for point in points:
+            first = self.name_index.setdefault(point.name, point)
+            if first is not point:
+                self.duplicate_names.setdefault(point.name, [first.number]).append(point.number)
+        self.number_by_name = {name: point.number for name, point in self.name_index.items()}
+        self.components = Components(len(points))
+        self._topology_changed()
+
+    def _load_segments(self, seg_file, report):
+        if not os.path.exists(seg_file):
+            raise FileNotFoundError(f"Segments file not found: {seg_file}")
+        origins, destinations, distances, line_numbers = read_columns(seg_file, ('l', 'l', 'd'), report, True)
+
+        # Unión con el índice de puntos: número -> id, -1 si el extremo no existe
+        ids = {number: point.id for number, point in self.nav_points.items()}
+        sources = array('l', map(ids.get, origins, repeat(-1)))
+        targets = array('l', map(ids.get, destinations, repeat(-1)))
+        if -1 in sources or -1 in targets:
+            valid = [u >= 0 for u in map(min, sources, targets)]
+            for k in compress(range(len(valid)), map(not_, valid)):
+                report.add("unknown endpoint", seg_file, line_numbers[k], f"{origins[k]} → {destinations[k]}")
+            distances = array('d', compress(distances, valid))
+            sources = array('l', compress(sources, valid))
+            targets = array('l', compress(targets, valid))
+
+        self._segment_columns = (sources, targets, distances)
+        # Los segmentos son bidireccionales: ida y vuelta intercaladas, como en _connect
+        count = len(sources)
+        edge_sources, edge_destinations = array('l', [0]) * (2 * count), array('l', [0]) * (2 * count)
+        edge_sources[0::2], edge_sources[1::2] = sources, targets
+        edge_destinations[0::2], edge_destinations[1::2] = targets, sources
+        edge_distances = array('d', [0.0]) * (2 * count)
+        edge_distances[0::2] = edge_distances[1::2] = distances
+        self._add_edges(edge_sources, edge_destinations, edge_distances)
+
+    def _load_airports(self, airport_file, report):
+        if not airport_file or not os.path.exists(airport_file):
+            print(f"⚠️ Airport file not found or not specified: {airport_file}")
+            return
+        with open(airport_file, 'r') as f:
+            current_airport = None
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                if line.isupper() and len(line) == 4:  # Airport code
+                    current_airport = NavAirport(line)
+                    self.nav_airports[line] = current_airport
+                elif line.endswith('.D') or line.endswith('.A'):  # Departure / arrival point
+                    point = self.find_point_by_name(line)
+                    if point and current_airport:
+                        procedures = current_airport.sids if line.endswith('.D') else current_airport.stars
+                        procedures.append(point)
+                    else:
+                        report.add("unknown procedure point", airport_file, line_number, line)
+
     def load_from_saved_graph(self, filename):
-        self.nav_points = {}
-        self.nav_segments = []
-        self.nav_airports = {}
+        self.clear()
 
         mode = None
         with open(filename, 'r') as f:
@@ -117,7 +429,7 @@ class AirSpace:
                     name = parts[1]
                     lat = float(parts[2])
                     lon = float(parts[3])
-                    self.nav_points[number] = NavPoint(number, name, lat, lon)
+                    self.add_point(NavPoint(number, name, lat, lon))
 
                 elif mode == "seg":
                     origin_number = int(parts[0])
@@ -127,8 +439,7 @@ class AirSpace:
                     origin = self.nav_points.get(origin_number)
                     destination = self.nav_points.get(dest_number)
                     if origin and destination:
-                        origin.add_neighbor(destination)
-                        destination.add_neighbor(origin)
+                        self._connect(origin, destination, cost)
                         segment = NavSegment(origin_number, dest_number, cost,
                                              origin_point=origin, destination_point=destination)
                         self.nav_segments.append(segment)
@@ -143,55 +454,602 @@ class AirSpace:
                     dummy_point = NavPoint(-1, name, lat, lon)
                     self.nav_airports[name].sids.append(dummy_point)
 
-    def find_point_by_name(self, name):
-        for point in self.nav_points.values():
-            if point.name == name:
-                return point
+        self.report_duplicate_names()
+        self.build_adjacency()
+        self.build_spatial_index()
+
+    def _edges(self):
+        # Conjunto de pares (origen, destino) para deduplicar; tras cargar un snapshot se
+        # construye solo si se añaden aristas
+        if self._edge_set is None:
+            self._edge_set = set(zip(self._edge_sources, self._edge_destinations))
+        return self._edge_set
+
+    def _add_edge(self, source, destination, distance=None):
+        edge_set = self._edges()
+        if source == destination or (source, destination) in edge_set:
+            return False
+        self.components.add_edge(source, destination, (destination, source) in edge_set)
+        edge_set.add((source, destination))
+        self._edge_sources.append(source)
+        self._edge_destinations.append(destination)
+        self._edge_distances.append(float('nan') if distance is None else distance)
+        self._topology_changed()
+        return True
+
+    def _add_edges(self, sources, destinations, distances):
+        # Alta en bloque por columnas: misma deduplicación que _add_edge y una sola invalidación
+        edge_set = self._edges()
+        count = len(sources)
+        # Recorriendo al revés, cada par se queda con la posición de su primera aparición
+        first = dict(zip(zip(reversed(sources), reversed(destinations)), range(count - 1, -1, -1)))
+        if edge_set or any(map(eq, sources, destinations)):
+            first = {edge: k for edge, k in first.items() if edge not in edge_set and edge[0] != edge[1]}
+        if not first:
+            return
+        if len(first) == count:
+            # Sin repetidas ni lazos (lo normal en un fichero de segmentos): en el orden original
+            self._edge_sources.extend(sources)
+            self._edge_destinations.extend(destinations)
+            self._edge_distances.extend(distances)
+        else:
+            keep = sorted(first.values())
+            self._edge_sources.extend(map(sources.__getitem__, keep))
+            self._edge_destinations.extend(map(destinations.__getitem__, keep))
+            self._edge_distances.extend(map(distances.__getitem__, keep))
+        edge_set.update(first)
+        self.components.add_edges(first, edge_set)
+        self._topology_changed()
+
+    def _connect(self, origin, destination, distance=None):
+        # Los segmentos son bidireccionales
+        self._add_edge(origin.id, destination.id, distance)
+        self._add_edge(destination.id, origin.id, distance)
+
+    def add_edge(self, origin, destination):
+        # Un punto sin añadir (id -1) o de otro AirSpace dejaría un id ajeno en las aristas
+        for point in (origin, destination):
+            if point.airspace is not self or not 0 <= point.id < len(self.point_list):
+                raise ValueError(f"Point not in this airspace: {point.name}")
+        return self._add_edge(origin.id, destination.id, origin.distance_to(destination))
+
+    @property
+    def adjacency(self):
+        # Se reconstruye solo cuando la topología ha cambiado desde la última consulta
+        if self._adjacency is None:
+            self._adjacency = Adjacency([p.latitude for p in self.point_list],
+                                        [p.longitude for p in self.point_list],
+                                        self._edge_sources, self._edge_destinations,
+                                        self._edge_distances, unique=True)
+            if self.closed_segments:
+                self._adjacency.close_edges(self.closed_segments)
+            self._build_metrics(self._adjacency)
+        return self._adjacency
+
+    def _build_metrics(self, adjacency):
+        # Por orden de registro: una combinación puede usar métricas registradas antes
+        for name, builder in self.metric_builders.items():
+            adjacency.add_metric(name, builder(adjacency))
+
+    def add_metric(self, name, builder):
+        # Métrica con nombre sobre la misma adyacencia: builder(adjacency) devuelve un peso por
+        # arista y se vuelve a llamar si cambia la topología. Registrarla otra vez con el mismo
+        # nombre (p. ej. vientos nuevos) sustituye los pesos y lo preprocesado para ella
+        if name in BASE_METRICS:
+            raise ValueError(f"Metric {name} cannot be replaced")
+        if self._adjacency is not None:
+            self._adjacency.add_metric(name, builder(self._adjacency))
+        self.metric_builders[name] = builder
+        self._metric_changed(name)
+        # Las combinaciones que la usan se recalculan también
+        changed = {name}
+        for other, other_builder in self.metric_builders.items():
+            if other not in changed and changed & set(getattr(other_builder, "terms", ())):
+                if self._adjacency is not None:
+                    self._adjacency.add_metric(other, other_builder(self._adjacency))
+                changed.add(other)
+                self._metric_changed(other)
+
+    def remove_metric(self, name):
+        if name not in self.metric_builders:
+            return False
+        users = [other for other, builder in self.metric_builders.items() if name in getattr(builder, "terms", ())]
+        if users:
+            raise ValueError(f"Metric {name} is used by {', '.join(users)}")
+        del self.metric_builders[name]
+        if self._adjacency is not None:
+            self._adjacency.remove_metric(name)
+        self._metric_changed(name)
+        return True
+
+    def _metric_changed(self, name):
+        # Misma topología: solo deja de valer lo calculado con esa métrica. La versión sube (así
+        # AirportMatrix lo detecta) pero las rutas cacheadas de las demás métricas pasan a la
+        # nueva, y el RouteStore sigue valiendo porque el dataset es el mismo
+        previous = self.version
+        self.version += 1
+        if self._store_version == previous:
+            self._store_version = self.version
+        for key, path in self.route_cache.items():
+            if key[4] == previous:
+                self.route_cache.pop(key)
+                if key[3] != name:
+                    self.route_cache.put(key[:4] + (self.version,), path)
+        self.hierarchies.pop(name, None)
+        self.landmark_sets.pop(name, None)
+        self.tree_cache.clear()
+        self.leg_cache.clear()
+        for key, _ in self.route_repairs.items():
+            if key[2] == name:
+                self.route_repairs.pop(key)
+
+    def build_adjacency(self):
+        self._topology_changed()
+        return self.adjacency
+
+    def build_spatial_index(self):
+        self._spatial = None
+        return self.spatial
+
+    @property
+    def spatial(self):
+        if self._spatial is None:
+            self._spatial = SpatialIndex([p.latitude for p in self.point_list],
+                                         [p.longitude for p in self.point_list])
+        return self._spatial
+
+    def nearest_point(self, latitude, longitude):
+        found = self.spatial.nearest(latitude, longitude)
+        return self.point_list[found[0]] if found else None
+
+    def nearest_points(self, latitude, longitude, k=5):
+        # [(NavPoint, km)] de los k puntos más cercanos
+        return [(self.point_list[node], km) for node, km in self.spatial.k_nearest(latitude, longitude, k)]
+
+    def points_within(self, latitude, longitude, radius_km):
+        return [self.point_list[node] for node in self.spatial.within(latitude, longitude, radius_km)]
+
+    def points_in_bbox(self, min_lat, min_lon, max_lat, max_lon):
+        # ids de los puntos dentro de la caja (min_lon > max_lon si cruza el antimeridiano)
+        if self._point_grid is None:
+            adjacency = self.adjacency
+            self._point_grid = GridIndex.points(adjacency.latitudes, adjacency.longitudes)
+        return self._point_grid.query(min_lat, min_lon, max_lat, max_lon)
+
+    def segments_in_bbox(self, min_lat, min_lon, max_lat, max_lon):
+        # Posiciones CSR de los segmentos cuya caja envolvente corta la caja (uno por par de puntos)
+        if self._segment_grid is None:
+            self._segment_grid = GridIndex.segments(self.adjacency)
+        return self._segment_grid.query(min_lat, min_lon, max_lat, max_lon)
+
+    def subgraph(self, min_lat, min_lon, max_lat, max_lon):
+        # Nuevo AirSpace con los puntos de la caja, los segmentos entre ellos y los aeropuertos
+        # cuyos procedimientos quedan dentro, sin volver a leer los ficheros
+        sub = AirSpace(self.metric, self.tree_cache.maxsize, self.route_cache.maxsize)
+        inside = {}
+        for node in self.points_in_bbox(min_lat, min_lon, max_lat, max_lon):
+            point = self.point_list[node]
+            inside[node] = NavPoint(point.number, point.name, point.latitude, point.longitude)
+            sub.add_point(inside[node])
+
+        adjacency = self.adjacency
+        distances = adjacency.metric_weights("file")
+        for u, point in inside.items():
+            for k in range(adjacency.offsets[u], adjacency.offsets[u + 1]):
+                v = adjacency.targets[k]
+                if v in inside:
+                    sub._add_edge(point.id, inside[v].id, distances[k])
+        for segment in self.nav_segments:
+            origin = inside.get(segment.origin.id) if segment.origin else None
+            destination = inside.get(segment.destination.id) if segment.destination else None
+            if origin and destination:
+                sub.nav_segments.append(NavSegment(origin.number, destination.number, segment.distance,
+                                                   origin_point=origin, destination_point=destination))
+
+        for name, airport in self.nav_airports.items():
+            sids = [inside[p.id] for p in airport.sids if p.airspace is self and p.id in inside]
+            stars = [inside[p.id] for p in airport.stars if p.airspace is self and p.id in inside]
+            if sids or stars:
+                sub.nav_airports[name] = NavAirport(name, airport.latitude, airport.longitude)
+                sub.nav_airports[name].sids = sids
+                sub.nav_airports[name].stars = stars
+
+        sub.build_adjacency()
+        sub.build_spatial_index()
+        return sub
+
+    def save_tiles(self, directory, cell_size=DEFAULT_CELL_SIZE):
+        # Teselas para abrir el dataset con tiles.TiledAirSpace, que carga solo las zonas que
+        # tocan las consultas o la vista del GUI. Devuelve el número de teselas
+        if not self.point_list:
+            raise ValueError("No airspace loaded")
+        return build_tiles(self, directory, cell_size)
+
+    def fingerprint(self):
+        # Del contenido con el que se cargó (tomado al cargar o del snapshot); si no se tomó
+        # entonces, de los ficheros tal como están ahora
+        if self._fingerprint is None and self.source_files:
+            self._fingerprint = dataset_fingerprint(self.source_files)
+        return self._fingerprint
+
+    def open_route_store(self, filename=None):
+        # Rutas persistentes entre sesiones (por defecto en nav_file.routes), válidas mientras
+        # el grafo sea el del dataset cargado: tras editarlo ya no se consultan ni se escriben
+        self.close_route_store()
+        fingerprint = self.fingerprint()
+        if fingerprint is None:
+            raise ValueError("A route store needs a dataset loaded from files")
+        filename = filename or route_store_path(self.source_files[0])
+        try:
+            self.route_store = RouteStore(filename, fingerprint)
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠️ Route store {filename} not available: {e}")
+            return None
+        self._store_version = self.version
+        return self.route_store
+
+    def close_route_store(self):
+        # Espera a que se escriban las rutas pendientes
+        if self.route_store is not None:
+            self.route_store.close()
+            self.route_store = None
+
+    def _usable_store(self, metric):
+        # Las métricas de add_metric dependen de datos que no forman parte del dataset (vientos,
+        # tarifas): sus rutas no se guardan entre sesiones
+        if self.route_store is not None and self._store_version == self.version and metric in BASE_METRICS:
+            return self.route_store
         return None
 
+    def prepare_hierarchy(self, metric=None, filename=None):
+        # Jerarquía lista para consultar con una métrica. La contracción (o la carga, si el fichero
+        # corresponde a este dataset) se hace una sola vez; las demás métricas y los segmentos
+        # cerrados personalizan esa jerarquía con su orden, sin volver a contraer
+        metric = metric or self.metric
+        if self.hierarchy is None:
+            self.hierarchy = self._contract(metric if metric in BASE_METRICS else DEFAULT_METRIC, filename)
+        hierarchy = self.hierarchy
+        if hierarchy.metric != metric or self.closed_segments:
+            hierarchy = hierarchy.customize(self.adjacency, metric)
+        self.hierarchies[metric] = hierarchy
+        return hierarchy
+
+    def _contract(self, metric, filename=None):
+        # Siempre con los pesos sin cerrar, que son los que se guardan en el fichero
+        fingerprint = self.fingerprint()
+        if filename is None and self.source_files:
+            filename = f"{self.source_files[0]}.{metric}.ch"
+
+        if filename and fingerprint and os.path.exists(filename):
+            try:
+                hierarchy = ContractionHierarchy.load(filename)
+                if (hierarchy.fingerprint == fingerprint and hierarchy.metric == metric and
+                        hierarchy.node_count == self.adjacency.node_count):
+                    return hierarchy
+            except (OSError, ValueError, EOFError) as e:
+                print(f"⚠️ Ignoring unreadable hierarchy {filename}: {e}")
+
+        adjacency = self.adjacency
+        hierarchy = ContractionHierarchy.build(adjacency, metric, fingerprint, weights=adjacency.metrics[metric])
+        if filename and fingerprint:
+            hierarchy.save(filename)
+        return hierarchy
+
+    def prepare_landmarks(self, count=8, strategy="farthest", metric=None):
+        # Elige los landmarks (lo caro) y calcula sus distancias con la métrica
+        metric = metric or self.metric
+        self.landmarks = Landmarks.build(self.adjacency, count, metric, strategy)
+        self.landmark_sets[metric] = self.landmarks
+        return self.landmarks
+
+    def _prepared_landmarks(self, metric):
+        # Para otra métrica, o tras reabrir segmentos, basta con recalcular las distancias
+        landmarks = self.landmark_sets.get(metric)
+        if landmarks is None:
+            if self.landmarks is None:
+                return self.prepare_landmarks(metric=metric)
+            landmarks = self.landmarks.customize(self.adjacency, metric)
+            self.landmark_sets[metric] = landmarks
+        return landmarks
+
+    def neighbor_points(self, point):
+        return [self.point_list[i] for i in self.adjacency.neighbors(point.id)]
+
+    def find_point_by_name(self, name):
+        return self.name_index.get(name)
+
+    def find_points_by_name(self, name):
+        numbers = self.duplicate_names.get(name)
+        if numbers:
+            return [self.nav_points[number] for number in numbers]
+        point = self.name_index.get(name)
+        return [point] if point else []
+
     def reachable_nodes(self, start_name):
         start = self.find_point_by_name(start_name)
         if not start:
-            return []
-
-        visited = []
-        queue = [start]
-
-        while queue:
-            current = queue.pop(0)
-            if current not in visited:
-                visited.append(current)
-                queue.extend(n for n in current.neighbors if n not in visited)
+            return ReachableSet(array('l'), self.point_list)
+        if self.components.symmetric() and not self.closed_segments:
+            # Con segmentos bidireccionales lo alcanzable es la componente: no hace falta recorrer aristas
+            labels = self.components.labels()
+            root = labels[start.id]
+            ids = array('l', (node for node, label in enumerate(labels) if label == root))
+        else:
+            ids = array('l', routing.breadth_first(self.adjacency, start.id, self.adjacency.weights))
+        return ReachableSet(ids, self.point_list)
 
-        return visited
+    def _reachable(self, source, target):
+        # False si es seguro que no hay ruta; None si hace falta buscar para saberlo. Cerrar
+        # segmentos puede partir una componente, pero nunca une dos
+        if not self.components.connected(source, target):
+            return False
+        return True if self.components.symmetric() and not self.closed_segments else None
 
-    def find_shortest_path(self, origin_name, destination_name):
+    def is_reachable(self, origin_name, destination_name):
         origin = self.find_point_by_name(origin_name)
         destination = self.find_point_by_name(destination_name)
         if not origin or not destination:
+            return False
+        reachable = self._reachable(origin.id, destination.id)
+        if reachable is None:
+            adjacency = self.adjacency
+            return destination.id in routing.breadth_first(adjacency, origin.id, adjacency.weights)
+        return reachable
+
+    def find_shortest_path(self, origin_name, destination_name, metric=None, method=None):
+        # method: "astar", "bidirectional", "alt" o "ch"; por defecto se usa lo que haya
+        # preparado para la métrica y el resultado pasa por route_cache. Con un método
+        # explícito siempre se calcula (p. ej. para comparar algoritmos)
+        origin = self.find_point_by_name(origin_name)
+        destination = self.find_point_by_name(destination_name)
+        airports = (not origin and not destination and
+                    origin_name in self.nav_airports and destination_name in self.nav_airports)
+        if not airports and (not origin or not destination):
             return None
 
-        current_paths = [Path([origin], 0, origin.distance_to(destination))]
-
-        while current_paths:
-            current_paths.sort(key=lambda p: p.total_cost())
-            current = current_paths.pop(0)
-            last_node = current.last_node()
-
-            if last_node == destination:
-                return current
+        metric = metric or self.metric
+        kind = "airports" if airports else "points"
+        if method is None:
+            path = self._cached_route(kind, origin_name, destination_name, metric)
+            if path is not _MISSING:
+                return path
+        if airports:
+            path = self.find_airport_route(origin_name, destination_name, metric)
+        else:
+            result = self._route(origin.id, destination.id, metric, method)
+            path = self.make_path(result.nodes, metric) if result else None
+        if method is None:
+            self._cache_route(kind, origin_name, destination_name, metric, path)
+        return path
+
+    def _cached_route(self, kind, origin_name, destination_name, metric):
+        # Ruta cacheada para la versión actual del grafo, o _MISSING. Entre puntos también vale
+        # la del sentido contrario si el grafo es simétrico para la métrica
+        key = (kind, origin_name, destination_name, metric, self.version)
+        cache, backwards = self.route_cache, False
+        if kind == "points" and key not in cache:
+            reverse = (kind, destination_name, origin_name, metric, self.version)
+            if reverse in cache and self.components.symmetric() and self.adjacency.is_symmetric(metric):
+                key, backwards = reverse, True
+        path = cache.get(key, _MISSING)
+        if path is _MISSING:
+            return self._stored_route(kind, origin_name, destination_name, metric)
+        self.last_expanded = 0
+        if path is None:
+            return None
+        return path.reversed() if backwards else path.copy()
+
+    def _stored_route(self, kind, origin_name, destination_name, metric):
+        # Ruta de una sesión anterior: se reconstruye desde los números de sus puntos, sin buscar
+        store = self._usable_store(metric)
+        numbers = store.get(metric, kind, origin_name, destination_name) if store is not None else None
+        if numbers is None:
+            return _MISSING
+        path = self.make_path([self.nav_points[number].id for number in numbers], metric) if numbers else None
+        self.route_cache.put((kind, origin_name, destination_name, metric, self.version), path and path.copy())
+        self.last_expanded = 0
+        return path
+
+    def _cache_route(self, kind, origin_name, destination_name, metric, path):
+        # Se guarda una copia: quien recibe la ruta puede modificarla. El almacén persistente
+        # se escribe en segundo plano
+        self.route_cache.put((kind, origin_name, destination_name, metric, self.version),
+                             path and path.copy())
+        store = self._usable_store(metric)
+        if store is not None:
+            store.put(metric, kind, origin_name, destination_name, [p.number for p in path.nodes] if path else [])
+
+    def _route(self, source, target, metric, method=None):
+        if self._reachable(source, target) is False:
+            # Componentes distintas: sin ruta, y sin agotar la búsqueda para descubrirlo
+            self.last_expanded = 0
+            return routing.RouteResult(float('inf'), [], 0)
+        adjacency = self.adjacency
+        if method is None:
+            if metric in self.hierarchies:
+                method = "ch"
+            elif metric in self.landmark_sets:
+                method = "alt"
+            else:
+                method = "astar"
+
+        if method == "ch":
+            hierarchy = self.hierarchies.get(metric) or self.prepare_hierarchy(metric)
+            result = hierarchy.query(source, target)
+        elif method == "astar":
+            result = routing.astar(adjacency, source, target,
+                                   adjacency.heuristic_to(target, metric),
+                                   adjacency.metric_weights(metric))
+        elif method == "bidirectional":
+            # Potencial medio de las cotas ortodrómicas hacia el destino y desde el origen
+            to_target = adjacency.heuristic_to(target, metric)
+            from_source = adjacency.heuristic_to(source, metric)
+            result = routing.bidirectional(adjacency, adjacency.reverse(metric), source, target,
+                                           adjacency.metric_weights(metric),
+                                           lambda node: 0.5 * (to_target(node) - from_source(node)))
+        elif method == "alt":
+            # Cota ALT combinada con la ortodrómica: el máximo de dos cotas inferiores también lo es
+            landmark_bound = self._prepared_landmarks(metric).heuristic_to(target, source=source)
+            circle_bound = adjacency.heuristic_to(target, metric)
+            result = routing.astar(adjacency, source, target,
+                                   lambda node: max(landmark_bound(node), circle_bound(node)),
+                                   adjacency.metric_weights(metric))
+        else:
+            raise ValueError(f"Unknown routing method: {method}")
+        self.last_expanded = result.expanded
+        return result
 
-            for neighbor in last_node.neighbors:
-                if neighbor in current.nodes:
-                    continue
-                cost_so_far = current.cost + last_node.distance_to(neighbor)
-                estimated_remaining = neighbor.distance_to(destination)
-                new_path = Path(current.nodes + [neighbor], cost_so_far, estimated_remaining)
-                current_paths.append(new_path)
+    def shortest_path_tree(self, origin_name, metric=None):
+        # Un único Dijkstra por origen, reutilizado para todos los destinos (y cacheado)
+        origin = self.find_point_by_name(origin_name)
+        if not origin:
+            return None
+        metric = metric or self.metric
+        key = (origin.id, metric)
+        tree = self.tree_cache.get(key)
+        if tree is None:
+            adjacency = self.adjacency
+            tree = routing.ShortestPathTree(adjacency, origin.id, adjacency.metric_weights(metric), metric)
+            self.tree_cache.put(key, tree)
+        return tree
+
+    def k_shortest_paths(self, origin_name, destination_name, k=5, metric=None):
+        # Hasta k rutas alternativas sin ciclos, en orden de coste. El árbol inverso hacia el
+        # destino se calcula una vez (y se cachea) y guía todas las búsquedas de desvío
+        origin = self.find_point_by_name(origin_name)
+        destination = self.find_point_by_name(destination_name)
+        if not origin or not destination or self._reachable(origin.id, destination.id) is False:
+            return []
+        metric = metric or self.metric
+        adjacency = self.adjacency
+        key = (("to", destination.id), metric)
+        tree = self.tree_cache.get(key)
+        if tree is None:
+            reverse = adjacency.reverse(metric)
+            tree = routing.ShortestPathTree(reverse, destination.id, reverse.weights, metric)
+            self.tree_cache.put(key, tree)
+
+        routes = routing.k_shortest(adjacency, origin.id, destination.id, k, tree.dist,
+                                    adjacency.metric_weights(metric))
+        self.last_expanded = routes[-1].expanded if routes else 0
+        return [self.make_path(route.nodes, metric) for route in routes]
+
+    def paths_from(self, origin_name, destination_names, metric=None):
+        # Rutas desde un origen a muchos destinos: {nombre destino: Path o None}
+        tree = self.shortest_path_tree(origin_name, metric)
+        paths = {}
+        for name in destination_names:
+            destination = self.find_point_by_name(name)
+            route = tree.route_to(destination.id) if tree and destination else None
+            paths[name] = self.make_path(route.nodes, tree.metric) if route else None
+        return paths
+
+    def _procedure_ids(self, points):
+        # Los aeropuertos de un grafo guardado llevan un punto ficticio que no está en la red
+        return [p.id for p in points if p.airspace is self]
+
+    def find_airport_route(self, origin_airport, destination_airport, metric=None):
+        # Una sola búsqueda desde todas las SID del origen hasta la primera STAR del destino
+        origin = self.nav_airports.get(origin_airport)
+        destination = self.nav_airports.get(destination_airport)
+        if not origin or not destination:
+            return None
+        sources = self._procedure_ids(origin.sids)
+        goals = self._procedure_ids(destination.stars)
+        goal_roots = {self.components.find(goal) for goal in goals}
+        sources = [source for source in sources if self.components.find(source) in goal_roots]
+        if not sources or not goals:
+            return None
 
-        return None
+        metric = metric or self.metric
+        adjacency = self.adjacency
+        bounds = [adjacency.heuristic_to(goal, metric) for goal in goals]
+        if len(bounds) == 1:
+            heuristic = bounds[0]
+        else:
+            heuristic = lambda node: min(bound(node) for bound in bounds)
+        result = routing.multi_source(adjacency, sources, goals, heuristic,
+                                      adjacency.metric_weights(metric))
+        self.last_expanded = result.expanded
+        if not result:
+            return None
+        return self.make_path(result.nodes, metric)
+
+    def airport_paths_from(self, origin_airport, destination_airports, metric=None):
+        # Árbol sembrado con todas las SID del origen; a cada destino se llega por su mejor STAR
+        metric = metric or self.metric
+        paths = {name: self._cached_route("airports", origin_airport, name, metric)
+                 for name in destination_airports}
+        missing = [name for name, path in paths.items() if path is _MISSING]
+        if not missing:
+            return paths
+
+        origin = self.nav_airports.get(origin_airport)
+        sources = self._procedure_ids(origin.sids) if origin else []
+        tree = None
+        if sources:
+            key = (origin_airport, metric)
+            tree = self.tree_cache.get(key)
+            if tree is None:
+                adjacency = self.adjacency
+                tree = routing.ShortestPathTree(adjacency, sources, adjacency.metric_weights(metric), metric)
+                self.tree_cache.put(key, tree)
+
+        for name in missing:
+            destination = self.nav_airports.get(name)
+            goals = self._procedure_ids(destination.stars) if destination else []
+            route = tree.best_route_to(goals) if tree else None
+            paths[name] = self.make_path(route.nodes, metric) if route else None
+            self._cache_route("airports", origin_airport, name, metric, paths[name])
+        return paths
+
+    def plan_flight(self, waypoints, metric=None, processes=1):
+        # Ruta por varios waypoints: cada tramo consecutivo se calcula una vez y se cachea,
+        # así al editar un waypoint solo se recalculan los dos tramos afectados
+        points = [self.find_point_by_name(name) for name in waypoints]
+        if len(points) < 2 or not all(points):
+            return None
+        metric = metric or self.metric
+
+        legs = [(a.id, b.id, metric) for a, b in zip(points, points[1:])]
+        missing = [leg for leg in dict.fromkeys(legs) if leg not in self.leg_cache]
+        if processes > 1 and len(missing) > 1:
+            # Tramos independientes en paralelo
+            pairs = [(self.point_list[a].name, self.point_list[b].name) for a, b, _ in missing]
+            for result in self.route_batch(pairs, processes, chunk_size=1, metric=metric):
+                if result.path:
+                    route = routing.RouteResult(result.cost, [p.id for p in result.path.nodes], 0)
+                else:
+                    route = routing.RouteResult(float('inf'), [], 0)
+                self.leg_cache.put(missing[result.index], route)
+        else:
+            for leg in missing:
+                self.leg_cache.put(leg, self._route(leg[0], leg[1], metric))
+
+        node_ids = [points[0].id]
+        for leg in legs:
+            route = self.leg_cache.get(leg)
+            if not route:
+                return None
+            node_ids.extend(route.nodes[1:])  # sin repetir el punto de unión
+        return self.make_path(node_ids, metric)
+
+    def route_batch(self, pairs, processes=None, chunk_size=256, ordered=True, metric=None):
+        # Rutas para muchos pares (origen, destino) repartidas en un pool de procesos
+        return batch_routing.route_batch(self, pairs, processes, chunk_size, ordered, metric)
+
+    def make_path(self, node_ids, metric=None):
+        adjacency = self.adjacency
+        metric = metric or self.metric
+        path = Path([self.point_list[node_ids[0]]])
+        for previous, node in zip(node_ids, node_ids[1:]):
+            path.add_node(self.point_list[node], adjacency.weight(previous, node, metric))
+        return path
 
     def add_segment(self, origin_number, destination_number):
+        # Acepta números o NavPoints; los puntos nuevos se registran en los índices
+        origin_number = self._point_number(origin_number)
+        destination_number = self._point_number(destination_number)
         if origin_number in self.nav_points and destination_number in self.nav_points:
             origin = self.nav_points[origin_number]
             destination = self.nav_points[destination_number]
@@ -202,11 +1060,126 @@ class AirSpace:
                                                 origin_point=origin, destination_point=destination))
 
             # Esto añade los vecinos correctamente
-            origin.add_neighbor(destination)
-            destination.add_neighbor(origin)
-
-
-    def draw(self, highlight_nodes=None, highlight_path=None):
+            self._connect(origin, destination)
+
+    def close_segment(self, origin, destination):
+        # Cierra el segmento en los dos sentidos (números o NavPoints) sin reconstruir el grafo:
+        # sus aristas quedan con peso inf. Las rutas cacheadas que lo usaban se reparan con
+        # IncrementalRoute y el resto se conserva. False si no existe o ya estaba cerrado
+        return self._set_closed(self._segment_edges(origin, destination), True)
+
+    def reopen_segment(self, origin, destination):
+        return self._set_closed(self._segment_edges(origin, destination), False)
+
+    def _segment_edges(self, origin, destination):
+        ids = []
+        for point in (origin, destination):
+            if not isinstance(point, NavPoint):
+                point = self.nav_points.get(point)
+            if point is None or point.airspace is not self:
+                return []
+            ids.append(point.id)
+        u, v = ids
+        edge_set = self._edges()
+        return [edge for edge in ((u, v), (v, u)) if edge in edge_set]
+
+    def _set_closed(self, edges, closed):
+        edges = {edge for edge in edges if (edge in self.closed_segments) != closed}
+        if not edges:
+            return False
+        adjacency = self.adjacency  # construida antes de cambiar closed_segments
+        if closed:
+            self.closed_segments |= edges
+        else:
+            self.closed_segments -= edges
+        changed = adjacency.close_edges(edges, closed)
+
+        # Misma topología, otros pesos: las jerarquías personalizadas y los árboles cacheados
+        # dejan de valer (el orden de contracción y los landmarks elegidos se conservan). Las
+        # cotas ALT siguen siendo inferiores mientras los pesos solo suban
+        previous = self.version
+        self.version += 1
+        self.hierarchies.clear()
+        if not closed:
+            self.landmark_sets.clear()
+        self.tree_cache.clear()
+        self.leg_cache.clear()
+        for (_, _, metric), state in self.route_repairs.items():
+            state.update(changed, adjacency.metric_weights(metric))
+        self._repair_routes(previous, edges, closed)
+        return True
+
+    def _repair_routes(self, previous, edges, closed):
+        # Las rutas cacheadas en la versión anterior pasan a la nueva sin buscar si el cambio no
+        # las puede afectar; las demás se reparan
+        kept = repaired = 0
+        through = {}  # métrica -> distancias por las aristas reabiertas (ver _reopened_bounds)
+        for key, path in self.route_cache.items():
+            kind, origin_name, destination_name, metric, version = key
+            if version != previous:
+                continue
+            self.route_cache.pop(key)
+            if closed:
+                # Al cerrar solo suben costes: una ruta que no usa lo cerrado sigue siendo la mejor
+                affected = path is not None and any((u.id, v.id) in edges
+                                                    for u, v in zip(path.nodes, path.nodes[1:]))
+            else:
+                if metric not in through:
+                    through[metric] = self._reopened_bounds(edges, metric)
+                affected = self._improves(kind, origin_name, destination_name, path, through[metric])
+            if affected:
+                path = self._repaired_route(kind, origin_name, destination_name, metric)
+                repaired += 1
+            else:
+                kept += 1
+            self.route_cache.put((kind, origin_name, destination_name, metric, self.version), path)
+        self.last_repair = (kept, repaired)
+
+    def _reopened_bounds(self, edges, metric):
+        # Por cada arista reabierta u -> v: distancia de todos los nodos a u (Dijkstra sobre el
+        # grafo invertido), su peso y distancia de v a todos. Dos árboles por arista, no por ruta
+        adjacency = self.adjacency
+        weights = adjacency.metric_weights(metric)
+        reverse = adjacency.reverse(metric)
+        return [(routing.dijkstra(reverse, u)[0], weights[adjacency.edge_index(u, v)],
+                 routing.dijkstra(adjacency, v, weights)[0]) for u, v in edges]
+
+    def _improves(self, kind, origin_name, destination_name, path, through):
+        # Al reabrir, una ruta (o la falta de ruta) solo puede mejorar pasando por una arista
+        # reabierta: origen -> u -> v -> destino con las distancias exactas del grafo actual
+        if kind == "airports":
+            sources = self._procedure_ids(self.nav_airports[origin_name].sids)
+            goals = self._procedure_ids(self.nav_airports[destination_name].stars)
+        else:
+            sources = [self.find_point_by_name(origin_name).id]
+            goals = [self.find_point_by_name(destination_name).id]
+        cost = path.cost if path is not None else float('inf')
+        return any(min(to_u[s] for s in sources) + weight + min(from_v[t] for t in goals) < cost
+                   for to_u, weight, from_v in through if sources and goals)
+
+    def _repaired_route(self, kind, origin_name, destination_name, metric):
+        if kind == "airports":
+            return self.find_airport_route(origin_name, destination_name, metric)
+        source = self.find_point_by_name(origin_name).id
+        target = self.find_point_by_name(destination_name).id
+        state = self.route_repairs.get((source, target, metric))
+        if state is None:
+            adjacency = self.adjacency
+            state = routing.IncrementalRoute(adjacency, source, target, adjacency.heuristic_to(target, metric),
+                                             adjacency.metric_weights(metric))
+            self.route_repairs.put((source, target, metric), state)
+        result = state.compute()
+        return self.make_path(result.nodes, metric) if result else None
+
+    def _point_number(self, point):
+        if isinstance(point, NavPoint):
+            if point.number not in self.nav_points:
+                self.add_point(point)
+            return point.number
+        return point
+
+    def draw(self, highlight_nodes=None, highlight_path=None, bbox=None):
+        # bbox = (min_lat, min_lon, max_lat, max_lon): solo se dibuja lo que corta la caja
         if not self.nav_points:
             print("No navigation points to display")
             return
@@ -216,30 +1189,33 @@ class AirSpace:
         else:
             self.ax.clear()
 
-        lons = [p.longitude for p in self.nav_points.values()]
-        lats = [p.latitude for p in self.nav_points.values()]
+        if bbox:
+            points = [self.point_list[node] for node in self.points_in_bbox(*bbox)]
+            lats, lons = [bbox[0], bbox[2]], [bbox[1], bbox[3]]
+            xs, ys = self.adjacency.segment_lines(edges=self.segments_in_bbox(*bbox))
+        else:
+            points = self.point_list
+            lons = [p.longitude for p in self.nav_points.values()]
+            lats = [p.latitude for p in self.nav_points.values()]
+            xs, ys = self.adjacency.segment_lines()
 
         lon_margin = (max(lons) - min(lons)) * 0.05 or 0.1
         lat_margin = (max(lats) - min(lats)) * 0.05 or 0.1
         self.ax.set_xlim(min(lons) - lon_margin, max(lons) + lon_margin)
         self.ax.set_ylim(min(lats) - lat_margin, max(lats) + lat_margin)
 
-        for segment in self.nav_segments:
-            origin = self.nav_points.get(segment.origin_number)
-            dest = self.nav_points.get(segment.destination_number)
-            if origin and dest:
-                self.ax.plot([origin.longitude, dest.longitude],
-                             [origin.latitude, dest.latitude],
-                             color='gray', alpha=0.5, linewidth=0.5)
-
-        for point in self.nav_points.values():
+        self.ax.plot(xs, ys, color='gray', alpha=0.5, linewidth=0.5)
+
+        highlight_ids = {p.id for p in highlight_nodes} if highlight_nodes else set()
+        path_ids = {p.id for p in highlight_path} if highlight_path else set()
+        for point in points:
             color = 'blue'
             size = 4
 
-            if highlight_nodes and point in highlight_nodes:
+            if point.id in highlight_ids:
                 color = 'red'
                 size = 6
-            elif highlight_path and point in highlight_path:
+            elif point.id in path_ids:
                 if point == highlight_path[0]:
                     color = 'green'  # Start point
                 elif point == highlight_path[-1]:
@@ -412,17 +1388,23 @@ class AirSpace:
         add_text(icon2, 'http://maps.google.com/mapfiles/kml/shapes/airports.png')
         SubElement(icon_style2, 'scale').text = "1.1"
 
-        # Choose 6 random airport pairs
-        airports = list(self.nav_airports.values())
-        used = set()
+        # Choose 6 random airport pairs entre los que tienen ruta: candidatos en la misma
+        # componente, barajados, y se toman los primeros con ruta (los pares con el mismo origen
+        # comparten un único árbol). Con menos pares enrutables salen menos vuelos
+        airports = [a for a in self.nav_airports.values()
+                    if self._procedure_ids(a.sids) and self._procedure_ids(a.stars)]
+        labels = self.components.labels()
+        sid_labels = {a.name: {labels[node] for node in self._procedure_ids(a.sids)} for a in airports}
+        candidates = [(o, d) for o in airports for d in airports
+                      if o is not d and any(labels[node] in sid_labels[o.name] for node in self._procedure_ids(d.stars))]
+        random.shuffle(candidates)
         pairs = []
-        while len(pairs) < num_flights:
-            o, d = random.sample(airports, 2)
-            if (o.name, d.name) not in used:
-                path = self.find_shortest_path(o.name, d.name)
-                if path:
-                    used.add((o.name, d.name))
-                    pairs.append((o, d, path))
+        for o, d in candidates:
+            if len(pairs) == num_flights:
+                break
+            path = self.airport_paths_from(o.name, [d.name])[d.name]
+            if path:
+                pairs.append((o, d, path))
 
         start_time = datetime.utcnow()
 
@@ -435,11 +1417,10 @@ class AirSpace:
             track = SubElement(pmark, '{http://www.google.com/kml/ext/2.2}Track')
             timestamp = start_time
 
-            for node_name in path:
-                node = self.nav_points[node_name]
+            for node in path.nodes:
                 coord = f"{node.longitude},{node.latitude},10000"
                 add_text(SubElement(track, '{http://www.google.com/kml/ext/2.2}when'), timestamp.isoformat() + "Z")
-                add_text(SubElement(track, '{http://www.google.com/kml/ext/2.2}gx:coord'), coord)
+                add_text(SubElement(track, '{http://www.google.com/kml/ext/2.2}coord'), coord)
                 timestamp += timedelta(seconds=10)  # 10s between points
 
         # Add radars at 5 random points
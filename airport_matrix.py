@@ -0,0 +1,265 @@
+import argparse
+import csv
+import os
+import struct
+import sys
+import multiprocessing
+from array import array
+from path import Path
+import routing
+
+# Estado de solo lectura de los trabajadores: (adjacency, métrica, fuentes de cada origen,
+# STAR de cada destino). Igual que en batch_routing: solo lo escribe el inicializador de cada
+# trabajador (heredado con "fork", enviado una vez con "spawn"), nunca el proceso que llama
+_shared = None
+
+
+def _init_worker(state):
+    global _shared
+    _shared = state
+
+
+def _matrix_row(origin):
+    return _matrix_row_with(_shared, origin)
+
+
+def _matrix_row_with(state, origin):
+    # Un único Dijkstra sembrado con las SID del origen; a cada destino se llega por su STAR
+    # más cercana (la primera en caso de empate, como ShortestPathTree.best_route_to)
+    adjacency, metric, sources, stars = state
+    inf = float('inf')
+    if not sources[origin]:
+        return origin, array('d', [inf]) * len(stars), array('l', [-1]) * len(stars), None
+    dist, parent = routing.dijkstra(adjacency, sources[origin], adjacency.metric_weights(metric))
+    row, goals = array('d'), array('l')
+    for targets in stars:
+        best = min(targets, key=dist.__getitem__, default=-1)
+        reached = best != -1 and dist[best] != inf
+        row.append(dist[best] if reached else inf)
+        goals.append(best if reached else -1)
+    return origin, row, goals, parent
+
+
+def _edge_changes(old, old_weights, new, new_weights):
+    # Aristas (u, v, peso) de new que no están en old con el mismo peso, y al revés. Una arista
+    # cerrada o reabierta aparece como quitada con un peso y añadida con el otro
+    added, removed = [], []
+    for u in range(max(old.node_count, new.node_count)):
+        before = ({(old.targets[k], old_weights[k]) for k in range(old.offsets[u], old.offsets[u + 1])}
+                  if u < old.node_count else set())
+        after = ({(new.targets[k], new_weights[k]) for k in range(new.offsets[u], new.offsets[u + 1])}
+                 if u < new.node_count else set())
+        if before != after:
+            added.extend((u, v, w) for v, w in after - before)
+            removed.extend((u, v, w) for v, w in before - after)
+    return added, removed
+
+
+def _write_npy(filename, values, shape):
+    # Formato .npy 1.0 (float64 little-endian, orden C) escrito sin depender de NumPy
+    header = f"{{'descr': '<f8', 'fortran_order': False, 'shape': {shape}, }}"
+    header += " " * (-(10 + len(header) + 1) % 64) + "\n"
+    if sys.byteorder != "little":
+        values = array('d', values)
+        values.byteswap()
+    with open(filename, 'wb') as f:
+        f.write(b"\x93NUMPY\x01\x00" + struct.pack('<H', len(header)) + header.encode('latin1'))
+        values.tofile(f)
+
+
+class AirportMatrix:
+    # Distancias entre todos los pares de aeropuertos (fila = origen, columna = destino) en un
+    # array plano; las rutas, como el array de predecesores del árbol de cada origen más la
+    # STAR por la que se llega a cada destino. Conserva la adyacencia y los pesos con los que
+    # se calculó para que refresh solo recalcule los orígenes afectados por los cambios del
+    # grafo (segmentos nuevos, cerrados o reabiertos)
+    def __init__(self, airspace, metric=None):
+        self.airspace = airspace
+        self.metric = metric or airspace.metric
+        self._reset()
+
+    def _reset(self):
+        self.airports = list(self.airspace.nav_airports)
+        self.index = {code: i for i, code in enumerate(self.airports)}
+        size = len(self.airports)
+        self.distances = array('d', [float('inf')]) * (size * size)
+        self.goals = array('l', [-1]) * (size * size)  # STAR de llegada de cada par (-1: sin ruta)
+        self.parents = [None] * size  # predecesores del árbol de cada origen (None: sin SID)
+        self.sources, self.stars = self._procedures()
+        self.adjacency = None
+        self.weights = None
+        self.version = None
+        self.recomputed = 0  # orígenes recalculados en el último compute o refresh
+
+    @classmethod
+    def compute(cls, airspace, metric=None, processes=None):
+        # Un árbol por aeropuerto de origen, repartidos en un pool de procesos
+        matrix = cls(airspace, metric)
+        matrix._compute_rows(range(len(matrix.airports)), processes)
+        return matrix
+
+    def _procedures(self):
+        airspace = self.airspace
+        airports = [airspace.nav_airports[code] for code in self.airports]
+        return ([airspace._procedure_ids(a.sids) for a in airports],
+                [airspace._procedure_ids(a.stars) for a in airports])
+
+    def _compute_rows(self, origins, processes=None):
+        origins = list(origins)
+        adjacency = self.airspace.adjacency
+        state = (adjacency, self.metric, self.sources, self.stars)
+        processes = min(processes or os.cpu_count() or 1, max(len(origins), 1))
+        size = len(self.airports)
+
+        pool = None
+        if processes == 1:
+            rows = (_matrix_row_with(state, origin) for origin in origins)
+        else:
+            if "fork" in multiprocessing.get_all_start_methods():
+                pool = multiprocessing.get_context("fork").Pool(processes, initializer=_init_worker,
+                                                                initargs=(state,))
+            else:
+                pool = multiprocessing.Pool(processes, initializer=_init_worker, initargs=(state,))
+            rows = pool.imap_unordered(_matrix_row, origins)
+        try:
+            for origin, row, goals, parent in rows:
+                self.distances[origin * size:(origin + 1) * size] = row
+                self.goals[origin * size:(origin + 1) * size] = goals
+                self.parents[origin] = parent
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+        self.adjacency = adjacency
+        self.weights = adjacency.metric_weights(self.metric)
+        self.version = self.airspace.version
+        self.recomputed = len(origins)
+
+    def is_stale(self):
+        return self.version != self.airspace.version
+
+    def refresh(self, processes=None):
+        # Tras editar el grafo recalcula solo los orígenes cuyo árbol puede cambiar: los que
+        # usan una arista quitada (o con otro peso) y aquellos en los que una arista nueva
+        # acorta el camino a algún nodo. Si cambian los aeropuertos o sus procedimientos se
+        # recalcula todo. Devuelve el número de orígenes recalculados
+        if not self.is_stale():
+            self.recomputed = 0
+            return 0
+        if list(self.airspace.nav_airports) != self.airports or self._procedures() != (self.sources, self.stars):
+            self._reset()
+            self._compute_rows(range(len(self.airports)), processes)
+            return self.recomputed
+
+        adjacency = self.airspace.adjacency
+        added, removed = _edge_changes(self.adjacency, self.weights, adjacency, adjacency.metric_weights(self.metric))
+        stale = []
+        for origin, parent in enumerate(self.parents):
+            if parent is None:
+                continue  # sin SID en la red: no depende de las aristas
+            if any(v < len(parent) and parent[v] == u for u, v, _ in removed):
+                stale.append(origin)
+                continue
+            distance = self._tree_distance(origin)
+            if any(distance(u) + w < distance(v) for u, v, w in added):
+                stale.append(origin)
+        self._compute_rows(stale, processes)
+        return self.recomputed
+
+    def _tree_distance(self, origin):
+        # Distancia de cada nodo en el árbol guardado, sumando los pesos de su cadena de
+        # predecesores en el mismo orden que Dijkstra (mismo resultado en coma flotante)
+        parent, adjacency, weights = self.parents[origin], self.adjacency, self.weights
+        sources = set(self.sources[origin])
+        known = {}
+
+        def distance(node):
+            if node >= len(parent):
+                return float('inf')  # nodo añadido después del cálculo
+            chain = []
+            while node not in known:
+                if parent[node] == -1:
+                    known[node] = 0.0 if node in sources else float('inf')
+                    break
+                chain.append(node)
+                node = parent[node]
+            value = known[node]
+            for node in reversed(chain):
+                value += weights[adjacency.edge_index(parent[node], node)]
+                known[node] = value
+            return value
+
+        return distance
+
+    def __len__(self):
+        return len(self.airports)
+
+    def distance(self, origin, destination):
+        # Coste mínimo entre dos aeropuertos (inf si no hay ruta, None si alguno no existe)
+        i, j = self.index.get(origin), self.index.get(destination)
+        if i is None or j is None:
+            return None
+        return self.distances[i * len(self.airports) + j]
+
+    def route_nodes(self, origin, destination):
+        i, j = self.index.get(origin), self.index.get(destination)
+        if i is None or j is None:
+            return None
+        goal = self.goals[i * len(self.airports) + j]
+        return routing.reconstruct(self.parents[i], goal) if goal != -1 else None
+
+    def route(self, origin, destination):
+        # Path de la ruta guardada, con los pesos del grafo sobre el que se calculó
+        nodes = self.route_nodes(origin, destination)
+        if nodes is None:
+            return None
+        points = self.airspace.point_list
+        path = Path([points[nodes[0]]])
+        for previous, node in zip(nodes, nodes[1:]):
+            path.add_node(points[node], self.weights[self.adjacency.edge_index(previous, node)])
+        return path
+
+    def to_csv(self, filename):
+        # Una fila por origen y una columna por destino; vacío si no hay ruta
+        size = len(self.airports)
+        with open(filename, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["origin"] + self.airports)
+            for i, code in enumerate(self.airports):
+                row = self.distances[i * size:(i + 1) * size]
+                writer.writerow([code] + [f"{d:.6f}" if d != float('inf') else "" for d in row])
+
+    def to_npy(self, filename):
+        # Matriz float64 (n, n) con inf donde no hay ruta; filas y columnas en el orden de airports
+        _write_npy(filename, self.distances, (len(self.airports), len(self.airports)))
+
+    def __repr__(self):
+        return f"AirportMatrix({len(self.airports)} airports, metric={self.metric})"
+
+
+def main(argv=None):
+    from airSpace import AirSpace
+    parser = argparse.ArgumentParser(description="Precompute the airport-to-airport distance matrix")
+    parser.add_argument("nav_file")
+    parser.add_argument("seg_file")
+    parser.add_argument("airport_file")
+    parser.add_argument("--metric", default=None, help="great_circle (default) or file")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--csv", help="write the distances as CSV")
+    parser.add_argument("--npy", help="write the distances as a NumPy .npy file")
+    args = parser.parse_args(argv)
+
+    airspace = AirSpace()
+    airspace.load_from_files(args.nav_file, args.seg_file, args.airport_file)
+    matrix = AirportMatrix.compute(airspace, args.metric, args.processes)
+    reachable = sum(d != float('inf') for d in matrix.distances)
+    print(f"{len(matrix)} airports, {reachable}/{len(matrix.distances)} pairs with a route")
+    if args.csv:
+        matrix.to_csv(args.csv)
+    if args.npy:
+        matrix.to_npy(args.npy)
+    return matrix
+
+
+if __name__ == "__main__":
+    main()
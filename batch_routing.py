@@ -0,0 +1,119 @@
+import os
+import multiprocessing
+from itertools import islice
+import routing
+
+# Estado de solo lectura de los procesos trabajadores: (adjacency, nombre -> id, métrica,
+# componente de cada nodo). Con un MappedAirSpace cada trabajador mapea el snapshot.
+# Solo lo escribe el inicializador, dentro de cada trabajador: con "fork" el estado se
+# hereda sin copiarse por tarea y con "spawn" se envía una vez por trabajador. El proceso
+# que llama nunca lo toca, así que varios lotes pueden estar abiertos a la vez
+_shared = None
+
+
+class BatchResult:
+    def __init__(self, index, origin, destination, path=None, cost=None, error=None):
+        self.index = index  # posición del par en la entrada
+        self.origin = origin
+        self.destination = destination
+        self.path = path
+        self.cost = cost
+        self.error = error
+
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        if self.error:
+            return f"BatchResult({self.origin} → {self.destination}, error={self.error!r})"
+        return f"BatchResult({self.origin} → {self.destination}, cost={self.cost:.2f})"
+
+
+def _init_worker(state):
+    global _shared
+    _shared = state
+
+
+def _init_mapped(opener, filename, metric):
+    # Cada trabajador mapea el snapshot por su cuenta: comparten las páginas del fichero
+    global _shared
+    mapped = opener(filename)
+    _shared = (mapped.adjacency, mapped.names, metric, mapped.labels)
+
+
+def _route_chunk(chunk):
+    return _route_chunk_with(_shared, chunk)
+
+
+def _route_chunk_with(state, chunk):
+    adjacency, index, metric, labels = state
+    weights = adjacency.metric_weights(metric)
+    results = []
+    for position, origin, destination in chunk:
+        try:
+            source = index.get(origin)
+            target = index.get(destination)
+            if source is None or target is None:
+                missing = origin if source is None else destination
+                results.append((position, origin, destination, None, None, f"unknown point {missing}"))
+                continue
+            if labels[source] != labels[target]:
+                results.append((position, origin, destination, None, None, "no route"))
+                continue
+            route = routing.astar(adjacency, source, target, adjacency.heuristic_to(target, metric), weights)
+            if route:
+                results.append((position, origin, destination, route.nodes, route.cost, None))
+            else:
+                results.append((position, origin, destination, None, None, "no route"))
+        except Exception as e:
+            results.append((position, origin, destination, None, None, f"{type(e).__name__}: {e}"))
+    return results
+
+
+def _chunks(pairs, chunk_size):
+    iterator = enumerate(pairs)
+    while True:
+        chunk = [(position, origin, destination) for position, (origin, destination)
+                 in islice(iterator, chunk_size)]
+        if not chunk:
+            return
+        yield chunk
+
+
+def route_batch(airspace, pairs, processes=None, chunk_size=256, ordered=True, metric=None):
+    # Genera un BatchResult por cada par (origen, destino); los fallos se informan por par
+    metric = metric or airspace.metric
+    filename = getattr(airspace, "filename", None)  # MappedAirSpace: los trabajadores abren el fichero
+    if filename:
+        state = (airspace.adjacency, airspace.names, metric, airspace.labels)
+    else:
+        index = {name: point.id for name, point in airspace.name_index.items()}
+        state = (airspace.adjacency, index, metric, airspace.components.labels())
+    processes = processes or os.cpu_count() or 1
+
+    def to_result(item):
+        position, origin, destination, nodes, cost, error = item
+        path = airspace.make_path(nodes, metric) if nodes else None
+        return BatchResult(position, origin, destination, path, cost, error)
+
+    if processes == 1:
+        for chunk in _chunks(pairs, chunk_size):
+            for item in _route_chunk_with(state, chunk):
+                yield to_result(item)
+        return
+
+    if filename:
+        pool = multiprocessing.Pool(processes, initializer=_init_mapped,
+                                    initargs=(type(airspace), filename, metric))
+    elif "fork" in multiprocessing.get_all_start_methods():
+        # Con fork los argumentos del inicializador se heredan, no se serializan
+        context = multiprocessing.get_context("fork")
+        pool = context.Pool(processes, initializer=_init_worker, initargs=(state,))
+    else:
+        pool = multiprocessing.Pool(processes, initializer=_init_worker, initargs=(state,))
+
+    with pool:
+        mapper = pool.imap if ordered else pool.imap_unordered
+        for results in mapper(_route_chunk, _chunks(pairs, chunk_size)):
+            for item in results:
+                yield to_result(item)
@@ -0,0 +1,1073 @@
+import os
+import sys
+import time
+import heapq
+import tracemalloc
+import tempfile
+import random
+from airSpace import AirSpace
+from path import Path
+from navPoint import NavPoint
+from navSegment import NavSegment
+from spatial import GridIndex
+from graph import Graph
+from cache import LRUCache
+from node import Node
+import routing
+
+DATASETS = {
+    "Cat": ("Cat_nav.txt", "Cat_seg.txt", "Cat_aer.txt"),
+    "Spain": ("Spain_nav.txt", "Spain_seg.txt", "Spain_aer.txt"),
+    "ECAC": ("ECAC_nav.txt", "ECAC_seg.txt", "ECAC_aer.txt"),
+}
+
+
+def load(dataset):
+    airspace = AirSpace()
+    airspace.load_from_files(*DATASETS[dataset])
+    return airspace
+
+
+def random_pairs(airspace, count, seed=2025):
+    # Pares conectados, tomados de la componente más grande del grafo
+    rng = random.Random(seed)
+    names = sorted(p.name for p in airspace.nav_points.values())
+    component = []
+    while len(component) < len(names) // 4:
+        component = airspace.reachable_nodes(rng.choice(names))
+    component = sorted(p.name for p in component)
+    return [tuple(rng.sample(component, 2)) for _ in range(count)]
+
+
+def legacy_shortest_path(airspace, origin_name, destination_name, max_expansions=200000):
+    # Algoritmo original: lista de Path completos, sort + pop(0) y sin conjunto cerrado
+    origin = airspace.find_point_by_name(origin_name)
+    destination = airspace.find_point_by_name(destination_name)
+    current_paths = [Path([origin], 0, origin.distance_to(destination))]
+    expanded = 0
+
+    while current_paths and expanded < max_expansions:
+        current_paths.sort(key=lambda p: p.total_cost())
+        current = current_paths.pop(0)
+        last_node = current.last_node()
+        expanded += 1
+
+        if last_node == destination:
+            return current, expanded
+
+        for neighbor in last_node.neighbors:
+            if neighbor in current.nodes:
+                continue
+            cost_so_far = current.cost + last_node.distance_to(neighbor)
+            estimated_remaining = neighbor.distance_to(destination)
+            current_paths.append(Path(current.nodes + [neighbor], cost_so_far, estimated_remaining))
+
+    return None, expanded
+
+
+def haversine_astar(airspace, origin_name, destination_name):
+    # A* de objetos que recalcula distance_to en cada relajación y en cada heurística
+    origin = airspace.find_point_by_name(origin_name)
+    destination = airspace.find_point_by_name(destination_name)
+    g_cost = {origin: 0.0}
+    closed = set()
+    open_heap = [(origin.distance_to(destination), 0, origin)]
+    counter = 0
+    while open_heap:
+        _, _, current = heapq.heappop(open_heap)
+        if current == destination:
+            return g_cost[current]
+        if current in closed:
+            continue
+        closed.add(current)
+        for neighbor in current.neighbors:
+            new_cost = g_cost[current] + current.distance_to(neighbor)
+            if neighbor not in closed and new_cost < g_cost.get(neighbor, float('inf')):
+                g_cost[neighbor] = new_cost
+                counter += 1
+                heapq.heappush(open_heap, (new_cost + neighbor.distance_to(destination), counter, neighbor))
+    return None
+
+
+def bench_astar(dataset="ECAC", queries=20, max_expansions=20000):
+    airspace = load(dataset)
+    pairs = random_pairs(airspace, queries)
+
+    print(f"\n{dataset}: {queries} queries (legacy capped at {max_expansions} expansions)")
+    print(f"{'origin':>8} {'dest':>8} | {'legacy exp':>10} {'legacy s':>9} | {'heap exp':>8} {'heap s':>8} | match")
+    totals = [0, 0.0, 0, 0.0]
+    for origin, destination in pairs:
+        start = time.perf_counter()
+        old_path, old_expanded = legacy_shortest_path(airspace, origin, destination, max_expansions)
+        old_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        new_path = airspace.find_shortest_path(origin, destination)
+        new_time = time.perf_counter() - start
+
+        if old_path is None:
+            match = "capped" if old_expanded >= max_expansions else ("ok" if new_path is None else "DIFF")
+        else:
+            match = "ok" if new_path and abs(old_path.cost - new_path.cost) < 1e-6 else "DIFF"
+        print(f"{origin:>8} {destination:>8} | {old_expanded:>10} {old_time:>9.4f} | "
+              f"{airspace.last_expanded:>8} {new_time:>8.4f} | {match}")
+        totals[0] += old_expanded
+        totals[1] += old_time
+        totals[2] += airspace.last_expanded
+        totals[3] += new_time
+    print(f"{'total':>17} | {totals[0]:>10} {totals[1]:>9.4f} | {totals[2]:>8} {totals[3]:>8.4f} |")
+
+
+def legacy_reachable(airspace, start_name):
+    # BFS original: lista como cola con pop(0) y lista de visitados
+    start = airspace.find_point_by_name(start_name)
+    visited = []
+    queue = [start]
+    while queue:
+        current = queue.pop(0)
+        if current not in visited:
+            visited.append(current)
+            queue.extend(neighbor for neighbor in current.neighbors if neighbor not in visited)
+    return visited
+
+
+def bench_reachability(dataset="ECAC", queries=50):
+    airspace = load(dataset)
+    rng = random.Random(2025)
+    names = sorted(p.name for p in airspace.nav_points.values())
+    pairs = [tuple(rng.sample(names, 2)) for _ in range(queries)]
+    adjacency = airspace.adjacency
+
+    start = time.perf_counter()
+    legacy = [destination in {p.name for p in legacy_reachable(airspace, origin)}
+              for origin, destination in pairs[:10]]
+    legacy_time = (time.perf_counter() - start) / 10
+    start = time.perf_counter()
+    indexed = [airspace.is_reachable(origin, destination) for origin, destination in pairs]
+    indexed_time = (time.perf_counter() - start) / queries
+
+    start = time.perf_counter()
+    for origin, _ in pairs:
+        reachable = airspace.reachable_nodes(origin)
+        sum(1 for p in airspace.point_list if p in reachable)
+    set_time = (time.perf_counter() - start) / queries
+
+    # Pares en componentes distintas: A* agota su componente antes de rendirse
+    labels = airspace.components.labels()
+    unreachable = [(o, d) for o, d in ((rng.choice(names), rng.choice(names)) for _ in range(5000))
+                   if labels[airspace.name_index[o].id] != labels[airspace.name_index[d].id]][:queries]
+    start = time.perf_counter()
+    for origin, destination in unreachable:
+        source, target = airspace.name_index[origin].id, airspace.name_index[destination].id
+        routing.astar(adjacency, source, target, adjacency.heuristic_to(target))
+    search_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for origin, destination in unreachable:
+        airspace.find_shortest_path(origin, destination)
+    fail_time = time.perf_counter() - start
+
+    print(f"\n{dataset}: {airspace.components.count} components, symmetric={airspace.components.symmetric()}")
+    print(f"  is B reachable from A, list BFS: {legacy_time * 1000:10.3f} ms/query")
+    print(f"  is B reachable from A, index:    {indexed_time * 1000:10.4f} ms/query")
+    print(f"  same answer: {sum(a == b for a, b in zip(legacy, indexed))}/{len(legacy)}")
+    print(f"  reachable set + membership of every point: {set_time * 1000:.3f} ms/query")
+    print(f"  {len(unreachable)} unreachable routes: A* {search_time * 1000:.2f} ms, "
+          f"fail fast {fail_time * 1000:.2f} ms")
+
+
+def bench_adjacency(dataset="ECAC", queries=200):
+    airspace = load(dataset)
+    adjacency = airspace.adjacency
+
+    # Memoria: listas de vecinos por objeto (representación anterior) frente a CSR
+    tracemalloc.start()
+    object_lists = [[airspace.point_list[t] for t in adjacency.neighbors(p.id)]
+                    for p in airspace.point_list]
+    lists_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del object_lists
+    tracemalloc.start()
+    airspace.build_adjacency()
+    csr_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    pairs = random_pairs(airspace, queries)
+    start = time.perf_counter()
+    for origin, destination in pairs:
+        airspace.find_shortest_path(origin, destination)
+    routing_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for origin, _ in pairs:
+        airspace.reachable_nodes(origin)
+    reach_time = time.perf_counter() - start
+
+    print(f"\n{dataset}: {adjacency.node_count} nodes, {adjacency.edge_count()} directed edges")
+    print(f"  neighbour lists: {lists_bytes / 1024:8.1f} KiB")
+    print(f"  CSR arrays:      {adjacency.memory_size() / 1024:8.1f} KiB (build peak {csr_bytes / 1024:.1f} KiB)")
+    print(f"  {queries} routes:      {routing_time * 1000 / queries:8.3f} ms/query")
+    print(f"  {queries} reachability: {reach_time * 1000 / queries:7.3f} ms/query")
+
+
+def bench_weights(dataset="ECAC", queries=200):
+    airspace = load(dataset)
+    pairs = random_pairs(airspace, queries)
+
+    start = time.perf_counter()
+    costs = [haversine_astar(airspace, o, d) for o, d in pairs]
+    haversine_time = time.perf_counter() - start
+
+    print(f"\n{dataset}: {queries} queries")
+    print(f"  haversine per relaxation: {haversine_time * 1000 / queries:8.3f} ms/query")
+    for metric in ("great_circle", "file"):
+        start = time.perf_counter()
+        paths = [airspace.find_shortest_path(o, d, metric=metric) for o, d in pairs]
+        elapsed = time.perf_counter() - start
+        same = sum(abs(p.cost - c) < 1e-6 for p, c in zip(paths, costs))
+        print(f"  precomputed {metric:>12}: {elapsed * 1000 / queries:8.3f} ms/query "
+              f"({same}/{queries} costs equal to haversine)")
+
+
+def airport_pairs(airspace, count, seed=2025):
+    rng = random.Random(seed)
+    airports = [a for a in airspace.nav_airports.values() if a.sids and a.stars]
+    pairs = []
+    while len(pairs) < count:
+        origin, destination = rng.sample(airports, 2)
+        pairs.append((origin.sids[0].name, destination.stars[0].name))
+    return pairs
+
+
+def bench_hierarchy(dataset="ECAC", queries=500):
+    airspace = load(dataset)
+    pairs = airport_pairs(airspace, queries)
+    filename = f"{DATASETS[dataset][0]}.{airspace.metric}.ch"
+
+    start = time.perf_counter()
+    hierarchy = airspace.prepare_hierarchy(filename=False)
+    build_time = time.perf_counter() - start
+    hierarchy.save(filename)
+    airspace.hierarchy = None
+    start = time.perf_counter()
+    airspace.prepare_hierarchy(filename=filename)
+    load_time = time.perf_counter() - start
+
+    timings = {}
+    for method in ("astar", "ch"):
+        start = time.perf_counter()
+        costs = [getattr(airspace.find_shortest_path(o, d, method=method), "cost", None) for o, d in pairs]
+        timings[method] = (time.perf_counter() - start, costs)
+    same = sum(a == b or abs(a - b) < 1e-6 for a, b in zip(timings["astar"][1], timings["ch"][1]))
+
+    print(f"\n{dataset}: {hierarchy.shortcut_count} shortcuts, build {build_time:.2f} s, "
+          f"load from {filename} {load_time * 1000:.1f} ms")
+    for method, (elapsed, _) in timings.items():
+        print(f"  {method:>5}: {elapsed * 1000 / queries:7.3f} ms/query over {queries} airport pairs")
+    print(f"  same cost: {same}/{queries}")
+
+
+def bench_landmarks(dataset="ECAC", queries=300, counts=(8, 16)):
+    airspace = load(dataset)
+    pairs = random_pairs(airspace, queries, seed=3)
+
+    def run(method):
+        expanded = 0
+        start = time.perf_counter()
+        costs = []
+        for origin, destination in pairs:
+            costs.append(airspace.find_shortest_path(origin, destination, method=method).cost)
+            expanded += airspace.last_expanded
+        return expanded, time.perf_counter() - start, costs
+
+    base_expanded, base_time, base_costs = run("astar")
+    print(f"\n{dataset}: {queries} queries")
+    print(f"  {'haversine':>16}: {base_expanded:>7} expanded, {base_time * 1000 / queries:6.3f} ms/query")
+    for strategy in ("farthest", "avoid"):
+        for count in counts:
+            start = time.perf_counter()
+            landmarks = airspace.prepare_landmarks(count, strategy)
+            build_time = time.perf_counter() - start
+            expanded, elapsed, costs = run("alt")
+            same = sum(abs(a - b) < 1e-9 for a, b in zip(base_costs, costs))
+            print(f"  {strategy:>9} k={count:<3}: {expanded:>7} expanded, {elapsed * 1000 / queries:6.3f} ms/query "
+                  f"({100 * expanded / base_expanded:.0f}%), build {build_time:.2f} s, "
+                  f"tables {landmarks.memory_size() / 1024:.0f} KiB, same cost {same}/{queries}")
+
+
+def bench_bidirectional(dataset="ECAC", queries=300):
+    airspace = load(dataset)
+    adjacency = airspace.adjacency
+    pairs = [(airspace.find_point_by_name(o).id, airspace.find_point_by_name(d).id)
+             for o, d in random_pairs(airspace, queries, seed=5)]
+    zero = lambda node: 0.0
+
+    searches = {
+        "dijkstra": lambda s, t: routing.astar(adjacency, s, t, zero),
+        "bidirectional dijkstra": lambda s, t: routing.bidirectional(adjacency, adjacency.reverse(), s, t),
+        "astar": lambda s, t: routing.astar(adjacency, s, t, adjacency.heuristic_to(t)),
+        "bidirectional astar": lambda s, t: routing.bidirectional(
+            adjacency, adjacency.reverse(), s, t, potential=lambda v, h_t=adjacency.heuristic_to(t),
+            h_s=adjacency.heuristic_to(s): 0.5 * (h_t(v) - h_s(v))),
+    }
+    print(f"\n{dataset}: {queries} queries")
+    for name, search in searches.items():
+        expanded = 0
+        start = time.perf_counter()
+        for source, target in pairs:
+            expanded += search(source, target).expanded
+        elapsed = time.perf_counter() - start
+        print(f"  {name:>23}: {expanded:>7} expanded, {elapsed * 1000 / queries:6.3f} ms/query")
+
+
+def bench_fanout(dataset="ECAC", hub="LEBL"):
+    airspace = load(dataset)
+    if hub not in airspace.nav_airports or not airspace.nav_airports[hub].sids:
+        print(f"\n{dataset}: hub {hub} not available")
+        return
+    origin = airspace.nav_airports[hub].sids[0].name
+    destinations = [a.stars[0].name for a in airspace.nav_airports.values() if a.stars and a.name != hub]
+
+    start = time.perf_counter()
+    single = {name: airspace.find_shortest_path(origin, name, method="astar") for name in destinations}
+    single_time = time.perf_counter() - start
+
+    airspace.tree_cache.clear()
+    start = time.perf_counter()
+    fanout = airspace.paths_from(origin, destinations)
+    tree_time = time.perf_counter() - start
+    start = time.perf_counter()
+    airspace.paths_from(origin, destinations)
+    cached_time = time.perf_counter() - start
+
+    same = sum((single[n] is None and fanout[n] is None) or
+               (single[n] is not None and fanout[n] is not None and abs(single[n].cost - fanout[n].cost) < 1e-9)
+               for n in destinations)
+    print(f"\n{dataset}: {origin} to {len(destinations)} airports")
+    print(f"  one A* per destination: {single_time * 1000:8.2f} ms")
+    print(f"  one shortest-path tree: {tree_time * 1000:8.2f} ms (cached: {cached_time * 1000:.2f} ms)")
+    print(f"  same result: {same}/{len(destinations)}")
+
+
+def bench_airports(dataset="ECAC", queries=300):
+    airspace = load(dataset)
+    codes = [code for code, airport in airspace.nav_airports.items() if airport.sids and airport.stars]
+    rng = random.Random(2025)
+    pairs = [tuple(rng.sample(codes, 2)) for _ in range(queries)] if len(codes) > 1 else []
+
+    def every_combination(origin, destination):
+        best = None
+        for sid in airspace.nav_airports[origin].sids:
+            for star in airspace.nav_airports[destination].stars:
+                path = airspace.find_shortest_path(sid.name, star.name, method="astar")
+                if path and (best is None or path.cost < best.cost):
+                    best = path
+        return best
+
+    start = time.perf_counter()
+    combined = [every_combination(o, d) for o, d in pairs]
+    combined_time = time.perf_counter() - start
+    start = time.perf_counter()
+    single = [airspace.find_airport_route(o, d) for o, d in pairs]
+    single_time = time.perf_counter() - start
+
+    same = sum((a is None and b is None) or
+               (a is not None and b is not None and abs(a.cost - b.cost) < 1e-9)
+               for a, b in zip(combined, single))
+    print(f"\n{dataset}: {len(pairs)} airport pairs")
+    print(f"  one A* per SID/STAR pair: {combined_time * 1000:8.2f} ms")
+    print(f"  one multi-source search:  {single_time * 1000:8.2f} ms")
+    print(f"  same result: {same}/{len(pairs)}")
+
+
+def plain_yen(adjacency, source, target, k):
+    # Yen sin estado compartido: cada desvío es un Dijkstra nuevo y se prueban todos los nodos
+    no_estimate = [0.0] * adjacency.node_count
+    first = routing._guided_search(adjacency, adjacency.weights, source, target, no_estimate, set(), set())
+    if not first:
+        return []
+    found, candidates, seen = [first], [], {tuple(first.nodes)}
+    while len(found) < k:
+        nodes = found[-1].nodes
+        for i in range(len(nodes) - 1):
+            root = nodes[:i + 1]
+            blocked_edges = {(p.nodes[i], p.nodes[i + 1]) for p in found
+                             if len(p.nodes) > i + 1 and p.nodes[:i + 1] == root}
+            spur = routing._guided_search(adjacency, adjacency.weights, nodes[i], target,
+                                          no_estimate, set(root[:-1]), blocked_edges)
+            if spur and tuple(root[:-1] + spur.nodes) not in seen:
+                candidate = root[:-1] + spur.nodes
+                seen.add(tuple(candidate))
+                cost = sum(adjacency.weight(u, v) for u, v in zip(candidate, candidate[1:]))
+                heapq.heappush(candidates, (cost, len(seen), candidate))
+        if not candidates:
+            break
+        cost, _, candidate = heapq.heappop(candidates)
+        found.append(routing.RouteResult(cost, candidate, 0))
+    return found
+
+
+def bench_alternatives(dataset="ECAC", queries=30, k=5):
+    airspace = load(dataset)
+    adjacency = airspace.adjacency
+    pairs = airport_pairs(airspace, queries)
+
+    start = time.perf_counter()
+    plain = [plain_yen(adjacency, airspace.name_index[o].id, airspace.name_index[d].id, k) for o, d in pairs]
+    plain_time = time.perf_counter() - start
+    airspace.tree_cache.clear()
+    start = time.perf_counter()
+    shared = [airspace.k_shortest_paths(o, d, k) for o, d in pairs]
+    shared_time = time.perf_counter() - start
+
+    same = sum(len(a) == len(b) and all(abs(x.cost - y.cost) < 1e-6 for x, y in zip(a, b))
+               for a, b in zip(plain, shared))
+    print(f"\n{dataset}: k={k} alternatives for {len(pairs)} airport pairs")
+    print(f"  Yen, Dijkstra per spur:      {plain_time * 1000 / len(pairs):8.2f} ms/pair")
+    print(f"  Yen, shared reverse tree:    {shared_time * 1000 / len(pairs):8.2f} ms/pair")
+    print(f"  same costs: {same}/{len(pairs)}")
+
+
+def bench_spatial(dataset="ECAC", queries=1000):
+    airspace = load(dataset)
+    rng = random.Random(2025)
+    lats = [p.latitude for p in airspace.point_list]
+    lons = [p.longitude for p in airspace.point_list]
+    clicks = [(rng.uniform(min(lats), max(lats)), rng.uniform(min(lons), max(lons))) for _ in range(queries)]
+
+    start = time.perf_counter()
+    brute = [min(airspace.point_list, key=lambda p: p.distance_to(NavPoint(0, "click", lat, lon)))
+             for lat, lon in clicks]
+    brute_time = time.perf_counter() - start
+    start = time.perf_counter()
+    airspace.build_spatial_index()
+    build_time = time.perf_counter() - start
+    start = time.perf_counter()
+    indexed = [airspace.nearest_point(lat, lon) for lat, lon in clicks]
+    indexed_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for lat, lon in clicks:
+        airspace.points_within(lat, lon, 50)
+    radius_time = time.perf_counter() - start
+
+    print(f"\n{dataset}: {len(airspace.point_list)} points, {queries} clicks")
+    print(f"  haversine scan:  {brute_time * 1000 / queries:8.4f} ms/click")
+    print(f"  k-d tree:        {indexed_time * 1000 / queries:8.4f} ms/click (build {build_time * 1000:.1f} ms)")
+    print(f"  within 50 km:    {radius_time * 1000 / queries:8.4f} ms/query")
+    print(f"  same point: {sum(a is b for a, b in zip(brute, indexed))}/{queries}")
+
+
+def bench_regions(dataset="ECAC", queries=500):
+    airspace = load(dataset)
+    rng = random.Random(2025)
+    lats = [p.latitude for p in airspace.point_list]
+    lons = [p.longitude for p in airspace.point_list]
+    boxes = []
+    for _ in range(queries):
+        lat, lon = rng.uniform(min(lats), max(lats)), rng.uniform(min(lons), max(lons))
+        boxes.append((lat, lon, lat + 2.0, lon + 3.0))
+
+    start = time.perf_counter()
+    scanned = [[p.id for p in airspace.point_list
+                if box[0] <= p.latitude <= box[2] and box[1] <= p.longitude <= box[3]] for box in boxes]
+    scan_time = time.perf_counter() - start
+    airspace.points_in_bbox(*boxes[0])
+    airspace.segments_in_bbox(*boxes[0])
+    start = time.perf_counter()
+    indexed = [airspace.points_in_bbox(*box) for box in boxes]
+    index_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for box in boxes:
+        airspace.segments_in_bbox(*box)
+    segment_time = time.perf_counter() - start
+
+    middle_lat, middle_lon = (min(lats) + max(lats)) / 2, (min(lons) + max(lons)) / 2
+    region = (middle_lat - 5, middle_lon - 8, middle_lat + 5, middle_lon + 8)
+    start = time.perf_counter()
+    sub = airspace.subgraph(*region)
+    subgraph_time = time.perf_counter() - start
+    start = time.perf_counter()
+    load(dataset)
+    reload_time = time.perf_counter() - start
+
+    print(f"\n{dataset}: {queries} boxes of 2 x 3 degrees")
+    print(f"  point scan:      {scan_time * 1000 / queries:8.4f} ms/box")
+    print(f"  point grid:      {index_time * 1000 / queries:8.4f} ms/box")
+    print(f"  segment grid:    {segment_time * 1000 / queries:8.4f} ms/box")
+    print(f"  same points: {sum(list(a) == list(b) for a, b in zip(scanned, indexed))}/{queries}")
+    print(f"  subgraph of {len(sub.point_list)} points: {subgraph_time * 1000:.1f} ms "
+          f"(reloading the files: {reload_time * 1000:.1f} ms)")
+
+    # Con pocos cientos de puntos un recorrido completo ya es barato; la rejilla se nota al crecer
+    count = 200000
+    synthetic_lats = [rng.uniform(30, 70) for _ in range(count)]
+    synthetic_lons = [rng.uniform(-20, 40) for _ in range(count)]
+    grid = GridIndex.points(synthetic_lats, synthetic_lons)
+    start = time.perf_counter()
+    for box in boxes[:20]:
+        [i for i in range(count) if box[0] <= synthetic_lats[i] <= box[2] and box[1] <= synthetic_lons[i] <= box[3]]
+    scan_time = (time.perf_counter() - start) / 20
+    start = time.perf_counter()
+    for box in boxes[:20]:
+        grid.query(*box)
+    grid_time = (time.perf_counter() - start) / 20
+    print(f"  {count} synthetic points: scan {scan_time * 1000:.2f} ms/box, grid {grid_time * 1000:.2f} ms/box")
+
+
+class LegacyGraph:
+    # add_node / connect / get_node_by_name con los recorridos lineales originales
+    def __init__(self):
+        self.nodes = []
+
+    def add_node(self, node):
+        if not any(n.name == node.name for n in self.nodes):
+            self.nodes.append(node)
+            return True
+        return False
+
+    def get_node_by_name(self, name):
+        for node in self.nodes:
+            if node.name == name:
+                return node
+        return None
+
+    def connect(self, name1, name2):
+        node1 = self.get_node_by_name(name1)
+        node2 = self.get_node_by_name(name2)
+        if node1 and node2 and node2 not in node1.neighbors:
+            node1.neighbors.append(node2)
+            return True
+        return False
+
+
+def build_graph(graph, airspace, copies):
+    # Réplicas del conjunto de datos desplazadas, con nombres únicos por copia
+    for copy in range(copies):
+        for point in airspace.point_list:
+            graph.add_node(Node(f"{point.name}_{copy}", point.longitude + copy, point.latitude))
+        for u, v in airspace.adjacency.edges():
+            graph.connect(f"{airspace.point_list[u].name}_{copy}", f"{airspace.point_list[v].name}_{copy}")
+    return graph
+
+
+def bench_graph(dataset="ECAC", target_nodes=100000):
+    airspace = load(dataset)
+    small = max(1, 5000 // len(airspace.point_list))
+    large = max(1, target_nodes // len(airspace.point_list))
+
+    start = time.perf_counter()
+    build_graph(LegacyGraph(), airspace, small)
+    legacy_time = time.perf_counter() - start
+    start = time.perf_counter()
+    build_graph(Graph(), airspace, small)
+    small_time = time.perf_counter() - start
+    start = time.perf_counter()
+    graph = build_graph(Graph(), airspace, large)
+    large_time = time.perf_counter() - start
+
+    filename = os.path.join(tempfile.gettempdir(), "bench_graph.txt")
+    graph.save_to_file(filename)
+    start = time.perf_counter()
+    loaded = Graph.load_from_file(filename)
+    load_time = time.perf_counter() - start
+    os.remove(filename)
+
+    small_nodes = small * len(airspace.point_list)
+    print(f"\n{dataset}: graph mode construction")
+    print(f"  {small_nodes} nodes, linear scans: {legacy_time * 1000:10.1f} ms")
+    print(f"  {small_nodes} nodes, hashed:       {small_time * 1000:10.1f} ms")
+    print(f"  {len(graph.nodes)} nodes, hashed:      {large_time * 1000:10.1f} ms")
+    print(f"  load_from_file of {len(loaded.nodes)} nodes: {load_time * 1000:.1f} ms")
+
+
+def legacy_load(nav_file, seg_file, airport_file):
+    # Carga original línea a línea: un NavPoint/NavSegment y un _connect por fila
+    airspace = AirSpace()
+    with open(nav_file) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 4:
+                airspace.add_point(NavPoint(int(parts[0]), parts[1], float(parts[2]), float(parts[3])))
+    with open(seg_file) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 3:
+                origin, destination, distance = int(parts[0]), int(parts[1]), float(parts[2])
+                airspace.nav_segments.append(NavSegment(origin, destination, distance,
+                                                        origin_point=airspace.nav_points.get(origin),
+                                                        destination_point=airspace.nav_points.get(destination)))
+                if origin in airspace.nav_points and destination in airspace.nav_points:
+                    airspace._connect(airspace.nav_points[origin], airspace.nav_points[destination], distance)
+    airspace.build_adjacency()
+    airspace.build_spatial_index()
+    return airspace
+
+
+def synthetic_dataset(directory, points=100000, segments=1000000, seed=2025):
+    # Malla de puntos sobre Europa con segmentos entre vecinos cercanos y algunas filas erróneas
+    rng = random.Random(seed)
+    side = int(points ** 0.5)
+    nav_file = os.path.join(directory, "synthetic_nav.txt")
+    seg_file = os.path.join(directory, "synthetic_seg.txt")
+    aer_file = os.path.join(directory, "synthetic_aer.txt")
+    with open(nav_file, 'w') as f:
+        for i in range(side * side):
+            f.write(f"{i} P{i} {35 + 30 * (i // side) / side:.6f} {-10 + 40 * (i % side) / side:.6f}\n")
+        f.write(f"{side * side} XXXX.D 35.0 -10.0\n{side * side + 1} XXXX.A 35.1 -10.0\n")
+    with open(seg_file, 'w') as f:
+        for _ in range(segments):
+            u = rng.randrange(side * side)
+            v = min(max(u + rng.choice((-1, 1, -side, side, side + 1)), 0), side * side - 1)
+            f.write(f"{u} {v} {rng.uniform(5, 60):.6f}\n")
+        f.write(f"{side * side} 0 5.0\n{side * side + 1} 1 5.0\n1 999999999 10.0\n12 x\n")
+    with open(aer_file, 'w') as f:
+        f.write("XXXX\nXXXX.D\nXXXX.A\n")
+    return nav_file, seg_file, aer_file
+
+
+def bench_loader(dataset="ECAC"):
+    files = DATASETS[dataset]
+    start = time.perf_counter()
+    legacy_load(*files)
+    legacy_time = time.perf_counter() - start
+    start = time.perf_counter()
+    airspace = AirSpace()
+    airspace.load_from_files(*files, snapshot=False)
+    columns_time = time.perf_counter() - start
+    print(f"\n{dataset}: {len(airspace.point_list)} points, {len(airspace.nav_segments)} segments")
+    print(f"  line by line: {legacy_time * 1000:9.1f} ms")
+    print(f"  by columns:   {columns_time * 1000:9.1f} ms")
+
+    if dataset == list(DATASETS)[-1]:
+        with tempfile.TemporaryDirectory() as directory:
+            files = synthetic_dataset(directory)
+            start = time.perf_counter()
+            legacy_load(*files)
+            legacy_time = time.perf_counter() - start
+            start = time.perf_counter()
+            airspace = AirSpace()
+            airspace.load_from_files(*files, snapshot=False)
+            columns_time = time.perf_counter() - start
+        print(f"\nsynthetic: {len(airspace.point_list)} points, {len(airspace.nav_segments)} segments")
+        print(f"  line by line: {legacy_time * 1000:9.1f} ms")
+        print(f"  by columns:   {columns_time * 1000:9.1f} ms")
+
+
+def time_snapshot(label, files):
+    # Carga de texto sin snapshot, primera carga (texto + escritura) y carga desde el snapshot
+    timings = []
+    for snapshot in (False, True, True):
+        start = time.perf_counter()
+        airspace = AirSpace()
+        airspace.load_from_files(*files, snapshot=snapshot)
+        timings.append(time.perf_counter() - start)
+    size = os.path.getsize(files[0] + ".snapshot")
+    print(f"\n{label}: {len(airspace.point_list)} points, {len(airspace.nav_segments)} segments, "
+          f"snapshot {size / 1e6:.1f} MB")
+    print(f"  text:              {timings[0] * 1000:9.1f} ms")
+    print(f"  text + snapshot:   {timings[1] * 1000:9.1f} ms")
+    print(f"  from snapshot:     {timings[2] * 1000:9.1f} ms ({timings[0] / timings[2]:.1f}x)")
+
+
+def bench_snapshot(dataset="ECAC"):
+    # Se trabaja sobre copias para no dejar snapshots junto a los datos del repositorio
+    with tempfile.TemporaryDirectory() as directory:
+        files = []
+        for path in DATASETS[dataset]:
+            files.append(os.path.join(directory, os.path.basename(path)))
+            with open(path, 'rb') as source, open(files[-1], 'wb') as target:
+                target.write(source.read())
+        time_snapshot(dataset, files)
+
+        if dataset == list(DATASETS)[-1]:
+            time_snapshot("synthetic", synthetic_dataset(directory))
+
+
+def proportional_memory():
+    # (PSS, RSS) del proceso en MB; PSS reparte las páginas compartidas entre quienes las mapean
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Pss:", "Rss:"):
+                values[parts[0]] = int(parts[1]) / 1024
+    return values["Pss:"], values["Rss:"]
+
+
+def memory_worker(mode, files, pairs, barrier, queue):
+    # Carga el espacio aéreo (objetos o mapeado), enruta y mide con todos los trabajadores vivos
+    import contextlib
+    import io
+    from mapped import MappedAirSpace
+    from snapshot import snapshot_path
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == "objects":
+            airspace = AirSpace()
+            airspace.load_from_files(*files)
+        elif mode == "mapped":
+            airspace = MappedAirSpace(snapshot_path(files[0]))
+        if mode != "idle":
+            for origin, destination in pairs:
+                airspace.find_shortest_path(origin, destination)
+            airspace.reachable_nodes(pairs[0][0])
+    barrier.wait()
+    queue.put(proportional_memory())
+    barrier.wait()
+
+
+def bench_shared(dataset="ECAC", worker_counts=(1, 2, 4)):
+    import contextlib
+    import io
+    import multiprocessing
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        print("shared: /proc/self/smaps_rollup not available")
+        return
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as directory:
+        if dataset == list(DATASETS)[-1]:
+            datasets = [(dataset, DATASETS[dataset]), ("synthetic", synthetic_dataset(directory))]
+        else:
+            datasets = [(dataset, DATASETS[dataset])]
+        for label, files in datasets:
+            with contextlib.redirect_stdout(io.StringIO()):
+                airspace = AirSpace()
+                airspace.load_from_files(*files)  # escribe el snapshot si hace falta
+                pairs = random_pairs(airspace, 50)
+            print(f"\n{label}: {len(airspace.point_list)} points, {airspace.adjacency.edge_count()} edges")
+            # idle: el intérprete con los módulos importados, sin cargar ningún dataset
+            for mode in ("idle", "objects", "mapped"):
+                for workers in worker_counts:
+                    barrier, queue = context.Barrier(workers), context.Queue()
+                    processes = [context.Process(target=memory_worker, args=(mode, files, pairs, barrier, queue))
+                                 for _ in range(workers)]
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        for process in processes:
+                            process.start()
+                        measures = [queue.get() for _ in processes]
+                        for process in processes:
+                            process.join()
+                    pss = sum(m[0] for m in measures)
+                    rss = sum(m[1] for m in measures)
+                    print(f"  {mode:>7} x{workers}: PSS {pss:7.1f} MB total ({pss / workers:6.1f} per worker), "
+                          f"RSS {rss:7.1f} MB")
+
+
+def tiled_queries(airspace, directory, pairs, max_tiles=64):
+    # Cada consulta sobre un TiledAirSpace recién abierto: teselas cargadas, pico de memoria
+    # (tracemalloc) y coste comparado con el grafo completo
+    from tiles import TiledAirSpace
+    rows = []
+    for origin, destination in pairs:
+        expected = airspace.find_shortest_path(origin, destination)
+        tracemalloc.start()
+        start = time.perf_counter()
+        tiled = TiledAirSpace(directory, max_tiles=max_tiles)
+        path = tiled.find_shortest_path(origin, destination)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        same = (path is None) == (expected is None) and (path is None or abs(path.cost - expected.cost) < 1e-9)
+        rows.append((tiled.tiles_loaded, peak, elapsed, same))
+        tiled.close()
+    return rows
+
+
+def bench_tiles(dataset="ECAC", queries=100):
+    import contextlib
+    import io
+    from tiles import build_tiles
+    with tempfile.TemporaryDirectory() as directory:
+        airspace = load(dataset)
+        tiles_dir = os.path.join(directory, "tiles")
+        count = build_tiles(airspace, tiles_dir, cell_size=1.0)
+        tracemalloc.start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            load(dataset)
+        full_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        rows = tiled_queries(airspace, tiles_dir, random_pairs(airspace, queries))
+        print(f"\n{dataset}: {count} tiles of 1 degree, full load peak {full_peak / 1e6:.1f} MB")
+        print(f"  random pairs: {sum(r[0] for r in rows) / len(rows):5.1f} tiles/query, "
+              f"peak {max(r[1] for r in rows) / 1e6:5.2f} MB, {sum(r[2] for r in rows) * 1000 / len(rows):6.1f} ms/query, "
+              f"same cost {sum(r[3] for r in rows)}/{len(rows)}")
+
+        if dataset != list(DATASETS)[-1]:
+            return
+        # Malla sintética: consultas entre puntos separados por spans filas y columnas (~0.1 grados cada una)
+        with contextlib.redirect_stdout(io.StringIO()):
+            airspace = AirSpace()
+            airspace.load_from_files(*synthetic_dataset(directory), snapshot=False)
+            tracemalloc.start()
+            AirSpace().load_from_files(*synthetic_dataset(directory), snapshot=False)
+            full_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        tiles_dir = os.path.join(directory, "synthetic_tiles")
+        count = build_tiles(airspace, tiles_dir, cell_size=2.0)
+        side = int(100000 ** 0.5)
+        rng = random.Random(7)
+        print(f"\nsynthetic: {count} tiles of 2 degrees, full text load peak {full_peak / 1e6:.1f} MB")
+        for span in (10, 40, 160):
+            pairs = []
+            for _ in range(10):
+                row, column = rng.randrange(side - span), rng.randrange(side - span)
+                pairs.append((f"P{row * side + column}", f"P{(row + span) * side + column + span}"))
+            rows = tiled_queries(airspace, tiles_dir, pairs)
+            print(f"  span {span:3} cells: {sum(r[0] for r in rows) / len(rows):5.1f} tiles/query, "
+                  f"peak {max(r[1] for r in rows) / 1e6:6.2f} MB, {sum(r[2] for r in rows) * 1000 / len(rows):7.1f} ms/query, "
+                  f"same cost {sum(r[3] for r in rows)}/{len(rows)}")
+
+
+def bench_batch(dataset="ECAC", queries=5000, process_counts=(1, 2, 4)):
+    airspace = load(dataset)
+    names = sorted(p.name for p in airspace.point_list)
+    rng = random.Random(11)
+    pairs = [tuple(rng.sample(names, 2)) for _ in range(queries)] + [("NOWHERE", names[0])]
+
+    print(f"\n{dataset}: {len(pairs)} pairs, {os.cpu_count()} CPUs available")
+    for processes in process_counts:
+        for ordered in (True, False):
+            start = time.perf_counter()
+            results = list(airspace.route_batch(pairs, processes=processes, chunk_size=500, ordered=ordered))
+            elapsed = time.perf_counter() - start
+            failed = sum(not r.ok() for r in results)
+            print(f"  processes={processes} ordered={ordered!s:>5}: {elapsed:6.2f} s, "
+                  f"{len(results) / elapsed:8.0f} routes/s, {failed} failed pairs")
+
+
+def bench_route_cache(dataset="ECAC", queries=1000, distinct=50):
+    # Uso típico del GUI: pocas rutas distintas pedidas muchas veces, en los dos sentidos
+    airspace = load(dataset)
+    pool = airport_pairs(airspace, distinct)
+    rng = random.Random(5)
+    pairs = [pair if rng.random() < 0.5 else pair[::-1] for pair in (rng.choice(pool) for _ in range(queries))]
+
+    def run():
+        start = time.perf_counter()
+        costs = [getattr(airspace.find_shortest_path(o, d), "cost", None) for o, d in pairs]
+        return time.perf_counter() - start, costs
+
+    airspace.route_cache = LRUCache(0)
+    cold_time, cold_costs = run()
+    airspace.route_cache = LRUCache(256)
+    start = time.perf_counter()
+    airspace.adjacency.is_symmetric(airspace.metric)
+    symmetric_time = time.perf_counter() - start
+    warm_time, warm_costs = run()
+    cache = airspace.route_cache
+    same = sum(a == b or abs(a - b) < 1e-9 for a, b in zip(cold_costs, warm_costs))
+
+    print(f"\n{dataset}: {queries} queries over {distinct} airport pairs (half of them reversed)")
+    print(f"  no cache:  {cold_time * 1000 / queries:8.3f} ms/query")
+    print(f"  LRU cache: {warm_time * 1000 / queries:8.3f} ms/query, {cache.hits} hits, {cache.misses} misses "
+          f"(symmetry check {symmetric_time * 1000:.1f} ms, once per graph and metric)")
+    print(f"  same cost: {same}/{queries}")
+
+
+def bench_route_store(dataset="ECAC", queries=500):
+    # Dos sesiones sobre el mismo dataset: la primera calcula y guarda, la segunda solo lee
+    import contextlib
+    import io
+    pairs = None
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "routes")
+        timings = []
+        for session in range(2):
+            with contextlib.redirect_stdout(io.StringIO()):
+                airspace = load(dataset)
+            if pairs is None:
+                codes = [c for c, a in airspace.nav_airports.items() if a.sids and a.stars]
+                rng = random.Random(2025)
+                pairs = [tuple(rng.sample(codes, 2)) for _ in range(queries)]
+            airspace.route_cache = LRUCache(0)  # solo el almacén persistente
+            store = airspace.open_route_store(filename)
+            start = time.perf_counter()
+            expanded = 0
+            costs = []
+            for origin, destination in pairs:
+                costs.append(getattr(airspace.find_shortest_path(origin, destination), "cost", None))
+                expanded += airspace.last_expanded
+            elapsed = time.perf_counter() - start
+            start = time.perf_counter()
+            airspace.close_route_store()
+            timings.append((elapsed, time.perf_counter() - start, expanded, store.hits, costs))
+
+    (first, flush, first_expanded, _, first_costs), (second, _, second_expanded, hits, second_costs) = timings
+    same = sum(a == b or abs(a - b) < 1e-9 for a, b in zip(first_costs, second_costs))
+    print(f"\n{dataset}: {queries} airport pairs, store {os.path.basename(filename)} in a temporary directory")
+    print(f"  first session:  {first * 1000 / queries:7.3f} ms/query, {first_expanded} expanded "
+          f"(pending writes flushed in {flush * 1000:.1f} ms)")
+    print(f"  second session: {second * 1000 / queries:7.3f} ms/query, {second_expanded} expanded, {hits} store hits")
+    print(f"  same cost: {same}/{queries}")
+
+
+def bench_matrix(dataset="ECAC", process_counts=(1, 2, 4)):
+    from airport_matrix import AirportMatrix
+    airspace = load(dataset)
+    codes = list(airspace.nav_airports)
+
+    start = time.perf_counter()
+    expected = {code: airspace.airport_paths_from(code, codes) for code in codes}
+    tree_time = time.perf_counter() - start
+    print(f"\n{dataset}: {len(codes)} airports, {os.cpu_count()} CPUs available")
+    print(f"  airport_paths_from per origin: {tree_time * 1000:8.1f} ms")
+    for processes in process_counts:
+        start = time.perf_counter()
+        matrix = AirportMatrix.compute(airspace, processes=processes)
+        elapsed = time.perf_counter() - start
+        same = sum((expected[o][d] is None and matrix.distance(o, d) == float('inf')) or
+                   (expected[o][d] is not None and abs(expected[o][d].cost - matrix.distance(o, d)) < 1e-9)
+                   for o in codes for d in codes)
+        print(f"  matrix, processes={processes}:      {elapsed * 1000:8.1f} ms, same cost {same}/{len(codes) ** 2}")
+
+    rng = random.Random(9)
+    recomputed = 0
+    start = time.perf_counter()
+    for _ in range(20):
+        # Segmentos cortos entre vecinos: ediciones locales como las del GUI
+        point = rng.choice(airspace.point_list)
+        neighbor = airspace.nearest_points(point.latitude, point.longitude, 3)[-1][0]
+        airspace.add_segment(point.number, neighbor.number)
+        recomputed += matrix.refresh(processes=1)
+    refresh_time = time.perf_counter() - start
+    fresh = AirportMatrix.compute(airspace, processes=1)
+    same = sum(a == b or abs(a - b) < 1e-9 for a, b in zip(matrix.distances, fresh.distances))
+    print(f"  20 local edits, refresh after each: {refresh_time * 1000 / 20:7.1f} ms/edit "
+          f"({recomputed / 20:.1f} of {len(codes)} origins recomputed), same as full {same}/{len(fresh.distances)}")
+
+
+def bench_closures(dataset="ECAC", routes=1000, events=10):
+    # Cierres y reaperturas de segmentos con 1000 rutas cacheadas: reparar solo las afectadas
+    # frente a recalcular todas con A*
+    airspace = load(dataset)
+    airspace.route_cache = LRUCache(2 * routes)
+    airspace.route_repairs = LRUCache(2 * routes)
+    rng = random.Random(24)
+    names = sorted(airspace.name_index)
+    pairs = [tuple(rng.sample(names, 2)) for _ in range(routes)]
+    for o, d in pairs:
+        airspace.find_shortest_path(o, d)
+
+    def recompute():
+        start = time.perf_counter()
+        costs = [getattr(airspace.find_shortest_path(o, d, method="astar"), "cost", None) for o, d in pairs]
+        return time.perf_counter() - start, costs
+
+    closed, timings = [], {True: [], False: []}
+    repaired, same = {True: 0, False: 0}, 0
+    for step in range(2 * events):
+        closing = step < events
+        if closing:
+            path = None
+            while path is None or len(path.nodes) < 2:
+                path = airspace.find_shortest_path(*rng.choice(pairs))
+            i = rng.randrange(len(path.nodes) - 1)
+            segment = (path.nodes[i], path.nodes[i + 1])
+            closed.append(segment)
+            start = time.perf_counter()
+            airspace.close_segment(*segment)
+        else:
+            start = time.perf_counter()
+            airspace.reopen_segment(*closed[step - events])
+        timings[closing].append(time.perf_counter() - start)
+        repaired[closing] += airspace.last_repair[1]
+        full_time, full_costs = recompute()
+        timings.setdefault("full", []).append(full_time)
+        cached = [getattr(airspace.find_shortest_path(o, d), "cost", None) for o, d in pairs]
+        same += sum(a == b or (a is not None and b is not None and abs(a - b) < 1e-9)
+                    for a, b in zip(cached, full_costs))
+
+    print(f"\n{dataset}: {routes} cached routes, {events} closures then {events} reopenings")
+    for closing, label in ((True, "close"), (False, "reopen")):
+        print(f"  {label + ' + repair:':17} {sum(timings[closing]) * 1000 / events:8.1f} ms/event "
+              f"({repaired[closing] / events:.1f} routes repaired)")
+    print(f"  full recompute:   {sum(timings['full']) * 1000 / (2 * events):8.1f} ms/event")
+    print(f"  same cost: {same}/{2 * events * routes}")
+
+
+def bench_metrics(dataset="ECAC", queries=200):
+    # Métricas sobre la misma adyacencia: tiempo con viento, tasas de ruta y una combinación.
+    # La jerarquía y los landmarks se preparan una vez y se personalizan para cada métrica
+    import metrics
+    from math import cos, radians
+    airspace = load(dataset)
+    pairs = random_pairs(airspace, queries)
+    adjacency = airspace.adjacency
+    base_size = adjacency.memory_size()
+
+    # Corriente en chorro del oeste centrada en 50º N y tarifas por franjas de longitud
+    jet = lambda lat, lon: (180.0 * max(0.0, cos(radians(lat - 50) * 6)), 0.0)
+    rate = lambda lat, lon: 40.0 + 20.0 * (int(lon + 30) // 10 % 4)
+    start = time.perf_counter()
+    airspace.add_metric("time", metrics.wind_time(830, jet))
+    airspace.add_metric("charges", metrics.route_charges(rate, metrics.weight_factor(79)))
+    airspace.add_metric("cost", metrics.combination({"time": 30.0, "charges": 1.0}))
+    register_time = time.perf_counter() - start
+    extra = adjacency.memory_size() - base_size
+
+    start = time.perf_counter()
+    airspace.prepare_hierarchy(filename=False)
+    contract_time = time.perf_counter() - start
+    start = time.perf_counter()
+    airspace.prepare_landmarks()
+    select_time = time.perf_counter() - start
+
+    print(f"\n{dataset}: {adjacency.node_count} nodes, {adjacency.edge_count()} edges, {queries} queries per metric")
+    print(f"  register 3 metrics: {register_time * 1000:7.1f} ms, +{extra / 1024:.0f} KiB "
+          f"(graph {base_size / 1024:.0f} KiB, shared)")
+    print(f"  contraction (great_circle): {contract_time * 1000:7.1f} ms, landmark selection: {select_time * 1000:6.1f} ms")
+    for metric in ("great_circle", "time", "charges", "cost"):
+        start = time.perf_counter()
+        hierarchy = airspace.prepare_hierarchy(metric)
+        customize_time = time.perf_counter() - start
+        start = time.perf_counter()
+        airspace._prepared_landmarks(metric)
+        landmark_time = time.perf_counter() - start
+        timings, costs = {}, {}
+        for method in ("astar", "alt", "ch"):
+            start = time.perf_counter()
+            costs[method] = [getattr(airspace.find_shortest_path(o, d, metric, method), "cost", None)
+                             for o, d in pairs]
+            timings[method] = time.perf_counter() - start
+        same = sum(a == b == c or (None not in (a, b, c) and abs(a - b) < 1e-6 and abs(a - c) < 1e-6)
+                   for a, b, c in zip(costs["astar"], costs["alt"], costs["ch"]))
+        print(f"  {metric:12} customize ch {customize_time * 1000:6.1f} ms ({hierarchy.shortcut_count} shortcuts), "
+              f"alt {landmark_time * 1000:5.1f} ms | query ms: " +
+              ", ".join(f"{method} {timings[method] * 1000 / queries:.3f}" for method in timings) +
+              f" | same cost {same}/{queries}")
+        airspace.hierarchies.clear()
+        airspace.landmark_sets.clear()
+
+
+BENCHMARKS = {
+    "astar": bench_astar,
+    "adjacency": bench_adjacency,
+    "reachability": bench_reachability,
+    "weights": bench_weights,
+    "hierarchy": bench_hierarchy,
+    "landmarks": bench_landmarks,
+    "bidirectional": bench_bidirectional,
+    "fanout": bench_fanout,
+    "airports": bench_airports,
+    "alternatives": bench_alternatives,
+    "spatial": bench_spatial,
+    "regions": bench_regions,
+    "graph": bench_graph,
+    "loader": bench_loader,
+    "snapshot": bench_snapshot,
+    "shared": bench_shared,
+    "tiles": bench_tiles,
+    "batch": bench_batch,
+    "route_cache": bench_route_cache,
+    "route_store": bench_route_store,
+    "matrix": bench_matrix,
+    "closures": bench_closures,
+    "metrics": bench_metrics,
+}
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        if name in BENCHMARKS:
+            for dataset in DATASETS:
+                BENCHMARKS[name](dataset)
+        else:
+            print(f"Unknown benchmark: {name}")
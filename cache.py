@@ -0,0 +1,45 @@
+from collections import OrderedDict
+
+
+class LRUCache:
+    # Diccionario acotado: al superar maxsize se descarta la entrada usada hace más tiempo
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key, default=None):
+        return self._entries.pop(key, default)
+
+    def items(self):
+        # Copia de las entradas, de la usada hace más tiempo a la más reciente (sin contar aciertos)
+        return list(self._entries.items())
+
+    def clear(self):
+        self._entries.clear()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return f"LRUCache(size={len(self)}/{self.maxsize}, hits={self.hits}, misses={self.misses})"
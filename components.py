@@ -0,0 +1,141 @@
+from array import array
+
+
+class Components:
+    # Union-find sobre ids de nodo, mantenido al añadir aristas. Dos nodos en componentes
+    # distintas nunca se alcanzan; si además todas las aristas tienen su inversa (segmentos
+    # bidireccionales) estar en la misma componente equivale a ser alcanzable
+    def __init__(self, node_count=0):
+        self.parent = array('l', range(node_count))
+        self.size = array('l', [1]) * node_count
+        self._count = node_count
+        self._one_way = 0  # aristas dirigidas sin su inversa
+        self._labels = None
+        # Altas en bloque aún sin unir: (aristas nuevas, todas las aristas). Se aplican en la
+        # primera consulta, así una carga masiva no paga el union-find si nadie lo usa
+        self._pending = []
+        self._edge_set = None
+
+    @classmethod
+    def from_labels(cls, labels, one_way):
+        # Reconstruye el union-find a partir de labels() (cada nodo apunta ya a su raíz)
+        components = cls()
+        components.parent = array('l', labels)
+        size = array('l', [0]) * len(labels)
+        for root in labels:
+            size[root] += 1
+        components.size = size
+        components._count = sum(1 for node, root in enumerate(labels) if node == root)
+        components._one_way = one_way
+        components._labels = array('l', labels)
+        return components
+
+    @property
+    def count(self):
+        self._flush()
+        return self._count
+
+    @property
+    def one_way(self):
+        self._flush()
+        return self._one_way
+
+    def add_node(self):
+        self.parent.append(len(self.parent))
+        self.size.append(1)
+        self._count += 1
+        self._labels = None
+        return len(self.parent) - 1
+
+    def find(self, node):
+        self._flush()
+        return self._root(node)
+
+    def _root(self, node):
+        parent = self.parent
+        while parent[node] != node:
+            # Compresión por división a la mitad
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def union(self, u, v):
+        root_u, root_v = self._root(u), self._root(v)
+        if root_u == root_v:
+            return False
+        if self.size[root_u] < self.size[root_v]:
+            root_u, root_v = root_v, root_u
+        self.parent[root_v] = root_u
+        self.size[root_u] += self.size[root_v]
+        self._count -= 1
+        self._labels = None
+        return True
+
+    def add_edge(self, u, v, has_reverse):
+        # has_reverse: la arista v -> u ya existía, así que u -> v completa el par
+        self._flush()
+        self._one_way += -1 if has_reverse else 1
+        self.union(u, v)
+
+    def add_edges(self, edges, edge_set):
+        # Alta en bloque: edges son las aristas nuevas y edge_set todas las del grafo (ya con
+        # las nuevas); one_way se recuenta una vez en lugar de arista a arista
+        self._pending.append(edges)
+        self._edge_set = edge_set
+        self._labels = None
+
+    def _flush(self):
+        if not self._pending:
+            return
+        edge_set = self._edge_set
+        for edges in self._pending:
+            for u, v in edges:
+                if u < v or (v, u) not in edge_set:
+                    self.union(u, v)
+        self._pending = []
+        self._one_way = sum(1 for u, v in edge_set if (v, u) not in edge_set)
+
+    def connected(self, u, v):
+        return self.find(u) == self.find(v)
+
+    def symmetric(self):
+        return self.one_way == 0
+
+    def component_size(self, node):
+        return self.size[self.find(node)]
+
+    def labels(self):
+        # Raíz de cada nodo en un array plano, para consultas sin find (p. ej. en otros procesos)
+        self._flush()
+        if self._labels is None:
+            self._labels = array('l', map(self._root, range(len(self.parent))))
+        return self._labels
+
+
+class ReachableSet:
+    # Nodos alcanzables como array de ids más una máscara: pertenencia en O(1)
+    # tanto por id como por NavPoint; al iterar devuelve los NavPoints
+    def __init__(self, ids, points):
+        self.ids = ids
+        self._points = points
+        self._mask = bytearray(len(points))
+        for node in ids:
+            self._mask[node] = 1
+
+    def __contains__(self, item):
+        node = item if isinstance(item, int) else getattr(item, 'id', None)
+        if node is None or not 0 <= node < len(self._mask):
+            return False
+        return self._mask[node] == 1 and (isinstance(item, int) or self._points[node] is item)
+
+    def __iter__(self):
+        return (self._points[node] for node in self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __bool__(self):
+        return len(self.ids) > 0
+
+    def __repr__(self):
+        return f"ReachableSet({len(self.ids)} nodes)"
@@ -0,0 +1,358 @@
+import heapq
+import json
+from array import array
+from routing import RouteResult
+
+CH_FORMAT = 1
+
+
+class ContractionHierarchy:
+    # Contraction Hierarchies sobre la adyacencia CSR: cada nodo recibe un rango y se añaden
+    # atajos (u -> w vía v) al contraer v. Las consultas solo suben de rango desde ambos extremos.
+    def __init__(self, node_count, metric, fingerprint=None):
+        self.node_count = node_count
+        self.metric = metric
+        self.fingerprint = fingerprint
+        self.rank = array('l', [0]) * node_count
+        # Grafo ascendente hacia delante (u -> x con rank[x] > rank[u]) y hacia atrás
+        # (x -> u con rank[x] > rank[u], guardado desde u); middle = -1 en aristas originales
+        self.up_offsets = array('l', [0]) * (node_count + 1)
+        self.up_targets = array('l')
+        self.up_weights = array('d')
+        self.up_middles = array('l')
+        self.down_offsets = array('l', [0]) * (node_count + 1)
+        self.down_targets = array('l')
+        self.down_weights = array('d')
+        self.down_middles = array('l')
+        self.shortcut_count = 0
+        self._upper = None  # (targets de la adyacencia, vecinos superiores), ver customize
+
+    @classmethod
+    def build(cls, adjacency, metric, fingerprint=None, witness_limit=200, weights=None):
+        # weights: otra columna de pesos para la métrica (p. ej. sin los segmentos cerrados)
+        hierarchy = cls(adjacency.node_count, metric, fingerprint)
+        if weights is None:
+            weights = adjacency.metric_weights(metric)
+        n = adjacency.node_count
+
+        # Grafo de trabajo: out_edges[u][v] = (coste, nodo intermedio)
+        out_edges = [dict() for _ in range(n)]
+        in_edges = [dict() for _ in range(n)]
+        for u in range(n):
+            for k in range(adjacency.offsets[u], adjacency.offsets[u + 1]):
+                v = adjacency.targets[k]
+                if weights[k] < out_edges[u].get(v, (float('inf'),))[0]:
+                    out_edges[u][v] = (weights[k], -1)
+                    in_edges[v][u] = (weights[k], -1)
+
+        contracted = bytearray(n)
+        deleted_neighbors = [0] * n
+        level = [0] * n
+
+        def witness_distance(source, excluded, limit, max_settled):
+            # Dijkstra local que no pasa por el nodo que se está contrayendo
+            dist = {source: 0.0}
+            heap = [(0.0, source)]
+            settled = 0
+            while heap and settled < max_settled:
+                d, node = heapq.heappop(heap)
+                if d > dist[node]:
+                    continue
+                if d > limit:
+                    break
+                settled += 1
+                for neighbor, (w, _) in out_edges[node].items():
+                    if neighbor == excluded or contracted[neighbor]:
+                        continue
+                    nd = d + w
+                    if nd < dist.get(neighbor, float('inf')):
+                        dist[neighbor] = nd
+                        heapq.heappush(heap, (nd, neighbor))
+            return dist
+
+        def shortcuts_for(v):
+            shortcuts = []
+            targets = [(w, cost) for w, (cost, _) in out_edges[v].items() if not contracted[w]]
+            if not targets:
+                return shortcuts
+            max_out = max(cost for _, cost in targets)
+            for u, (cost_in, _) in in_edges[v].items():
+                if contracted[u]:
+                    continue
+                dist = witness_distance(u, v, cost_in + max_out, witness_limit)
+                for w, cost_out in targets:
+                    if w == u:
+                        continue
+                    via = cost_in + cost_out
+                    if dist.get(w, float('inf')) > via:
+                        shortcuts.append((u, w, via))
+            return shortcuts
+
+        def priority(v):
+            degree = (sum(1 for u in in_edges[v] if not contracted[u]) +
+                      sum(1 for w in out_edges[v] if not contracted[w]))
+            return 2 * (len(shortcuts_for(v)) - degree) + deleted_neighbors[v] + level[v]
+
+        queue = [(priority(v), v) for v in range(n)]
+        heapq.heapify(queue)
+        order = 0
+        while queue:
+            _, v = heapq.heappop(queue)
+            if contracted[v]:
+                continue
+            # Actualización perezosa: si la prioridad ha empeorado, se vuelve a encolar
+            current = priority(v)
+            if queue and current > queue[0][0]:
+                heapq.heappush(queue, (current, v))
+                continue
+
+            for u, w, via in shortcuts_for(v):
+                if via < out_edges[u].get(w, (float('inf'),))[0]:
+                    out_edges[u][w] = (via, v)
+                    in_edges[w][u] = (via, v)
+                    hierarchy.shortcut_count += 1
+            contracted[v] = 1
+            hierarchy.rank[v] = order
+            order += 1
+            for neighbor in list(in_edges[v]) + list(out_edges[v]):
+                deleted_neighbors[neighbor] += 1
+                level[neighbor] = max(level[neighbor], level[v] + 1)
+
+        hierarchy._store_upward(out_edges)
+        return hierarchy
+
+    def customize(self, adjacency, metric):
+        # Jerarquía para otra métrica (o los mismos pesos con segmentos cerrados) sin volver a
+        # contraer, como en las Customizable CH (Dibbelt, Strasser y Wagner): se conserva el
+        # orden y se añaden todos los atajos que ese orden puede necesitar, sin búsquedas de
+        # testigos, así que sirven con cualquier peso
+        inf = float('inf')
+        rank, upper = self.rank, self._upper_neighbors(adjacency)
+        weights = adjacency.metric_weights(metric)
+        order = sorted(range(self.node_count), key=rank.__getitem__)
+        # cost[a][b] = coste del arco a -> b (en los dos sentidos de cada arista del grafo con
+        # atajos) y middle[a][b] su nodo intermedio. cost[a][a] = 0 ahorra comprobar x != y
+        cost = [{v: 0.0} for v in range(self.node_count)]
+        middle = [{} for _ in range(self.node_count)]
+        for v in order:
+            for x in upper[v]:
+                cost[v][x] = cost[x][v] = inf
+                middle[v][x] = middle[x][v] = -1
+        for u in range(self.node_count):
+            for k in range(adjacency.offsets[u], adjacency.offsets[u + 1]):
+                v, w = adjacency.targets[k], weights[k]
+                if w < cost[u][v]:
+                    cost[u][v] = w
+
+        # Personalización básica, de menor a mayor rango: cada triángulo x -> v -> y con v por
+        # debajo de x e y mejora el arco x -> y
+        for v in order:
+            neighbors, from_v = upper[v], cost[v]
+            for x in neighbors:
+                to_v = cost[x][v]
+                if to_v == inf:
+                    continue
+                from_x, middle_x = cost[x], middle[x]
+                for y in neighbors:
+                    via = to_v + from_v[y]
+                    if via < from_x[y]:
+                        from_x[y] = via
+                        middle_x[y] = v
+
+        # Personalización perfecta, de mayor a menor rango: si v -> y -> x (con y por encima de
+        # v) es más corto que v -> x, el arco no está en ningún camino mínimo y se quita. Deja
+        # el grafo de búsqueda cerca del de la contracción original
+        removed = set()
+        for v in reversed(order):
+            neighbors, from_v = upper[v], cost[v]
+            for x in neighbors:
+                from_x = cost[x]
+                best_to, best_from = from_v[x], from_x[v]
+                for y in neighbors:
+                    from_y = cost[y]
+                    via = from_v[y] + from_y[x]
+                    if via < best_to:
+                        best_to = via
+                    via = from_x[y] + from_y[v]
+                    if via < best_from:
+                        best_from = via
+                if best_to < from_v[x]:
+                    from_v[x] = best_to
+                    removed.add((v, x))
+                if best_from < from_x[v]:
+                    from_x[v] = best_from
+                    removed.add((x, v))
+
+        hierarchy = ContractionHierarchy(self.node_count, metric, self.fingerprint)
+        hierarchy.rank = self.rank
+        hierarchy._upper = self._upper
+        out_edges = [dict() for _ in range(self.node_count)]
+        for v in order:
+            for x in upper[v]:
+                for a, b in ((v, x), (x, v)):
+                    if cost[a][b] != inf and (a, b) not in removed:
+                        out_edges[a][b] = (cost[a][b], middle[a][b])
+        hierarchy.shortcut_count = sum(m != -1 for edges in out_edges for _, m in edges.values())
+        hierarchy._store_upward(out_edges)
+        return hierarchy
+
+    def _upper_neighbors(self, adjacency):
+        # Vecinos de mayor rango de cada nodo al contraer en el orden de rank uniendo entre sí
+        # todos los vecinos superiores (grafo sin dirección). Solo depende del orden y de la
+        # topología, así que se calcula una vez y lo comparten todas las personalizaciones
+        if self._upper is not None and self._upper[0] is adjacency.targets:
+            return self._upper[1]
+        rank = self.rank
+        neighbors = [set() for _ in range(self.node_count)]
+        for u, v in adjacency.edges():
+            neighbors[u].add(v)
+            neighbors[v].add(u)
+        upper = [None] * self.node_count
+        for v in sorted(range(self.node_count), key=rank.__getitem__):
+            higher = sorted((x for x in neighbors[v] if rank[x] > rank[v]), key=rank.__getitem__)
+            for i, x in enumerate(higher):
+                for y in higher[i + 1:]:
+                    neighbors[x].add(y)
+                    neighbors[y].add(x)
+            upper[v] = higher
+        self._upper = (adjacency.targets, upper)
+        return upper
+
+    def _store_upward(self, out_edges):
+        rank = self.rank
+        up = [[] for _ in range(self.node_count)]
+        down = [[] for _ in range(self.node_count)]
+        for u in range(self.node_count):
+            for v, (cost, middle) in out_edges[u].items():
+                if rank[v] > rank[u]:
+                    up[u].append((v, cost, middle))
+                else:
+                    down[v].append((u, cost, middle))
+
+        for lists, offsets, targets, weights, middles in (
+                (up, self.up_offsets, self.up_targets, self.up_weights, self.up_middles),
+                (down, self.down_offsets, self.down_targets, self.down_weights, self.down_middles)):
+            for u, edges in enumerate(lists):
+                offsets[u + 1] = offsets[u] + len(edges)
+                for v, cost, middle in edges:
+                    targets.append(v)
+                    weights.append(cost)
+                    middles.append(middle)
+
+    def query(self, source, target):
+        # Dijkstra bidireccional ascendente; se detiene cuando ningún frente puede mejorar la mejor ruta
+        if source == target:
+            return RouteResult(0.0, [source], 0)
+        dist = ({source: 0.0}, {target: 0.0})
+        parent = ({source: (-1, -1)}, {target: (-1, -1)})
+        heaps = ([(0.0, source)], [(0.0, target)])
+        graphs = ((self.up_offsets, self.up_targets, self.up_weights, self.up_middles),
+                  (self.down_offsets, self.down_targets, self.down_weights, self.down_middles))
+        best, meeting = float('inf'), -1
+        expanded = 0
+
+        while heaps[0] or heaps[1]:
+            side = 0 if heaps[0] and (not heaps[1] or heaps[0][0][0] <= heaps[1][0][0]) else 1
+            d, node = heapq.heappop(heaps[side])
+            if d > dist[side][node]:
+                continue
+            if d >= best:
+                # Este frente ya no puede mejorar la ruta; se vacía
+                heaps[side].clear()
+                continue
+            expanded += 1
+            other = dist[1 - side].get(node)
+            if other is not None and d + other < best:
+                best, meeting = d + other, node
+
+            # Stall-on-demand: si un nodo de rango superior ya llega más barato, no se expande
+            offsets, targets, weights, _ = graphs[1 - side]
+            side_dist = dist[side]
+            if any(side_dist.get(targets[k], float('inf')) + weights[k] < d
+                   for k in range(offsets[node], offsets[node + 1])):
+                continue
+
+            offsets, targets, weights, middles = graphs[side]
+            for k in range(offsets[node], offsets[node + 1]):
+                neighbor = targets[k]
+                nd = d + weights[k]
+                if nd < dist[side].get(neighbor, float('inf')):
+                    dist[side][neighbor] = nd
+                    parent[side][neighbor] = (node, middles[k])
+                    heapq.heappush(heaps[side], (nd, neighbor))
+
+        if meeting == -1:
+            return RouteResult(float('inf'), [], expanded)
+
+        # Tramo origen -> encuentro (aristas u -> v) y encuentro -> destino (aristas v -> u)
+        forward = []
+        node = meeting
+        while parent[0][node][0] != -1:
+            previous, middle = parent[0][node]
+            forward.append((previous, node, middle))
+            node = previous
+        forward.reverse()
+        backward = []
+        node = meeting
+        while parent[1][node][0] != -1:
+            following, middle = parent[1][node]
+            backward.append((node, following, middle))
+            node = following
+
+        nodes = [source]
+        for u, v, middle in forward + backward:
+            self._unpack(u, v, middle, nodes)
+        return RouteResult(best, nodes, expanded)
+
+    def _unpack(self, u, v, middle, nodes):
+        # Sustituye recursivamente cada atajo por las dos aristas que representa
+        stack = [(u, v, middle)]
+        while stack:
+            u, v, middle = stack.pop()
+            if middle == -1:
+                nodes.append(v)
+            else:
+                stack.append((middle, v, self._middle(middle, v)))
+                stack.append((u, middle, self._middle(u, middle)))
+
+    def _middle(self, u, v):
+        # El atajo u -> v está guardado en el nodo de menor rango
+        if self.rank[v] > self.rank[u]:
+            offsets, targets, middles, start = self.up_offsets, self.up_targets, self.up_middles, u
+            other = v
+        else:
+            offsets, targets, middles, start = self.down_offsets, self.down_targets, self.down_middles, v
+            other = u
+        for k in range(offsets[start], offsets[start + 1]):
+            if targets[k] == other:
+                return middles[k]
+        raise ValueError(f"Edge {u} -> {v} not found in the hierarchy")
+
+    def _arrays(self):
+        return [self.rank, self.up_offsets, self.up_targets, self.up_weights, self.up_middles,
+                self.down_offsets, self.down_targets, self.down_weights, self.down_middles]
+
+    def save(self, filename):
+        header = {"format": CH_FORMAT, "nodes": self.node_count, "metric": self.metric,
+                  "fingerprint": self.fingerprint, "shortcuts": self.shortcut_count,
+                  "lengths": [len(a) for a in self._arrays()]}
+        data = json.dumps(header).encode('utf-8')
+        with open(filename, 'wb') as f:
+            f.write(len(data).to_bytes(4, 'little'))
+            f.write(data)
+            for values in self._arrays():
+                values.tofile(f)
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename, 'rb') as f:
+            size = int.from_bytes(f.read(4), 'little')
+            header = json.loads(f.read(size).decode('utf-8'))
+            if header.get("format") != CH_FORMAT:
+                raise ValueError(f"Unsupported hierarchy format in {filename}")
+            hierarchy = cls(header["nodes"], header["metric"], header["fingerprint"])
+            hierarchy.shortcut_count = header["shortcuts"]
+            for values, length in zip(hierarchy._arrays(), header["lengths"]):
+                del values[:]
+                values.fromfile(f, length)
+        return hierarchy
@@ -0,0 +1,14 @@
+import hashlib
+import os
+
+
+def dataset_fingerprint(paths):
+    # Hash del contenido de los ficheros de un dataset (nav, seg, aer)
+    digest = hashlib.sha1()
+    for path in paths:
+        if path and os.path.exists(path):
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+        digest.update(b'\0')
+    return digest.hexdigest()
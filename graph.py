@@ -1,4 +1,5 @@
 import heapq
+from collections import deque
 from path import Path
 from airSpace import AirSpace
 from node import Node, Distance
@@ -8,15 +9,55 @@ import matplotlib.pyplot as plt
 class Graph:
     def __init__(self):
         self.nodes = []
+        self.by_name = {}  # nombre -> Node
+        self._linked = {}  # Node -> (node.version, conjunto de sus vecinos)
+        self._unmatched = 0  # aristas u -> v (u del grafo) sin la inversa v -> u; simétrico si es 0
+        self._stale = False  # AddNeighbor ha tocado algún nodo del grafo: hay que volver a contar
         self.airspace = None
         self.mode = "graph"
 
+    def _neighbor_set(self, node):
+        # _link mantiene el conjunto junto a la lista; si la lista ha cambiado desde fuera
+        # (AddNeighbor sube node.version) se rehace
+        entry = self._linked.get(node)
+        if entry is None or entry[0] != node.version:
+            entry = self._linked[node] = (node.version, set(node.neighbors))
+        return entry[1]
+
+    def _link(self, node, neighbor):
+        linked = self._neighbor_set(node)
+        if neighbor in linked:
+            return False
+        linked.add(neighbor)
+        node.neighbors.append(neighbor)
+        node.version += 1
+        self._linked[node] = (node.version, linked)
+        if neighbor is not node:
+            reverse = node in self._neighbor_set(neighbor)
+            if not reverse and self in node.graphs:
+                self._unmatched += 1
+            if reverse and self in neighbor.graphs:
+                self._unmatched -= 1  # la inversa estaba contada y ya tiene pareja
+            for graph in node.graphs + neighbor.graphs:
+                if graph is not self:
+                    graph.neighbors_changed()
+        return True
+
+    def neighbors_changed(self):
+        # Aviso de AddNeighbor (o de otro Graph) al cambiar los vecinos de un nodo de este grafo
+        self._stale = True
+
     def add_node(self, node):
 
         if self.mode != "graph":
             raise ValueError("Cannot add nodes in airspace mode")
-        if not any(n.name == node.name for n in self.nodes):
+        if node.name not in self.by_name:
             self.nodes.append(node)
+            self.by_name[node.name] = node
+            node.graphs.append(self)
+            # Vecinos que ya traía (AddNeighbor antes de add_node): sus aristas entran en la cuenta
+            self._unmatched += sum(node not in self._neighbor_set(neighbor)
+                                   for neighbor in node.neighbors if neighbor is not node)
             return True
         return False
 
@@ -26,18 +67,14 @@ class Graph:
             raise ValueError("Cannot connect nodes in airspace mode")
         node1 = self.get_node_by_name(name1)
         node2 = self.get_node_by_name(name2)
-        if node1 and node2 and node2 not in node1.neighbors:
-            node1.neighbors.append(node2)
-            return True
+        if node1 and node2:
+            return self._link(node1, node2)
         return False
 
     def get_node_by_name(self, name):
         if self.mode == "airspace" and self.airspace:
             return self.airspace.find_point_by_name(name)
-        for node in self.nodes:
-            if node.name == name:
-                return node
-        return None
+        return self.by_name.get(name)
 
     def reachable_nodes(self, start_name):
         if self.mode == "airspace" and self.airspace:
@@ -47,37 +84,44 @@ class Graph:
         if not start_node:
             return []
 
-        visited = []
-        queue = [start_node]
-
+        # BFS con cola deque y conjunto de visitados (por identidad): O(N + E)
+        visited = [start_node]
+        seen = {id(start_node)}
+        queue = deque(visited)
         while queue:
-            current = queue.pop(0)
-            if current not in visited:
-                visited.append(current)
-                queue.extend(neighbor for neighbor in current.neighbors
-                             if neighbor not in visited)
+            current = queue.popleft()
+            for neighbor in current.neighbors:
+                if id(neighbor) not in seen:
+                    seen.add(id(neighbor))
+                    visited.append(neighbor)
+                    queue.append(neighbor)
         return visited
 
-    def FindShortestPath(self, origin_name, destination_name):
+    def FindShortestPath(self, origin_name, destination_name, bidirectional=False):
         if self.mode == "airspace" and self.airspace:
-            return self.airspace.find_shortest_path(origin_name, destination_name)
+            method = "bidirectional" if bidirectional else None
+            return self.airspace.find_shortest_path(origin_name, destination_name, method=method)
 
         origin = self.get_node_by_name(origin_name)
         destination = self.get_node_by_name(destination_name)
 
         if not origin or not destination:
             return None
-        open_set = []
-        heapq.heappush(open_set, (0, 0, Path(origin)))
+        # Con aristas dirigidas (connect) no hay búsqueda hacia atrás válida
+        if bidirectional and self.is_symmetric():
+            return self._bidirectional_path(origin, destination)
 
+        g_cost = {origin: 0.0}
+        parent = {origin: None}
         closed_set = set()
+        counter = 0
+        open_set = [(Distance(origin, destination), counter, origin)]
 
         while open_set:
-            _, g_cost, current_path = heapq.heappop(open_set)
-            current_node = current_path.nodes[-1]
+            _, _, current_node = heapq.heappop(open_set)
 
             if current_node == destination:
-                return current_path
+                return self._make_path(parent, destination)
 
             if current_node in closed_set:
                 continue
@@ -87,32 +131,82 @@ class Graph:
                 if neighbor in closed_set:
                     continue
 
-                segment_cost = Distance(current_node, neighbor)
-                new_g_cost = g_cost + segment_cost
-                h_cost = Distance(neighbor, destination)
-
-                new_path = current_path.copy()
-                new_path.AddNodeToPath(neighbor, segment_cost)
-
-                heapq.heappush(open_set, (new_g_cost + h_cost, new_g_cost, new_path))
+                new_g_cost = g_cost[current_node] + Distance(current_node, neighbor)
+                if new_g_cost < g_cost.get(neighbor, float('inf')):
+                    g_cost[neighbor] = new_g_cost
+                    parent[neighbor] = current_node
+                    counter += 1
+                    heapq.heappush(open_set, (new_g_cost + Distance(neighbor, destination), counter, neighbor))
 
         return None
 
+    def is_symmetric(self):
+        # Contador llevado por add_node y _link; solo tras ediciones con AddNeighbor en nodos
+        # de este grafo se vuelve a contar todo
+        if self._stale:
+            self._unmatched = sum(node not in self._neighbor_set(neighbor)
+                                  for node in self.nodes for neighbor in node.neighbors if neighbor is not node)
+            self._stale = False
+        return self._unmatched == 0
+
+    def _bidirectional_path(self, origin, destination):
+        # Dijkstra bidireccional: se para cuando top_f + top_b >= mejor ruta encontrada
+        if origin == destination:
+            return Path([origin])
+        g_cost = ({origin: 0.0}, {destination: 0.0})
+        parent = ({origin: None}, {destination: None})
+        closed = (set(), set())
+        counter = 0
+        heaps = ([(0.0, counter, origin)], [(0.0, counter, destination)])
+        best, meeting = float('inf'), None
+
+        while heaps[0] and heaps[1]:
+            if heaps[0][0][0] + heaps[1][0][0] >= best:
+                break
+            side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+            cost, _, node = heapq.heappop(heaps[side])
+            if node in closed[side]:
+                continue
+            closed[side].add(node)
+
+            for neighbor in node.neighbors:
+                new_cost = cost + Distance(node, neighbor)
+                if new_cost < g_cost[side].get(neighbor, float('inf')):
+                    g_cost[side][neighbor] = new_cost
+                    parent[side][neighbor] = node
+                    counter += 1
+                    heapq.heappush(heaps[side], (new_cost, counter, neighbor))
+                    if neighbor in g_cost[1 - side] and new_cost + g_cost[1 - side][neighbor] < best:
+                        best, meeting = new_cost + g_cost[1 - side][neighbor], neighbor
+
+        if meeting is None:
+            return None
+        path = self._make_path(parent[0], meeting)
+        node = parent[1][meeting]
+        while node is not None:
+            path.add_node(node, Distance(path.last_node(), node))
+            node = parent[1][node]
+        return path
+
+    def _make_path(self, parent, destination):
+        nodes = []
+        node = destination
+        while node is not None:
+            nodes.append(node)
+            node = parent[node]
+        nodes.reverse()
+
+        path = Path([nodes[0]])
+        for previous, node in zip(nodes, nodes[1:]):
+            path.add_node(node, Distance(previous, node))
+        return path
+
     def closest(self, x, y):
         if self.mode == "airspace" and self.airspace:
             if not self.airspace.nav_points:
                 return None
-            # Convert x,y to lon,lat for airspace mode
-            from navPoint import NavPoint
-            temp_point = NavPoint(0, "temp", y, x)  # Note: lat=y, lon=x
-            closest = None
-            min_dist = float('inf')
-            for point in self.airspace.nav_points.values():
-                dist = point.distance_to(temp_point)
-                if dist < min_dist:
-                    min_dist = dist
-                    closest = point
-            return closest
+            # x, y son lon, lat; consulta al índice espacial del AirSpace
+            return self.airspace.nearest_point(y, x)
 
         min_dist = float('inf')
         closest_node = None
@@ -137,12 +231,12 @@ class Graph:
             raise ValueError("Cannot add nodes in airspace mode")
 
         # Generate a unique name
-        name = f"N{len(self.nodes) + 1}"
-        while self.get_node_by_name(name):
-            name = f"N{len(self.nodes) + 1}"
+        number = len(self.nodes) + 1
+        while f"N{number}" in self.by_name:
+            number += 1
 
-        new_node = Node(name, x, y)
-        self.nodes.append(new_node)
+        new_node = Node(f"N{number}", x, y)
+        self.add_node(new_node)
         return new_node
 
     def add_segment_by_nodes(self, node1, node2):
@@ -151,9 +245,8 @@ class Graph:
             raise ValueError("Cannot add segments in airspace mode")
 
         if node1 and node2 and node1 != node2:
-            if node2 not in node1.neighbors:
-                node1.neighbors.append(node2)
-                node2.neighbors.append(node1)  # Make it bidirectional
+            if self._link(node1, node2):
+                self._link(node2, node1)  # Make it bidirectional
                 return True
         return False
 
@@ -197,12 +290,8 @@ class Graph:
         plt.figure(figsize=(10, 8))
 
         if self.mode == "airspace" and self.airspace:
-            for segment in self.airspace.nav_segments:
-                origin = self.airspace.nav_points.get(segment.origin_number)
-                dest = self.airspace.nav_points.get(segment.destination_number)
-                if origin and dest:
-                    plt.plot([origin.longitude, dest.longitude],
-                             [origin.latitude, dest.latitude], 'gray')
+            xs, ys = self.airspace.adjacency.segment_lines()
+            plt.plot(xs, ys, 'gray')
 
             for point in self.airspace.nav_points.values():
                 color = 'blue' if focus and point.name == focus else 'black'
@@ -3,6 +3,7 @@ import subprocess
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from airSpace import AirSpace
+from tiles import TiledAirSpace
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 import os
@@ -18,6 +19,8 @@ class AirSpaceGUI:
         self.master.geometry("1200x900")
 
         self.airspace = AirSpace()
+        self.tiled = None  # TiledAirSpace abierto con "Open Tiles...", en lugar de self.airspace
+        self.view_limits = None
         self.figure, self.ax = plt.subplots(figsize=(10, 7))
         self.canvas = FigureCanvasTkAgg(self.figure, master=self.master)
         self.toolbar = NavigationToolbar2Tk(self.canvas, self.master)
@@ -48,6 +51,7 @@ class AirSpaceGUI:
         self.update_drawing()
 
         self.canvas.mpl_connect('button_press_event', self.on_click)
+        self.canvas.mpl_connect('button_release_event', self.on_view_change)
         # NO creamos aún el simulador aquí
 
     def get_coords(self, navpoint):
@@ -72,8 +76,18 @@ class AirSpaceGUI:
                    command=lambda: self.load_airspace("ECAC")).pack(side=tk.LEFT, padx=2)
         ttk.Button(load_frame, text="Custom Load...",
                    command=self.load_custom).pack(side=tk.LEFT, padx=2)
+        ttk.Button(load_frame, text="Build Tiles...",
+                   command=self.build_tiles).pack(side=tk.LEFT, padx=2)
+        ttk.Button(load_frame, text="Open Tiles...",
+                   command=self.open_tiles).pack(side=tk.LEFT, padx=2)
         ttk.Button(load_frame, text="Clear",
                    command=self.clear_selection).pack(side=tk.LEFT, padx=2)
+        # Desactivado por defecto: al activarlo las rutas calculadas se guardan en
+        # <fichero nav>.routes (con sus -wal/-shm de SQLite) junto al dataset, y se reutilizan
+        # en las sesiones siguientes mientras el dataset no cambie
+        self.route_store_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(load_frame, text="Keep routes (<nav file>.routes)",
+                        variable=self.route_store_var).pack(side=tk.LEFT, padx=2)
 
         node_frame = ttk.LabelFrame(control_panel, text="Node Operations")
         node_frame.pack(side=tk.LEFT, padx=5, pady=5, fill=tk.X, expand=True)
@@ -96,6 +110,15 @@ class AirSpaceGUI:
         ttk.Button(path_frame, text="Find Path",
                    command=self.find_shortest_path).pack(side=tk.LEFT, padx=2)
 
+        plan_frame = ttk.LabelFrame(control_panel, text="Flight Plan")
+        plan_frame.pack(side=tk.LEFT, padx=5, pady=5, fill=tk.X, expand=True)
+
+        ttk.Label(plan_frame, text="Waypoints:").pack(side=tk.LEFT)
+        self.waypoint_entry = ttk.Entry(plan_frame, width=20)
+        self.waypoint_entry.pack(side=tk.LEFT, padx=2)
+        ttk.Button(plan_frame, text="Plan",
+                   command=self.plan_flight).pack(side=tk.LEFT, padx=2)
+
         export_frame = ttk.LabelFrame(control_panel, text="Export")
         ttk.Button(export_frame, text="Save Graph", command=self.save_graph).pack(side=tk.LEFT, padx=2)
         ttk.Button(export_frame, text="Load Graph", command=self.load_saved_graph).pack(side=tk.LEFT, padx=2)
@@ -122,7 +145,8 @@ class AirSpaceGUI:
                 raise FileNotFoundError(f"Required files not found for {region}")
 
             self.clear_selection()
-            self.airspace.load_from_files(nav_file, seg_file, airport_file)
+            self.airspace.load_from_files(nav_file, seg_file, airport_file,
+                                          route_store=self.route_store_var.get())
             self.update_drawing()
             messagebox.showinfo("Success", f"{region.upper()} data loaded successfully")
         except Exception as e:
@@ -148,21 +172,54 @@ class AirSpaceGUI:
                 filetypes=[("Text files", "*.txt")])
 
             self.clear_selection()
-            self.airspace.load_from_files(nav_file, seg_file, airport_file)
+            self.airspace.load_from_files(nav_file, seg_file, airport_file,
+                                          route_store=self.route_store_var.get())
             self.update_drawing()
             messagebox.showinfo("Success", "Custom data loaded successfully")
         except Exception as e:
             print("Error loading custom airspace:", e)
             messagebox.showerror("Error", f"Failed to load custom data:\n{str(e)}")
 
+    def build_tiles(self):
+        if not self.airspace.point_list:
+            messagebox.showwarning("No Data", "Load an airspace before building tiles")
+            return
+        directory = filedialog.askdirectory(title="Select Tiles Folder")
+        if not directory:
+            return
+        try:
+            count = self.airspace.save_tiles(directory)
+            messagebox.showinfo("Success", f"{count} tiles written to:\n{directory}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to build tiles:\n{str(e)}")
+
+    def open_tiles(self):
+        # Solo se cargan las teselas de la vista (y las que toquen las búsquedas)
+        directory = filedialog.askdirectory(title="Open Tiles Folder")
+        if not directory:
+            return
+        try:
+            tiled = TiledAirSpace(directory)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to open tiles:\n{str(e)}")
+            return
+        self.clear_selection()
+        self.tiled = tiled
+        self.update_drawing()
+
+    def active_airspace(self):
+        return self.tiled if self.tiled is not None else self.airspace
+
     def clear_selection(self):
         self.selected_node = None
         self.reachable_nodes = []
         self.shortest_path = []
         self.shortest_path_cost = 0.0
-        self.airspace.nav_points.clear()
-        self.airspace.nav_segments.clear()
-        self.airspace.nav_airports.clear()
+        self.airspace.clear()
+        if self.tiled is not None:
+            self.tiled.close()
+            self.tiled = None
+        self.view_limits = None
         self.update_drawing()
 
     #Guardar grafo con nodos, segmentos,...
@@ -224,7 +281,7 @@ class AirSpaceGUI:
 
     def find_neighbors(self):
         name = self.node_entry.get()
-        self.selected_node = self.airspace.find_point_by_name(name)
+        self.selected_node = self.active_airspace().find_point_by_name(name)
         if not self.selected_node:
             messagebox.showwarning("Warning", f"Node '{name}' not found")
             return
@@ -234,7 +291,7 @@ class AirSpaceGUI:
 
     def show_reachable(self):
         name = self.reach_entry.get()
-        self.reachable_nodes = self.airspace.reachable_nodes(name)
+        self.reachable_nodes = self.active_airspace().reachable_nodes(name)
         if not self.reachable_nodes:
             messagebox.showwarning("Warning", f"No reachable nodes from '{name}'")
         self.selected_node = None
@@ -245,7 +302,7 @@ class AirSpaceGUI:
         start = self.start_entry.get()
         end = self.end_entry.get()
 
-        path = self.airspace.find_shortest_path(start, end)
+        path = self.active_airspace().find_shortest_path(start, end)
         if path:
             self.shortest_path = path.nodes
             self.shortest_path_cost = path.cost
@@ -265,17 +322,17 @@ class AirSpaceGUI:
         if len(waypoints) < 2:
             messagebox.showwarning("Warning", "Please enter at least 2 waypoints separated by commas")
             return
+        if self.tiled is not None:
+            messagebox.showwarning("Warning", "Flight plans need a loaded airspace, not tiles")
+            return
 
         complete_route = self.airspace.plan_flight(waypoints)
         if not complete_route:
             messagebox.showinfo("Flight Plan", "No valid route found for the given waypoints")
             return
 
-        self.shortest_path = complete_route
-        self.shortest_path_cost = sum(
-            complete_route[i].distance_to(complete_route[i + 1])
-            for i in range(len(complete_route) - 1)
-        )
+        self.shortest_path = complete_route.nodes
+        self.shortest_path_cost = complete_route.cost
 
         messagebox.showinfo("Flight Plan",
                             f"Flight planned! Total distance: {self.shortest_path_cost:.2f} km")
@@ -453,14 +510,97 @@ class AirSpaceGUI:
             messagebox.showerror("Error", f"Failed to export full airspace: {str(e)}")
 
     def on_click(self, event):
-        if event.xdata and event.ydata:
-            print(f"Clicked at: ({event.xdata:.4f}, {event.ydata:.4f})")
+        # Ajusta el clic al NavPoint más cercano: el primero es el origen y el segundo el destino
+        if event.inaxes != self.ax or event.xdata is None or event.ydata is None or self.toolbar.mode:
+            return
+        point = self.active_airspace().nearest_point(event.ydata, event.xdata)
+        if not point:
+            return
+        if not self.start_entry.get() or self.end_entry.get():
+            self.start_entry.delete(0, tk.END)
+            self.start_entry.insert(0, point.name)
+            self.end_entry.delete(0, tk.END)
+        else:
+            self.end_entry.delete(0, tk.END)
+            self.end_entry.insert(0, point.name)
+        self.node_entry.delete(0, tk.END)
+        self.node_entry.insert(0, point.name)
+        self.selected_node = point
+        self.reachable_nodes = []
+        self.shortest_path = []
+        self.update_drawing()
+
+    def on_view_change(self, event):
+        # Tras un zoom o desplazamiento en modo teselas se cargan las teselas de la nueva vista
+        if self.tiled is None:
+            return
+        limits = (self.ax.get_xlim(), self.ax.get_ylim())
+        if limits != self.view_limits:
+            self.view_limits = limits
+            self.update_drawing()
+
+    def draw_tiles(self):
+        # Contornos de las teselas de la vista; puntos y segmentos solo si caben en la caché del
+        # TiledAirSpace, para no cargar el dataset entero al alejar la vista
+        tiled = self.tiled
+        if self.view_limits is None:
+            min_lat, min_lon, max_lat, max_lon = tiled.bounds()
+            self.view_limits = ((min_lon, max_lon), (min_lat, max_lat))
+        (min_lon, max_lon), (min_lat, max_lat) = self.view_limits
+        self.ax.set_xlim(min_lon, max_lon)
+        self.ax.set_ylim(min_lat, max_lat)
+
+        size = tiled.cell_size
+        in_view = tiled.tiles_in_bbox(min_lat, min_lon, max_lat, max_lon)
+        for tile in in_view:
+            row, column = tiled.tile_keys[tile]
+            self.ax.add_patch(plt.Rectangle((column * size, row * size), size, size, fill=False,
+                                            edgecolor=self.colors['segment'], linewidth=0.5, alpha=0.3))
+
+        if len(in_view) > tiled.tile_cache.maxsize:
+            self.ax.set_title(f"{len(in_view)} tiles in view - zoom in to load them")
+        else:
+            with tiled.pinned_tiles():
+                xs, ys = tiled.segment_lines(min_lat, min_lon, max_lat, max_lon)
+                self.ax.plot(xs, ys, color=self.colors['segment'], linewidth=1, alpha=0.4)
+                nodes = tiled.points_in_bbox(min_lat, min_lon, max_lat, max_lon)
+                selected = self.selected_node.id if self.selected_node else None
+                neighbor_ids = set(tiled.adjacency.neighbors(selected)) if self.selected_node else set()
+                label_offset = 0.008 * (max_lat - min_lat)
+                for node in nodes:
+                    point = tiled.points[node]
+                    color, size = self.colors['normal'], 4
+                    if node == selected:
+                        color, size = self.colors['selected'], 6
+                    elif node in neighbor_ids:
+                        color, size = self.colors['neighbor'], 5
+                    elif node in self.reachable_nodes:
+                        color, size = self.colors['reachable'], 6
+                    self.ax.plot(point.longitude, point.latitude, 'o', color=color, markersize=size, alpha=0.8)
+                    if len(nodes) <= 300:
+                        self.ax.text(point.longitude, point.latitude + label_offset,
+                                     point.name, fontsize=6, ha='center', color='white', alpha=0.9)
+            self.ax.set_title(f"{len(in_view)} tiles in view, {tiled.tiles_loaded} loaded")
+
+        if len(self.shortest_path) > 1:
+            self.ax.plot([p.longitude for p in self.shortest_path], [p.latitude for p in self.shortest_path],
+                         color=self.colors['highlight'], linewidth=2, alpha=1.0)
+            self.ax.set_title(f"Shortest Path - Cost: {self.shortest_path_cost:.2f} km")
+
+        self.ax.set_xlabel("Longitude")
+        self.ax.set_ylabel("Latitude")
+        self.ax.grid(True, alpha=0.3)
+        self.canvas.draw()
 
     def update_drawing(self):
         self.ax.clear()
         self.figure.patch.set_facecolor("black")
         self.ax.set_facecolor("black")
 
+        if self.tiled is not None:
+            self.draw_tiles()
+            return
+
         if not self.airspace.nav_points:
             self.ax.set_title("No data loaded")
             self.canvas.draw()
@@ -475,38 +615,34 @@ class AirSpaceGUI:
         self.ax.set_xlim(min(lons) - lon_margin, max(lons) + lon_margin)
         self.ax.set_ylim(min(lats) - lat_margin, max(lats) + lat_margin)
 
-        # Segmentos
-        for seg in self.airspace.nav_segments:
-            origin = seg.origin
-            dest = seg.destination
-            if origin and dest:
-                if (self.shortest_path and
-                        origin in self.shortest_path and
-                        dest in self.shortest_path and
-                        abs(self.shortest_path.index(origin) - self.shortest_path.index(dest)) == 1):
-                    self.ax.plot([origin.longitude, dest.longitude],
-                                 [origin.latitude, dest.latitude],
-                                 color=self.colors['highlight'], linewidth=2, alpha=1.0)
-                else:
-                    self.ax.plot([origin.longitude, dest.longitude],
-                                 [origin.latitude, dest.latitude],
-                                 color=self.colors['segment'], linewidth=1, alpha=0.4)
+        # Segmentos (sobre ids de la adyacencia CSR)
+        adjacency = self.airspace.adjacency
+        xs, ys = adjacency.segment_lines()
+        self.ax.plot(xs, ys, color=self.colors['segment'], linewidth=1, alpha=0.4)
+        path_ids = [p.id for p in self.shortest_path]
+        if len(path_ids) > 1:
+            self.ax.plot([adjacency.longitudes[i] for i in path_ids],
+                         [adjacency.latitudes[i] for i in path_ids],
+                         color=self.colors['highlight'], linewidth=2, alpha=1.0)
 
         # NavPoints
-        for point in self.airspace.nav_points.values():
+        neighbor_ids = set(adjacency.neighbors(self.selected_node.id)) if self.selected_node else set()
+        reachable_ids = {p.id for p in self.reachable_nodes}
+        path_set = set(path_ids)
+        for point in self.airspace.point_list:
             color = self.colors['normal']
             size = 4
 
             if self.selected_node and point == self.selected_node:
                 color = self.colors['selected']
                 size = 6
-            elif self.selected_node and point in self.selected_node.neighbors:
+            elif point.id in neighbor_ids:
                 color = self.colors['neighbor']
                 size = 5
-            elif point in self.reachable_nodes:
+            elif point.id in reachable_ids:
                 color = self.colors['reachable']
                 size = 6
-            elif point in self.shortest_path:
+            elif point.id in path_set:
                 if point == self.shortest_path[0]:
                     color = self.colors['start']
                 elif point == self.shortest_path[-1]:
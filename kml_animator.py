@@ -19,14 +19,23 @@ class KMLAnimator:
             print("Not enough airports to generate flights")
             return
 
+        pairs = []
         for _ in range(num_flights):
             origin = random.choice(airports)
             destination = random.choice(airports)
             while destination == origin:
                 destination = random.choice(airports)
+            pairs.append((origin, destination))
 
-            if origin.name in self.airspace.nav_points and destination.name in self.airspace.nav_points:
-                path_obj = self.airspace.find_shortest_path(origin.name, destination.name)
+        # Un solo árbol de caminos mínimos por aeropuerto de origen (desde todas sus SID)
+        by_origin = {}
+        for origin, destination in pairs:
+            if origin.sids and destination.stars:
+                by_origin.setdefault(origin.name, []).append(destination.name)
+        for origin_name, destination_names in by_origin.items():
+            paths = self.airspace.airport_paths_from(origin_name, destination_names)
+            for name in destination_names:
+                path_obj = paths[name]
                 if path_obj and path_obj.nodes:
                     flights.append(list(path_obj.nodes))  # ⚠️ COPIA SEGURA
 
@@ -0,0 +1,179 @@
+import random
+from array import array
+from routing import dijkstra, breadth_first
+
+STRATEGIES = ("farthest", "avoid")
+
+
+class Landmarks:
+    # Heurística ALT (A*, landmarks, desigualdad triangular). Para cada landmark L se guardan
+    # d(L, v) y d(v, L) en float32, en tablas planas de tamaño k * n (fila i = landmark i)
+    def __init__(self, node_count, metric, landmarks, from_table, to_table):
+        self.node_count = node_count
+        self.metric = metric
+        self.landmarks = landmarks
+        self.from_table = from_table
+        self.to_table = to_table
+        finite = [d for d in from_table if d != float('inf')] + [d for d in to_table if d != float('inf')]
+        # Margen para el redondeo a float32 (24 bits de mantisa), así la cota sigue siendo inferior
+        self.tolerance = 4 * 2 ** -24 * max(finite, default=0.0)
+
+    @classmethod
+    def build(cls, adjacency, count=8, metric=None, strategy="farthest", seed=0):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown landmark strategy: {strategy} (use one of {STRATEGIES})")
+        n = adjacency.node_count
+        weights = adjacency.metric_weights(metric)
+        reverse = adjacency.reverse(metric)
+        rng = random.Random(seed)
+        count = min(count, n)
+
+        # Los landmarks se eligen en la componente más grande; en el resto la cota ALT vale 0
+        # y la búsqueda se apoya en la heurística ortodrómica
+        component, seen = [], bytearray(n)
+        for v in range(n):
+            if not seen[v]:
+                reached = breadth_first(adjacency, v)
+                for node in reached:
+                    seen[node] = 1
+                if len(reached) > len(component):
+                    component = reached
+        count = min(count, len(component))
+
+        chosen, from_rows, to_rows = [], [], []
+
+        def add(landmark):
+            chosen.append(landmark)
+            from_rows.append(dijkstra(adjacency, landmark, weights)[0])
+            to_rows.append(dijkstra(reverse, landmark)[0])
+
+        if strategy == "farthest":
+            # El primero es el nodo más lejano a uno aleatorio; después, el que maximiza
+            # la distancia mínima a los ya elegidos
+            start = rng.choice(component)
+            dist = dijkstra(adjacency, start, weights)[0]
+            add(max(component, key=lambda v: dist[v]))
+            closest = list(from_rows[0])
+            while len(chosen) < count:
+                candidate = max((v for v in component if v not in chosen), key=lambda v: closest[v])
+                add(candidate)
+                closest = [min(c, d) for c, d in zip(closest, from_rows[-1])]
+        else:
+            while len(chosen) < count:
+                landmark = cls._avoid_candidate(adjacency, weights, component, chosen,
+                                                from_rows, to_rows, rng)
+                if landmark is None:
+                    break
+                add(landmark)
+
+        from_table = array('f')
+        to_table = array('f')
+        for row in from_rows:
+            from_table.fromlist(row.tolist())
+        for row in to_rows:
+            to_table.fromlist(row.tolist())
+        return cls(n, metric, chosen, from_table, to_table)
+
+    def customize(self, adjacency, metric=None):
+        # Mismos landmarks con las distancias de otra métrica (o de los pesos tras cerrar o
+        # reabrir segmentos): dos Dijkstra por landmark, sin volver a elegirlos
+        weights = adjacency.metric_weights(metric)
+        reverse = adjacency.reverse(metric)
+        from_table, to_table = array('f'), array('f')
+        for landmark in self.landmarks:
+            from_table.fromlist(dijkstra(adjacency, landmark, weights)[0].tolist())
+            to_table.fromlist(dijkstra(reverse, landmark)[0].tolist())
+        return Landmarks(self.node_count, metric, list(self.landmarks), from_table, to_table)
+
+    @staticmethod
+    def _avoid_candidate(adjacency, weights, component, chosen, from_rows, to_rows, rng):
+        # Estrategia "avoid" (Goldberg y Werneck): en el árbol de caminos mínimos de una raíz
+        # aleatoria se baja por el subárbol peor cubierto por las cotas actuales hasta una hoja
+        n = adjacency.node_count
+        candidates = [v for v in component if v not in chosen]
+        if not candidates:
+            return None
+        root = rng.choice(candidates)
+        dist, parent = dijkstra(adjacency, root, weights)
+
+        gap = [0.0] * n
+        for v in range(n):
+            if dist[v] == float('inf'):
+                continue
+            bound = 0.0
+            for row_from, row_to in zip(from_rows, to_rows):
+                if row_from[root] != float('inf') and row_from[v] != float('inf'):
+                    bound = max(bound, row_from[v] - row_from[root])
+                if row_to[root] != float('inf') and row_to[v] != float('inf'):
+                    bound = max(bound, row_to[root] - row_to[v])
+            gap[v] = dist[v] - bound
+
+        children = [[] for _ in range(n)]
+        order = sorted((v for v in range(n) if dist[v] != float('inf')), key=lambda v: dist[v])
+        for v in order:
+            if parent[v] != -1:
+                children[parent[v]].append(v)
+
+        # Tamaño de cada subárbol; cero si contiene un landmark
+        size = [0.0] * n
+        blocked = [False] * n
+        for v in chosen:
+            blocked[v] = True
+        for v in reversed(order):
+            size[v] += gap[v]
+            if blocked[v]:
+                size[v] = 0.0
+            if parent[v] != -1:
+                if blocked[v]:
+                    blocked[parent[v]] = True
+                size[parent[v]] += size[v]
+        for v in order:
+            if blocked[v]:
+                size[v] = 0.0
+
+        node = root
+        while children[node]:
+            best = max(children[node], key=lambda v: size[v])
+            if size[best] <= 0.0:
+                break
+            node = best
+        return node if node not in chosen else None
+
+    def heuristic_to(self, target, active=4, source=None):
+        # Cota inferior de d(v, target); con source se usan solo los landmarks más útiles para el par
+        n = self.node_count
+        inf = float('inf')
+        rows = range(len(self.landmarks))
+        if source is not None and len(self.landmarks) > active:
+            rows = sorted(rows, key=lambda i: -self._bound(i, source, target))[:active]
+        terms = []
+        for i in rows:
+            base = i * n
+            from_target = self.from_table[base + target]
+            to_target = self.to_table[base + target]
+            if from_target != inf and to_target != inf:
+                terms.append((base, from_target, to_target))
+        from_table, to_table, tolerance = self.from_table, self.to_table, self.tolerance
+
+        def heuristic(node):
+            best = 0.0
+            for base, from_target, to_target in terms:
+                from_node = from_table[base + node]
+                to_node = to_table[base + node]
+                if from_node != inf and to_node != inf:
+                    bound = max(from_target - from_node, to_node - to_target)
+                    if bound > best:
+                        best = bound
+            return max(best - tolerance, 0.0)
+        return heuristic
+
+    def _bound(self, i, node, target):
+        base = i * self.node_count
+        values = (self.from_table[base + node], self.from_table[base + target],
+                  self.to_table[base + node], self.to_table[base + target])
+        if float('inf') in values:
+            return 0.0
+        return max(values[1] - values[0], values[2] - values[3])
+
+    def memory_size(self):
+        return self.from_table.itemsize * (len(self.from_table) + len(self.to_table))
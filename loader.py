@@ -0,0 +1,127 @@
+import gc
+from array import array
+from contextlib import contextmanager
+from itertools import repeat
+
+MAX_EXAMPLES = 5
+
+
+class LoadReport:
+    # Resumen de una carga: filas descartadas por fichero (con unos pocos ejemplos) en lugar
+    # de un mensaje por línea
+    def __init__(self):
+        self.ignored = {}  # motivo -> [total, [(fichero, nº de línea, texto)]]
+
+    def add(self, reason, filename, line_number, text):
+        entry = self.ignored.setdefault(reason, [0, []])
+        entry[0] += 1
+        if len(entry[1]) < MAX_EXAMPLES:
+            entry[1].append((filename, line_number, text))
+
+    def count(self, reason=None):
+        if reason is not None:
+            return self.ignored.get(reason, [0])[0]
+        return sum(total for total, _ in self.ignored.values())
+
+    def __bool__(self):
+        return bool(self.ignored)
+
+    def __str__(self):
+        lines = []
+        for reason, (total, examples) in self.ignored.items():
+            lines.append(f"⚠️ {total} rows ignored ({reason})")
+            for filename, line_number, text in examples:
+                lines.append(f"    {filename}:{line_number}: {text}")
+        return "\n".join(lines)
+
+
+@contextmanager
+def paused_gc():
+    # En una carga masiva casi todo lo que se crea vive hasta el final: las pasadas periódicas
+    # del recolector de ciclos no liberan nada y cuestan más que la propia lectura
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def read_columns(filename, types, report=None, with_lines=False):
+    # Lee un fichero de columnas separadas por espacios en una sola pasada. types da el tipo de
+    # cada columna ('l', 'd' o str); las columnas de más se ignoran y las filas cortas o mal
+    # formadas se apuntan en el informe. Con with_lines se añade una última columna con el
+    # número de línea de cada fila, para informar de errores detectados después
+    with open(filename, 'r') as f:
+        text = f.read()
+    width = len(types)
+    lines = text.splitlines()
+    line_numbers = None
+    # Caso habitual: filas de width campos separados por un espacio. Solo las demás (vacías,
+    # cortas, con columnas de más u otros separadores) se parten una a una
+    rows = lines
+    irregular = [k for k, count in enumerate(map(str.count, lines, repeat(' '))) if count != width - 1]
+    if irregular:
+        rows, dropped = list(lines), set()
+        for k in irregular:
+            parts = lines[k].split()
+            if len(parts) >= width:
+                rows[k] = ' '.join(parts[:width])
+            else:
+                dropped.add(k)
+                if parts and report is not None:
+                    report.add("malformed row", filename, k + 1, lines[k].strip())
+        if dropped:
+            line_numbers = [k + 1 for k in range(len(lines)) if k not in dropped]
+            rows = [rows[number - 1] for number in line_numbers]
+    tokens = ' '.join(rows).split()
+    # Cada fila debe ser exactamente sus width campos: el recuento de espacios no basta
+    # (dobles espacios, tabuladores o espacios al final descuadran las columnas)
+    if list(map(' '.join, zip(*[iter(tokens)] * width))) == rows:
+        columns = [tokens[i::width] for i in range(width)]
+    else:
+        rows = [line.split() for line in lines]
+        line_numbers = [number for number, parts in enumerate(rows, 1) if len(parts) >= width]
+        if report is not None:
+            reported = set(irregular)
+            for number, parts in enumerate(rows, 1):
+                if 0 < len(parts) < width and number - 1 not in reported:
+                    report.add("malformed row", filename, number, lines[number - 1].strip())
+        columns = [list(column) for column in zip(*(rows[number - 1][:width] for number in line_numbers))]
+        if not columns:
+            columns = [[] for _ in types]
+
+    # Conversión por columnas; si un valor no se puede convertir se descarta su fila entera
+    converted = []
+    for i, kind in enumerate(types):
+        try:
+            converted.append(_column(columns[i], kind))
+        except ValueError:
+            if line_numbers is None:
+                line_numbers = [number for number, line in enumerate(lines, 1) if line]
+            convert = int if kind == 'l' else float
+            bad = set()
+            for row, value in enumerate(columns[i]):
+                try:
+                    convert(value)
+                except ValueError:
+                    bad.add(row)
+                    if report is not None:
+                        report.add("malformed row", filename, line_numbers[row],
+                                   lines[line_numbers[row] - 1].strip())
+            keep = [row for row in range(len(line_numbers)) if row not in bad]
+            line_numbers = [line_numbers[row] for row in keep]
+            columns = [[column[row] for row in keep] for column in columns]
+            converted = [_column(column, kind) for column, kind in zip(columns[:i + 1], types)]
+    if with_lines:
+        if line_numbers is None:
+            line_numbers = [number for number, line in enumerate(lines, 1) if line]
+        converted.append(array('l', line_numbers))
+    return converted
+
+
+def _column(values, kind):
+    if kind is str:
+        return values
+    return array(kind, map(int if kind == 'l' else float, values))
@@ -0,0 +1,180 @@
+from array import array
+from navPoint import NavPoint
+from path import Path
+from adjacency import Adjacency, DEFAULT_METRIC
+from components import ReachableSet
+from snapshot import Snapshot, unpack_strings
+import routing
+import batch_routing
+
+
+class NameTable:
+    # Búsqueda nombre -> id sobre la tabla de cadenas del snapshot, sin diccionario: búsqueda
+    # binaria en los ids ordenados por nombre
+    def __init__(self, offsets, blob, order):
+        self.offsets = offsets
+        self.blob = blob
+        self.order = order
+
+    def name(self, node):
+        return bytes(self.blob[self.offsets[node]:self.offsets[node + 1] - 1]).decode('utf-8')
+
+    def _key(self, position):
+        node = self.order[position]
+        return bytes(self.blob[self.offsets[node]:self.offsets[node + 1] - 1])
+
+    def get(self, name, default=None):
+        key = name.encode('utf-8')
+        low, high = 0, len(self.order)
+        while low < high:
+            mid = (low + high) // 2
+            if self._key(mid) < key:
+                low = mid + 1
+            else:
+                high = mid
+        if low < len(self.order) and self._key(low) == key:
+            return self.order[low]
+        return default
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def __len__(self):
+        return len(self.order)
+
+
+class MappedPoints:
+    # id -> NavPoint creado al pedirlo (y reutilizado, para que las comparaciones por
+    # identidad de ReachableSet funcionen)
+    def __init__(self, numbers, names, latitudes, longitudes):
+        self.numbers = numbers
+        self.names = names
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+        self._created = {}
+
+    def __getitem__(self, node):
+        point = self._created.get(node)
+        if point is None:
+            point = NavPoint(self.numbers[node], self.names.name(node),
+                             self.latitudes[node], self.longitudes[node])
+            point.id = node
+            self._created[node] = point
+        return point
+
+    def __len__(self):
+        return len(self.numbers)
+
+
+class MappedAirSpace:
+    # Espacio aéreo de solo lectura sobre un snapshot mapeado en memoria: coordenadas, CSR,
+    # pesos, componentes y nombres son vistas del fichero, sin objetos por punto ni por
+    # arista. Cualquier número de procesos puede abrir el mismo fichero y compartir sus páginas
+    def __init__(self, filename, metric=DEFAULT_METRIC):
+        self.filename = filename
+        self.metric = metric
+        self.snapshot = Snapshot.map(filename)
+        header, sections = self.snapshot.header, self.snapshot.arrays
+        self.adjacency = Adjacency.from_arrays(
+            sections["latitudes"], sections["longitudes"], sections["offsets"], sections["targets"],
+            {name: sections[f"weights:{name}"] for name in header["metrics"]},
+            header["heuristic_scales"], (sections["lat_rad"], sections["lon_rad"], sections["cos_lat"]))
+        self.labels = sections["labels"]
+        self.one_way = header["one_way"]
+        self.names = NameTable(sections["name_offsets"], sections["names"], sections["name_order"])
+        self.points = MappedPoints(sections["numbers"], self.names,
+                                   sections["latitudes"], sections["longitudes"])
+
+        # Aeropuertos: pocos y pequeños, se copian a listas de ids
+        self.airports = {}
+        sids, stars = iter(sections["sids"]), iter(sections["stars"])
+        for name, sid_count, star_count in zip(unpack_strings(sections["airport_names"]),
+                                               sections["sid_counts"], sections["star_counts"]):
+            self.airports[name] = ([next(sids) for _ in range(sid_count)],
+                                   [next(stars) for _ in range(star_count)])
+        self.last_expanded = 0
+
+    def close(self):
+        self.adjacency = self.labels = self.names = self.points = None
+        self.snapshot.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.points)
+
+    def find_point_by_name(self, name):
+        node = self.names.get(name)
+        return None if node is None else self.points[node]
+
+    def symmetric(self):
+        return self.one_way == 0
+
+    def reachable_nodes(self, start_name):
+        start = self.names.get(start_name)
+        if start is None:
+            return ReachableSet(array('l'), self.points)
+        if self.symmetric():
+            ids = self._component(start)
+        else:
+            ids = array('l', routing.breadth_first(self.adjacency, start))
+        return ReachableSet(ids, self.points)
+
+    def _component(self, node):
+        root = self.labels[node]
+        return array('l', (other for other, label in enumerate(self.labels) if label == root))
+
+    def is_reachable(self, origin_name, destination_name):
+        source, target = self.names.get(origin_name), self.names.get(destination_name)
+        if source is None or target is None or self.labels[source] != self.labels[target]:
+            return False
+        return self.symmetric() or target in routing.breadth_first(self.adjacency, source)
+
+    def find_shortest_path(self, origin_name, destination_name, metric=None):
+        source, target = self.names.get(origin_name), self.names.get(destination_name)
+        if source is None and target is None and origin_name in self.airports and destination_name in self.airports:
+            return self.find_airport_route(origin_name, destination_name, metric)
+        if source is None or target is None:
+            return None
+        metric = metric or self.metric
+        self.last_expanded = 0
+        if self.labels[source] != self.labels[target]:
+            return None
+        adjacency = self.adjacency
+        result = routing.astar(adjacency, source, target, adjacency.heuristic_to(target, metric),
+                               adjacency.metric_weights(metric))
+        self.last_expanded = result.expanded
+        return self.make_path(result.nodes, metric) if result else None
+
+    def find_airport_route(self, origin_airport, destination_airport, metric=None):
+        origin, destination = self.airports.get(origin_airport), self.airports.get(destination_airport)
+        if not origin or not destination:
+            return None
+        goals = destination[1]
+        goal_labels = {self.labels[goal] for goal in goals}
+        sources = [source for source in origin[0] if self.labels[source] in goal_labels]
+        if not sources or not goals:
+            return None
+        metric = metric or self.metric
+        adjacency = self.adjacency
+        bounds = [adjacency.heuristic_to(goal, metric) for goal in goals]
+        heuristic = bounds[0] if len(bounds) == 1 else lambda node: min(bound(node) for bound in bounds)
+        result = routing.multi_source(adjacency, sources, goals, heuristic, adjacency.metric_weights(metric))
+        self.last_expanded = result.expanded
+        return self.make_path(result.nodes, metric) if result else None
+
+    def make_path(self, node_ids, metric=None):
+        adjacency = self.adjacency
+        metric = metric or self.metric
+        path = Path([self.points[node_ids[0]]])
+        for previous, node in zip(node_ids, node_ids[1:]):
+            path.add_node(self.points[node], adjacency.weight(previous, node, metric))
+        return path
+
+    def route_batch(self, pairs, processes=None, chunk_size=256, ordered=True, metric=None):
+        # Los trabajadores abren el mismo fichero en lugar de recibir una copia del grafo
+        return batch_routing.route_batch(self, pairs, processes, chunk_size, ordered, metric)
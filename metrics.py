@@ -0,0 +1,86 @@
+from array import array
+from math import sin, cos, sqrt, atan2
+from adjacency import DEFAULT_METRIC
+
+# Constructores de métricas para AirSpace.add_metric: cada uno devuelve una función que recibe
+# la Adjacency y calcula un peso por arista (en el orden de targets). Se vuelven a llamar cada
+# vez que cambia la topología, así que los datos externos (vientos, tasas) se leen entonces
+
+
+def _edge_geometry(adjacency):
+    # (k, latitud y longitud del punto medio, rumbo inicial en radianes desde el norte)
+    lat_rad, lon_rad, cos_lat = adjacency.lat_rad, adjacency.lon_rad, adjacency.cos_lat
+    latitudes, longitudes = adjacency.latitudes, adjacency.longitudes
+    offsets, targets = adjacency.offsets, adjacency.targets
+    for u in range(adjacency.node_count):
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            delta = lon_rad[v] - lon_rad[u]
+            track = atan2(sin(delta) * cos_lat[v],
+                          cos_lat[u] * sin(lat_rad[v]) - sin(lat_rad[u]) * cos_lat[v] * cos(delta))
+            lon = longitudes[v] - longitudes[u]
+            lon = longitudes[u] + (lon - 360 if lon > 180 else lon + 360 if lon < -180 else lon) / 2
+            yield k, (latitudes[u] + latitudes[v]) / 2, (lon + 180) % 360 - 180, track
+
+
+def _field(value):
+    # Constante o función (latitud, longitud) -> valor
+    return value if callable(value) else lambda latitude, longitude: value
+
+
+def wind_time(airspeed, wind=(0.0, 0.0), distance=DEFAULT_METRIC):
+    # Minutos de vuelo con velocidad verdadera airspeed (km/h) y viento (este, norte) en km/h,
+    # constante o función de la posición, tomado en el punto medio de cada arista. Con el
+    # ángulo de corrección de deriva la velocidad sobre el suelo es
+    # sqrt(airspeed² - cruzado²) + componente a lo largo del rumbo; inf si no se puede mantener
+    wind = _field(wind)
+
+    def build(adjacency):
+        distances = adjacency.metrics[distance]
+        weights = array('d', [0.0]) * len(distances)
+        for k, latitude, longitude, track in _edge_geometry(adjacency):
+            east, north = wind(latitude, longitude)
+            along = east * sin(track) + north * cos(track)
+            cross = east * cos(track) - north * sin(track)
+            ground = sqrt(airspeed * airspeed - cross * cross) + along if airspeed > abs(cross) else 0.0
+            weights[k] = 60 * distances[k] / ground if ground > 0 else float('inf')
+        return weights
+    return build
+
+
+def weight_factor(mtow):
+    # Factor de peso de las tasas de ruta de Eurocontrol: raíz de (MTOW en toneladas / 50)
+    return sqrt(mtow / 50)
+
+
+def route_charges(unit_rate, factor=1.0, distance=DEFAULT_METRIC):
+    # Tasa de ruta: (km / 100) * factor de peso * tarifa unitaria de la zona, constante o
+    # función de la posición del punto medio de cada arista
+    unit_rate = _field(unit_rate)
+
+    def build(adjacency):
+        distances = adjacency.metrics[distance]
+        weights = array('d', [0.0]) * len(distances)
+        for k, latitude, longitude, _ in _edge_geometry(adjacency):
+            weights[k] = distances[k] / 100 * factor * unit_rate(latitude, longitude)
+        return weights
+    return build
+
+
+def combination(terms):
+    # Suma ponderada de métricas ya registradas, p. ej. {"time": 1.0, "charges": 0.2}
+    terms = dict(terms)
+
+    def build(adjacency):
+        unknown = [name for name in terms if name not in adjacency.metrics]
+        if unknown:
+            raise ValueError(f"Unknown metric: {unknown[0]}")
+        weights = array('d', [0.0]) * len(adjacency.targets)
+        for name, coefficient in terms.items():
+            if coefficient:
+                values = adjacency.metrics[name]
+                for k in range(len(weights)):
+                    weights[k] += coefficient * values[k]
+        return weights
+    build.terms = tuple(terms)  # métricas de las que depende (ver AirSpace.remove_metric)
+    return build
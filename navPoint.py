@@ -1,21 +1,34 @@
 
+from math import radians, sin, cos, sqrt, atan2
+
+
 class NavPoint:
     def __init__(self, number, name, latitude, longitude):
         self.number = number
         self.name = name
         self.latitude = float(latitude)
         self.longitude = float(longitude)
-        self.neighbors = []  # List of connected NavPoints
+        self.id = -1  # Índice del punto en la adyacencia CSR de su AirSpace
+        self.airspace = None
+        self._neighbors = []  # List of connected NavPoints (solo si no pertenece a un AirSpace)
+
+    @property
+    def neighbors(self):
+        # Dentro de un AirSpace es una vista de la adyacencia CSR
+        if self.airspace is not None:
+            return self.airspace.neighbor_points(self)
+        return self._neighbors
 
     def add_neighbor(self, neighbor):
-        if neighbor not in self.neighbors:
-            self.neighbors.append(neighbor)
+        if self.airspace is not None:
+            return self.airspace.add_edge(self, neighbor)
+        if neighbor not in self._neighbors:
+            self._neighbors.append(neighbor)
             return True
         return False
 
     def distance_to(self, other):
         # Haversine formula for great-circle distance
-        from math import radians, sin, cos, sqrt, atan2
         lat1, lon1 = radians(self.latitude), radians(self.longitude)
         lat2, lon2 = radians(other.latitude), radians(other.longitude)
 
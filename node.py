@@ -4,12 +4,17 @@ class Node:
         self.x = float(x)
         self.y = float(y)
         self.neighbors = []
+        self.version = 0  # sube con cada cambio de neighbors (AddNeighbor, Graph.connect)
+        self.graphs = []  # Graph que contienen el nodo, avisados por AddNeighbor
 
 def AddNeighbor(n1, n2):
 
     if n2 in n1.neighbors:
         return False
     n1.neighbors.append(n2)
+    n1.version += 1
+    for graph in n1.graphs + n2.graphs:
+        graph.neighbors_changed()
     return True
 
 
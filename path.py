@@ -33,6 +33,12 @@ class Path:
         new_path.segment_costs = self.segment_costs.copy()
         return new_path
 
+    def reversed(self):
+        # Misma ruta recorrida en sentido contrario (con pesos simétricos, mismo coste)
+        new_path = Path(self.nodes[::-1], self.cost, self.estimated)
+        new_path.segment_costs = self.segment_costs[::-1]
+        return new_path
+
     def __str__(self):
         if not self.nodes:
             return "Empty Path"
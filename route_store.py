@@ -0,0 +1,105 @@
+import atexit
+import queue
+import sqlite3
+import threading
+from array import array
+
+
+def route_store_path(nav_file):
+    return f"{nav_file}.routes"
+
+
+class RouteStore:
+    # Rutas calculadas en sesiones anteriores, en una base SQLite junto a los ficheros del
+    # dataset. Cada fila lleva el hash del dataset con el que se calculó: al abrir se borran las
+    # de otros datasets. Las escrituras van a una cola que vacía un hilo aparte, así que guardar
+    # una ruta no retrasa la consulta que la calculó
+    def __init__(self, filename, fingerprint):
+        self.filename = filename
+        self.fingerprint = fingerprint
+        self.hits = 0
+        self.misses = 0
+        self.collected = None  # filas de otros datasets borradas al abrir (cuando termina)
+        self._connection = sqlite3.connect(filename)
+        self._connection.execute("PRAGMA journal_mode=WAL")  # lecturas sin esperar al escritor
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS routes (fingerprint TEXT, metric TEXT, kind TEXT, "
+            "origin TEXT, destination TEXT, numbers BLOB, "
+            "PRIMARY KEY (fingerprint, metric, kind, origin, destination)) WITHOUT ROWID")
+        self._connection.commit()
+        self._queue = queue.Queue()
+        self._cleaned = threading.Event()
+        self._writer = threading.Thread(target=self._write_loop, name="route-store", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def get(self, metric, kind, origin, destination):
+        # Números de los puntos de la ruta (vacío si no hay ruta), o None si no está guardada
+        row = self._connection.execute(
+            "SELECT numbers FROM routes WHERE fingerprint = ? AND metric = ? AND kind = ? "
+            "AND origin = ? AND destination = ?",
+            (self.fingerprint, metric, kind, origin, destination)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        numbers = array('l')
+        numbers.frombytes(row[0])
+        return numbers
+
+    def put(self, metric, kind, origin, destination, numbers):
+        self._queue.put((self.fingerprint, metric, kind, origin, destination,
+                         array('l', numbers).tobytes()))
+
+    def flush(self):
+        # Espera a la limpieza inicial y a que las rutas encoladas estén escritas
+        self._cleaned.wait()
+        self._queue.join()
+
+    def close(self):
+        if self._writer is None:
+            return
+        self._queue.put(None)
+        self._writer.join()
+        self._writer = None
+        self._connection.close()
+        atexit.unregister(self.close)
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM routes WHERE fingerprint = ?",
+                                        (self.fingerprint,)).fetchone()[0]
+
+    def _write_loop(self):
+        # Conexión propia del hilo; cada lote de la cola se escribe en una sola transacción
+        connection = sqlite3.connect(self.filename)
+        try:
+            deleted = connection.execute("DELETE FROM routes WHERE fingerprint != ?",
+                                         (self.fingerprint,)).rowcount
+            connection.commit()
+            if deleted:
+                connection.execute("VACUUM")
+            self.collected = deleted
+        except sqlite3.Error as e:
+            print(f"⚠️ Could not clean {self.filename}: {e}")
+        self._cleaned.set()
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            rows = [row for row in batch if row is not None]
+            running = len(rows) == len(batch)
+            try:
+                connection.executemany("INSERT OR REPLACE INTO routes VALUES (?, ?, ?, ?, ?, ?)", rows)
+                connection.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️ Could not write routes to {self.filename}: {e}")
+            for _ in batch:
+                self._queue.task_done()
+        connection.close()
+
+    def __repr__(self):
+        return f"RouteStore({self.filename}, hits={self.hits}, misses={self.misses})"
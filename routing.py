@@ -0,0 +1,425 @@
+import heapq
+from array import array
+from collections import deque
+
+
+class RouteResult:
+    def __init__(self, cost, nodes, expanded):
+        self.cost = cost
+        self.nodes = nodes  # ids de nodo desde el origen hasta el destino
+        self.expanded = expanded
+
+    def __bool__(self):
+        return bool(self.nodes)
+
+    def __repr__(self):
+        return f"RouteResult(cost={self.cost:.2f}, nodes={self.nodes}, expanded={self.expanded})"
+
+
+def reconstruct(parent, target):
+    nodes = []
+    node = target
+    while node != -1:
+        nodes.append(node)
+        node = parent[node]
+    nodes.reverse()
+    return nodes
+
+
+def astar(graph, source, target, heuristic, weights=None):
+    # A* sobre ids enteros: heap binario, conjunto cerrado, mejores costes g y punteros al padre
+    offsets, targets = graph.offsets, graph.targets
+    if weights is None:
+        weights = graph.weights
+    g_cost = {source: 0.0}
+    parent = {source: -1}
+    closed = set()
+    open_heap = [(heuristic(source), source)]
+    expanded = 0
+
+    while open_heap:
+        _, node = heapq.heappop(open_heap)
+        if node in closed:
+            continue
+        if node == target:
+            return RouteResult(g_cost[node], reconstruct(parent, target), expanded)
+        closed.add(node)
+        expanded += 1
+
+        node_cost = g_cost[node]
+        for k in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[k]
+            new_cost = node_cost + weights[k]
+            if new_cost < g_cost.get(neighbor, float('inf')):
+                # Con una heurística admisible pero no consistente (p. ej. redondeos de ALT)
+                # un nodo cerrado puede mejorar: se reabre
+                closed.discard(neighbor)
+                g_cost[neighbor] = new_cost
+                parent[neighbor] = node
+                heapq.heappush(open_heap, (new_cost + heuristic(neighbor), neighbor))
+
+    return RouteResult(float('inf'), [], expanded)
+
+
+def multi_source(graph, sources, goals, heuristic=None, weights=None):
+    # Búsqueda sembrada con todos los orígenes a la vez (súper-origen virtual) que termina
+    # en el primer objetivo cerrado: la mejor combinación origen/objetivo en una sola búsqueda
+    offsets, targets = graph.offsets, graph.targets
+    if weights is None:
+        weights = graph.weights
+    if heuristic is None:
+        heuristic = lambda node: 0.0
+    goals = set(goals)
+    g_cost = {}
+    parent = {}
+    for node in sources:
+        g_cost[node] = 0.0
+        parent[node] = -1
+    closed = set()
+    open_heap = [(heuristic(node), node) for node in g_cost]
+    heapq.heapify(open_heap)
+    expanded = 0
+
+    while open_heap:
+        _, node = heapq.heappop(open_heap)
+        if node in closed:
+            continue
+        if node in goals:
+            return RouteResult(g_cost[node], reconstruct(parent, node), expanded)
+        closed.add(node)
+        expanded += 1
+
+        node_cost = g_cost[node]
+        for k in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[k]
+            new_cost = node_cost + weights[k]
+            if new_cost < g_cost.get(neighbor, float('inf')):
+                closed.discard(neighbor)
+                g_cost[neighbor] = new_cost
+                parent[neighbor] = node
+                heapq.heappush(open_heap, (new_cost + heuristic(neighbor), neighbor))
+
+    return RouteResult(float('inf'), [], expanded)
+
+
+def breadth_first(graph, source, weights=None):
+    # Con weights se ignoran las aristas de peso inf (cerradas)
+    offsets, targets = graph.offsets, graph.targets
+    visited = bytearray(graph.node_count)
+    visited[source] = 1
+    order = [source]
+    queue = deque(order)
+    while queue:
+        node = queue.popleft()
+        for k in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[k]
+            if not visited[neighbor] and (weights is None or weights[k] != float('inf')):
+                visited[neighbor] = 1
+                order.append(neighbor)
+                queue.append(neighbor)
+    return order
+
+
+def dijkstra(graph, source, weights=None):
+    # Árbol de caminos mínimos completo desde source (un id o una lista de ids, todos a
+    # coste 0): distancias y predecesores en arrays
+    offsets, targets = graph.offsets, graph.targets
+    if weights is None:
+        weights = graph.weights
+    dist = array('d', [float('inf')]) * graph.node_count
+    parent = array('l', [-1]) * graph.node_count
+    sources = [source] if isinstance(source, int) else list(source)
+    for node in sources:
+        dist[node] = 0.0
+    heap = [(0.0, node) for node in sources]
+    while heap:
+        d, node = heapq.heappop(heap)
+        if d > dist[node]:
+            continue
+        for k in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[k]
+            nd = d + weights[k]
+            if nd < dist[neighbor]:
+                dist[neighbor] = nd
+                parent[neighbor] = node
+                heapq.heappush(heap, (nd, neighbor))
+    return dist, parent
+
+
+def bidirectional(graph, reverse, source, target, weights=None, potential=None):
+    # Búsqueda bidireccional (Dijkstra, o A* si se da un potencial p(v) consistente y
+    # antisimétrico para ambos sentidos). Ambos frentes trabajan con costes reducidos
+    # w(u, v) - p(u) + p(v); se detiene cuando la suma de los mínimos de ambos heaps
+    # ya no puede mejorar la mejor ruta encontrada
+    if weights is None:
+        weights = graph.weights
+    if potential is None:
+        potential = lambda node: 0.0
+    if source == target:
+        return RouteResult(0.0, [source], 0)
+
+    p_source, p_target = potential(source), potential(target)
+    sides = ((graph.offsets, graph.targets, weights, 1.0),
+             (reverse.offsets, reverse.targets, reverse.weights, -1.0))
+    g_cost = ({source: 0.0}, {target: 0.0})
+    parent = ({source: -1}, {target: -1})
+    closed = (set(), set())
+    heaps = ([(0.0, source)], [(0.0, target)])
+    offsets_p = (p_source, -p_target)
+    best, meeting = float('inf'), -1
+    expanded = 0
+
+    while heaps[0] and heaps[1]:
+        # Criterio de parada en el espacio reducido: top_f + top_b >= mejor ruta reducida
+        if heaps[0][0][0] + heaps[1][0][0] >= best - p_source + p_target:
+            break
+        side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        _, node = heapq.heappop(heaps[side])
+        if node in closed[side]:
+            continue
+        closed[side].add(node)
+        expanded += 1
+
+        offsets, targets, side_weights, sign = sides[side]
+        node_cost = g_cost[side][node]
+        for k in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[k]
+            new_cost = node_cost + side_weights[k]
+            if new_cost < g_cost[side].get(neighbor, float('inf')):
+                g_cost[side][neighbor] = new_cost
+                parent[side][neighbor] = node
+                key = new_cost + sign * potential(neighbor) - offsets_p[side]
+                heapq.heappush(heaps[side], (key, neighbor))
+                other = g_cost[1 - side].get(neighbor)
+                if other is not None and new_cost + other < best:
+                    best, meeting = new_cost + other, neighbor
+
+    if meeting == -1:
+        return RouteResult(float('inf'), [], expanded)
+    nodes = reconstruct(parent[0], meeting)
+    node = parent[1][meeting]
+    while node != -1:
+        nodes.append(node)
+        node = parent[1][node]
+    return RouteResult(best, nodes, expanded)
+
+
+def _guided_search(graph, weights, source, target, to_target, blocked_nodes, blocked_edges):
+    # A* con la distancia exacta al destino en el grafo completo como heurística: al bloquear
+    # nodos o aristas solo crecen las distancias, así que sigue siendo admisible y consistente
+    offsets, targets = graph.offsets, graph.targets
+    inf = float('inf')
+    g_cost = {source: 0.0}
+    parent = {source: -1}
+    closed = set()
+    open_heap = [(to_target[source], source)]
+    expanded = 0
+
+    while open_heap:
+        _, node = heapq.heappop(open_heap)
+        if node in closed:
+            continue
+        if node == target:
+            return RouteResult(g_cost[node], reconstruct(parent, target), expanded)
+        closed.add(node)
+        expanded += 1
+
+        node_cost = g_cost[node]
+        for k in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[k]
+            if neighbor in blocked_nodes or to_target[neighbor] == inf or (node, neighbor) in blocked_edges:
+                continue
+            new_cost = node_cost + weights[k]
+            if new_cost < g_cost.get(neighbor, inf):
+                g_cost[neighbor] = new_cost
+                parent[neighbor] = node
+                heapq.heappush(open_heap, (new_cost + to_target[neighbor], neighbor))
+
+    return RouteResult(inf, [], expanded)
+
+
+def k_shortest(graph, source, target, k, to_target, weights=None):
+    # k caminos sin ciclos más cortos (Yen, con la mejora de Lawler: cada camino solo se
+    # desvía a partir del punto en el que se desvió su padre). to_target son las distancias
+    # d(v, target) del árbol inverso, compartidas por todas las búsquedas de desvío.
+    # expanded de cada ruta es el acumulado de nodos expandidos hasta encontrarla
+    if weights is None:
+        weights = graph.weights
+    if to_target[source] == float('inf'):
+        return []
+    first = _guided_search(graph, weights, source, target, to_target, set(), set())
+    found = [first]
+    deviations = [0]
+    candidates = []
+    seen = {tuple(first.nodes)}
+    expanded = first.expanded
+
+    while len(found) < k:
+        nodes = found[-1].nodes
+        prefix = [0.0]
+        for u, v in zip(nodes, nodes[1:]):
+            prefix.append(prefix[-1] + _edge_weight(graph, weights, u, v))
+
+        for i in range(deviations[-1], len(nodes) - 1):
+            spur = nodes[i]
+            root = nodes[:i + 1]
+            blocked_edges = {(path.nodes[i], path.nodes[i + 1]) for path in found
+                             if len(path.nodes) > i + 1 and path.nodes[:i + 1] == root}
+            spur_route = _guided_search(graph, weights, spur, target, to_target,
+                                        set(root[:-1]), blocked_edges)
+            expanded += spur_route.expanded
+            if not spur_route:
+                continue
+            candidate = root[:-1] + spur_route.nodes
+            key = tuple(candidate)
+            if key not in seen:
+                seen.add(key)
+                heapq.heappush(candidates, (prefix[i] + spur_route.cost, len(seen), candidate, i))
+
+        if not candidates:
+            break
+        cost, _, candidate, deviation = heapq.heappop(candidates)
+        found.append(RouteResult(cost, candidate, expanded))
+        deviations.append(deviation)
+
+    return found
+
+
+def _edge_weight(graph, weights, u, v):
+    for k in range(graph.offsets[u], graph.offsets[u + 1]):
+        if graph.targets[k] == v:
+            return weights[k]
+    return float('inf')
+
+
+class ShortestPathTree:
+    # Resultado de un Dijkstra completo desde un origen; responde cualquier destino en O(longitud)
+    def __init__(self, graph, source, weights=None, metric=None):
+        self.source = source
+        self.metric = metric
+        self.dist, self.parent = dijkstra(graph, source, weights)
+
+    def reaches(self, target):
+        return self.dist[target] != float('inf')
+
+    def cost_to(self, target):
+        return self.dist[target]
+
+    def route_to(self, target):
+        if not self.reaches(target):
+            return RouteResult(float('inf'), [], 0)
+        return RouteResult(self.dist[target], reconstruct(self.parent, target), 0)
+
+    def best_route_to(self, targets):
+        # Ruta al objetivo más cercano de un conjunto (p. ej. las STAR de un aeropuerto)
+        best = min(targets, key=lambda node: self.dist[node], default=None)
+        if best is None:
+            return RouteResult(float('inf'), [], 0)
+        return self.route_to(best)
+
+
+class IncrementalRoute:
+    # Lifelong Planning A* (Koenig y Likhachev): ruta de source a target que, tras cambiar el
+    # peso de algunas aristas (segmentos cerrados o reabiertos), se repara reutilizando la
+    # búsqueda anterior: solo se vuelven a expandir los nodos cuya distancia cambia.
+    # g es la distancia de la última expansión y rhs la que dan los predecesores; los nodos
+    # con g != rhs esperan en la cola. La heurística debe ser consistente
+    def __init__(self, graph, source, target, heuristic, weights):
+        self.graph = graph
+        self.incoming = graph.incoming()
+        self.source = source
+        self.target = target
+        self.heuristic = heuristic
+        self.weights = weights
+        self.g = {}
+        self.rhs = {source: 0.0}
+        self.queue = {}  # nodo -> clave vigente (las del heap que no coinciden están obsoletas)
+        self.heap = []
+        self.expanded = 0
+        self._enqueue(source)
+
+    def _key(self, node):
+        best = min(self.g.get(node, float('inf')), self.rhs.get(node, float('inf')))
+        return best + self.heuristic(node), best
+
+    def _enqueue(self, node):
+        key = self._key(node)
+        self.queue[node] = key
+        heapq.heappush(self.heap, (key, node))
+
+    def _update(self, node):
+        inf = float('inf')
+        if node != self.source:
+            offsets, sources, edges = self.incoming
+            g, weights = self.g, self.weights
+            self.rhs[node] = min((g.get(sources[j], inf) + weights[edges[j]]
+                                  for j in range(offsets[node], offsets[node + 1])), default=inf)
+        if self.g.get(node, inf) != self.rhs[node]:
+            self._enqueue(node)
+        else:
+            self.queue.pop(node, None)
+
+    def _top(self):
+        heap, queue = self.heap, self.queue
+        while heap and queue.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else (float('inf'), float('inf'))
+
+    def _before_target(self):
+        # top < clave de target, con holgura en la primera componente: la heurística y los
+        # pesos se calculan con fórmulas distintas y pueden diferir en el último bit, lo que
+        # dejaría sin expandir un nodo del camino con un g obsoleto. Expandir de más es inocuo
+        top, goal = self._top(), self._key(self.target)
+        if goal[0] == float('inf'):
+            return top[0] < goal[0]
+        return top[0] < goal[0] + 1e-9 * max(1.0, goal[0])
+
+    def update(self, edges, weights):
+        # edges: índices de las aristas cuyo peso cambió; weights, la columna de pesos actual.
+        # Un nodo que la búsqueda nunca tocó no tiene predecesores expandidos: no cambia
+        self.weights = weights
+        targets = self.graph.targets
+        for node in {targets[k] for k in edges}:
+            if node in self.rhs:
+                self._update(node)
+
+    def compute(self):
+        inf = float('inf')
+        g, rhs, target = self.g, self.rhs, self.target
+        offsets, targets = self.graph.offsets, self.graph.targets
+        expanded = 0
+        while self._before_target() or rhs.get(target, inf) != g.get(target, inf):
+            _, node = heapq.heappop(self.heap)
+            del self.queue[node]
+            expanded += 1
+            if g.get(node, inf) > rhs[node]:
+                g[node] = rhs[node]
+            else:
+                # Su distancia ha subido: se invalida y se recalcula junto con sus sucesores
+                g[node] = inf
+                self._update(node)
+            for k in range(offsets[node], offsets[node + 1]):
+                self._update(targets[k])
+        self.expanded = expanded
+        return self.result()
+
+    def result(self):
+        # Camino hacia atrás desde target por el predecesor que da su distancia
+        inf = float('inf')
+        g, weights = self.g, self.weights
+        if g.get(self.target, inf) == inf:
+            return RouteResult(inf, [], self.expanded)
+        offsets, sources, edges = self.incoming
+        nodes, seen = [self.target], {self.target}
+        node = self.target
+        while node != self.source:
+            best, best_cost = None, inf
+            for j in range(offsets[node], offsets[node + 1]):
+                cost = g.get(sources[j], inf) + weights[edges[j]]
+                if cost < best_cost and sources[j] not in seen:
+                    best, best_cost = sources[j], cost
+            node = best
+            nodes.append(node)
+            seen.add(node)
+        nodes.reverse()
+        return RouteResult(g[self.target], nodes, self.expanded)
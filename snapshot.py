@@ -0,0 +1,156 @@
+import json
+import mmap
+import os
+import time
+from array import array
+from fingerprint import dataset_fingerprint
+
+SNAPSHOT_FORMAT = 2
+ALIGNMENT = 8
+RACY_WINDOW = 2 * 10 ** 9  # ns; un fichero tocado tan cerca de la escritura se comprueba por hash
+
+
+def snapshot_path(nav_file):
+    return f"{nav_file}.snapshot"
+
+
+def source_stats(paths):
+    # [nombre, tamaño, mtime en ns] de cada fichero fuente (None si no existe)
+    stats = []
+    for path in paths:
+        if path and os.path.exists(path):
+            st = os.stat(path)
+            stats.append([os.path.basename(path), st.st_size, st.st_mtime_ns])
+        else:
+            stats.append(None)
+    return stats
+
+
+def pack_strings(strings):
+    # Tabla de cadenas: texto UTF-8 separado por '\n' y el desplazamiento en bytes de cada una
+    offsets = array('l', [0])
+    chunks = []
+    for text in strings:
+        data = text.encode('utf-8')
+        chunks.append(data)
+        offsets.append(offsets[-1] + len(data) + 1)
+    return offsets, array('B', b'\n'.join(chunks))
+
+
+def unpack_strings(blob):
+    return bytes(blob).decode('utf-8').split('\n') if len(blob) else []
+
+
+def _aligned(position):
+    return -(-position // ALIGNMENT) * ALIGNMENT
+
+
+class Snapshot:
+    # Volcado binario de un dataset ya cargado: cabecera JSON (claves de validez y datos
+    # pequeños) seguida de cada columna como array contiguo alineado a 8 bytes, de modo
+    # que se lee con una copia por columna o se mapea sin copiar
+    def __init__(self, header, arrays):
+        self.header = header
+        self.arrays = arrays  # nombre -> array (o memoryview si está mapeado)
+        self.mapped = None  # mmap del fichero cuando las columnas son vistas sin copia
+
+    @classmethod
+    def capture(cls, header, arrays, sources, fingerprint):
+        header = dict(header, format=SNAPSHOT_FORMAT, sources=sources, fingerprint=fingerprint,
+                      written=time.time_ns())
+        return cls(header, arrays)
+
+    def save(self, filename):
+        # Escritura atómica: un lector nunca ve un snapshot a medias
+        sections, position = {}, 0
+        for name, values in self.arrays.items():
+            sections[name] = [values.typecode, values.itemsize, position, len(values)]
+            position = _aligned(position + values.itemsize * len(values))
+        data = json.dumps(dict(self.header, sections=sections)).encode('utf-8')
+        start = _aligned(4 + len(data))
+
+        temporary = f"{filename}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, 'wb') as f:
+                f.write(len(data).to_bytes(4, 'little'))
+                f.write(data)
+                for name, values in self.arrays.items():
+                    f.write(b'\0' * (start + sections[name][2] - f.tell()))
+                    values.tofile(f)
+            os.replace(temporary, filename)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+
+    @classmethod
+    def read_header(cls, f):
+        size = int.from_bytes(f.read(4), 'little')
+        header = json.loads(f.read(size).decode('utf-8'))
+        if header.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported snapshot format in {f.name}")
+        for name, (typecode, itemsize, _, _) in header["sections"].items():
+            if array(typecode).itemsize != itemsize:
+                raise ValueError(f"Snapshot {f.name} was written on a different platform ({name})")
+        return header, _aligned(4 + size)
+
+    @classmethod
+    def load(cls, filename):
+        # Cada columna sale del mapa de memoria con una sola copia en bloque
+        with open(filename, 'rb') as f:
+            header, start = cls.read_header(f)
+            arrays = {}
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for name, (typecode, itemsize, offset, length) in header["sections"].items():
+                    values = array(typecode)
+                    begin = start + offset
+                    if begin + itemsize * length > len(mapped):
+                        raise ValueError(f"Truncated snapshot {filename}")
+                    with memoryview(mapped)[begin:begin + itemsize * length] as chunk:
+                        values.frombytes(chunk)
+                    arrays[name] = values
+        return cls(header, arrays)
+
+    @classmethod
+    def map(cls, filename):
+        # Sin copia: cada columna es un memoryview sobre el fichero mapeado, así que varios
+        # procesos que abren el mismo snapshot comparten sus páginas
+        with open(filename, 'rb') as f:
+            header, start = cls.read_header(f)
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        snapshot = cls(header, {})
+        snapshot.mapped = mapped
+        try:
+            with memoryview(mapped) as view:
+                for name, (typecode, itemsize, offset, length) in header["sections"].items():
+                    begin = start + offset
+                    if begin + itemsize * length > len(mapped):
+                        raise ValueError(f"Truncated snapshot {filename}")
+                    with view[begin:begin + itemsize * length] as chunk:
+                        snapshot.arrays[name] = chunk.cast(typecode)
+        except ValueError:
+            snapshot.close()
+            raise
+        return snapshot
+
+    def close(self):
+        if self.mapped is None:
+            return
+        for values in self.arrays.values():
+            values.release()
+        self.arrays = {}
+        try:
+            self.mapped.close()
+        except BufferError:
+            pass  # aún quedan vistas derivadas (p. ej. neighbors()); se libera con la última
+        self.mapped = None
+
+    def matches(self, paths):
+        # Válido si los ficheros tienen el mismo nombre y tamaño y, o bien el mismo mtime (y no
+        # se tocaron justo al escribir el snapshot), o bien el mismo contenido
+        stats, stored = source_stats(paths), self.header["sources"]
+        if [s and s[:2] for s in stats] != [s and s[:2] for s in stored]:
+            return False
+        racy = self.header["written"] - RACY_WINDOW
+        if all(s is None or (s[2] == old[2] and s[2] < racy) for s, old in zip(stats, stored)):
+            return True
+        return dataset_fingerprint(paths) == self.header["fingerprint"]
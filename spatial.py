@@ -0,0 +1,232 @@
+import heapq
+from array import array
+from math import radians, sin, cos, asin, sqrt, pi
+
+EARTH_RADIUS = 6371  # km
+
+
+def unit_vector(latitude, longitude):
+    lat, lon = radians(latitude), radians(longitude)
+    return cos(lat) * cos(lon), cos(lat) * sin(lon), sin(lat)
+
+
+def chord_to_km(squared_chord):
+    return 2 * EARTH_RADIUS * asin(min(1.0, sqrt(squared_chord) / 2))
+
+
+class SpatialIndex:
+    # k-d tree implícito sobre vectores unitarios 3D: la distancia euclídea (cuerda) crece con
+    # la ortodrómica, así que el más cercano en 3D es el más cercano sobre la esfera, sin
+    # problemas en el antimeridiano ni en los polos. El nodo de cada rango [lo, hi) está en su mitad
+    def __init__(self, latitudes=(), longitudes=()):
+        self.xs, self.ys, self.zs = array('d'), array('d'), array('d')
+        for latitude, longitude in zip(latitudes, longitudes):
+            x, y, z = unit_vector(latitude, longitude)
+            self.xs.append(x)
+            self.ys.append(y)
+            self.zs.append(z)
+        self._build()
+
+    @classmethod
+    def from_arrays(cls, xs, ys, zs, order, axes, splits):
+        # Árbol ya construido (p. ej. leído de un snapshot)
+        index = cls.__new__(cls)
+        index.xs, index.ys, index.zs = xs, ys, zs
+        index.order, index.axes, index.splits = order, axes, splits
+        index.pending = []
+        index.stale = set()
+        return index
+
+    def _build(self):
+        coords = (self.xs, self.ys, self.zs)
+        ids = list(range(len(self.xs)))
+        self.order = array('l', ids)
+        self.axes = bytearray(len(ids))
+        self.splits = array('d', [0.0]) * len(ids)
+        stack = [(0, len(ids), 0)]
+        while stack:
+            lo, hi, axis = stack.pop()
+            if lo >= hi:
+                continue
+            chunk = ids[lo:hi]
+            chunk.sort(key=coords[axis].__getitem__)
+            ids[lo:hi] = chunk
+            mid = (lo + hi) // 2
+            self.order[mid] = ids[mid]
+            self.axes[mid] = axis
+            self.splits[mid] = coords[axis][ids[mid]]
+            stack.append((lo, mid, (axis + 1) % 3))
+            stack.append((mid + 1, hi, (axis + 1) % 3))
+        self.pending = []  # ids añadidos o movidos desde la última construcción (se recorren enteros)
+        self.stale = set()  # ids cuya posición en el árbol ya no es válida
+
+    def __len__(self):
+        return len(self.xs)
+
+    def update(self, node, latitude, longitude):
+        # Alta de un id nuevo (node == len) o cambio de coordenadas de uno existente
+        x, y, z = unit_vector(latitude, longitude)
+        if node == len(self.xs):
+            self.xs.append(x)
+            self.ys.append(y)
+            self.zs.append(z)
+        elif (self.xs[node], self.ys[node], self.zs[node]) == (x, y, z):
+            return
+        else:
+            self.xs[node], self.ys[node], self.zs[node] = x, y, z
+            if node < len(self.order):
+                self.stale.add(node)
+            if node in self.pending:
+                return
+        self.pending.append(node)
+        if len(self.pending) > max(32, int(sqrt(len(self.xs)))):
+            self._build()
+
+    def _squared(self, node, qx, qy, qz):
+        return (self.xs[node] - qx) ** 2 + (self.ys[node] - qy) ** 2 + (self.zs[node] - qz) ** 2
+
+    def _walk(self, query, consider, bound):
+        # Recorrido con poda: bound() es la distancia² máxima que aún interesa
+        order, axes, splits, stale = self.order, self.axes, self.splits, self.stale
+        for node in self.pending:
+            consider(node)
+        stack = [(0, len(order), 0.0)]
+        while stack:
+            lo, hi, gap = stack.pop()
+            if lo >= hi or gap > bound():
+                continue
+            mid = (lo + hi) // 2
+            node = order[mid]
+            if node not in stale:
+                consider(node)
+            diff = query[axes[mid]] - splits[mid]
+            if diff < 0:
+                stack.append((mid + 1, hi, diff * diff))
+                stack.append((lo, mid, 0.0))
+            else:
+                stack.append((lo, mid, diff * diff))
+                stack.append((mid + 1, hi, 0.0))
+
+    def k_nearest(self, latitude, longitude, k=1):
+        # Lista de (id, km) de los k puntos más cercanos, del más cercano al más lejano
+        query = unit_vector(latitude, longitude)
+        best = []  # heap de máximos con (-distancia², id)
+
+        def consider(node):
+            d = self._squared(node, *query)
+            if len(best) < k:
+                heapq.heappush(best, (-d, node))
+            elif d < -best[0][0]:
+                heapq.heapreplace(best, (-d, node))
+
+        def bound():
+            return -best[0][0] if len(best) == k else float('inf')
+
+        if k > 0:
+            self._walk(query, consider, bound)
+        return [(node, chord_to_km(-d)) for d, node in sorted(best, reverse=True)]
+
+    def nearest(self, latitude, longitude):
+        found = self.k_nearest(latitude, longitude, 1)
+        return found[0] if found else None
+
+    def within(self, latitude, longitude, radius_km):
+        # ids de todos los puntos a menos de radius_km (ortodrómica) del punto dado
+        query = unit_vector(latitude, longitude)
+        angle = min(radius_km / EARTH_RADIUS, pi)
+        limit = (2 * sin(angle / 2)) ** 2 + 1e-12
+        found = array('l')
+
+        def consider(node):
+            if self._squared(node, *query) <= limit:
+                found.append(node)
+
+        self._walk(query, consider, lambda: limit)
+        return found
+
+
+class GridIndex:
+    # Rejilla uniforme en lat/lon sobre cajas (min_lat, min_lon, max_lat, max_lon): un punto es
+    # una caja degenerada y un segmento su caja envolvente. Cada caja se apunta en todas las
+    # celdas que toca; las consultas devuelven arrays de ids
+    def __init__(self, boxes, ids=None, cell_size=None):
+        self.min_lat, self.min_lon = array('d'), array('d')
+        self.max_lat, self.max_lon = array('d'), array('d')
+        for box in boxes:
+            for values, value in zip((self.min_lat, self.min_lon, self.max_lat, self.max_lon), box):
+                values.append(value)
+        self.ids = ids if ids is not None else array('l', range(len(self.min_lat)))
+        count = len(self.min_lat)
+        if cell_size is None:
+            # Unas pocas cajas por celda de media
+            if count:
+                extent = ((max(self.max_lat) - min(self.min_lat)) *
+                          (max(self.max_lon) - min(self.min_lon)))
+            else:
+                extent = 0.0
+            cell_size = max(sqrt(4 * extent / count), 0.01) if count else 1.0
+        self.cell_size = cell_size
+        self.points_only = all(a == b for a, b in zip(self.min_lat, self.max_lat)) and \
+            all(a == b for a, b in zip(self.min_lon, self.max_lon))
+        self.cells = {}
+        for i in range(count):
+            for key in self._cells(self.min_lat[i], self.min_lon[i], self.max_lat[i], self.max_lon[i]):
+                self.cells.setdefault(key, array('l')).append(i)
+
+    @classmethod
+    def points(cls, latitudes, longitudes, cell_size=None):
+        return cls(((lat, lon, lat, lon) for lat, lon in zip(latitudes, longitudes)), cell_size=cell_size)
+
+    @classmethod
+    def segments(cls, adjacency, cell_size=None):
+        # Una entrada por par de nodos conectados (como segment_lines); el id es la posición CSR
+        lat, lon = adjacency.latitudes, adjacency.longitudes
+        boxes, ids = [], array('l')
+        for u in range(adjacency.node_count):
+            for k in range(adjacency.offsets[u], adjacency.offsets[u + 1]):
+                v = adjacency.targets[k]
+                if u < v or u not in adjacency.neighbors(v):
+                    boxes.append((min(lat[u], lat[v]), min(lon[u], lon[v]),
+                                  max(lat[u], lat[v]), max(lon[u], lon[v])))
+                    ids.append(k)
+        return cls(boxes, ids, cell_size)
+
+    def _ranges(self, min_lat, min_lon, max_lat, max_lon):
+        size = self.cell_size
+        return (range(int(min_lat // size), int(max_lat // size) + 1),
+                range(int(min_lon // size), int(max_lon // size) + 1))
+
+    def _cells(self, min_lat, min_lon, max_lat, max_lon):
+        rows, columns = self._ranges(min_lat, min_lon, max_lat, max_lon)
+        return [(row, column) for row in rows for column in columns]
+
+    def query(self, min_lat, min_lon, max_lat, max_lon):
+        # ids (ordenados, sin repetir) de las cajas que cortan la caja dada. Si min_lon > max_lon
+        # la caja cruza el antimeridiano
+        if min_lon > max_lon:
+            found = set(self.query(min_lat, min_lon, max_lat, 180.0))
+            found.update(self.query(min_lat, -180.0, max_lat, max_lon))
+            return array('l', sorted(found))
+        rows, columns = self._ranges(min_lat, min_lon, max_lat, max_lon)
+        if len(rows) * len(columns) > len(self.cells):
+            # Caja mayor que la zona ocupada: se recorren solo las celdas con contenido
+            keys = self.cells.keys()
+        else:
+            keys = ((row, column) for row in rows for column in columns)
+        found = []
+        for row, column in keys:
+            bucket = self.cells.get((row, column))
+            if not bucket:
+                continue
+            if self.points_only and rows.start < row < rows.stop - 1 and columns.start < column < columns.stop - 1:
+                # Celda interior: todos sus puntos están dentro sin comprobar nada
+                found.extend(bucket)
+                continue
+            for i in bucket:
+                if (self.min_lat[i] <= max_lat and self.max_lat[i] >= min_lat and
+                        self.min_lon[i] <= max_lon and self.max_lon[i] >= min_lon):
+                    found.append(i)
+        if not self.points_only:
+            # Una caja que ocupa varias celdas aparece una vez por celda
+            found = set(found)
+        return array('l', sorted(self.ids[i] for i in found))
@@ -0,0 +1,12 @@
+from adjacency import Adjacency
+
+# Tres puntos en línea: 0 - 1 - 2 (aristas en ambos sentidos, con una repetida)
+lats = [41.0, 41.5, 42.0]
+lons = [2.0, 2.0, 2.0]
+adj = Adjacency(lats, lons, [0, 1, 1, 2, 0], [1, 0, 2, 1, 1])
+
+print("Aristas dirigidas:", adj.edge_count())  # 4 (la repetida se ignora)
+print("Vecinos de 1:", list(adj.neighbors(1)))  # [0, 2]
+print("Peso 0 -> 1 (km):", adj.weight(0, 1))  # ~55.6
+print("Peso 0 -> 2:", adj.weight(0, 2))  # None, no hay arista
+print("Memoria (bytes):", adj.memory_size())
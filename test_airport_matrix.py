@@ -0,0 +1,42 @@
+import os
+import tempfile
+from airSpace import AirSpace
+from navPoint import NavPoint
+from navAirport import NavAirport
+from airport_matrix import AirportMatrix
+
+a = AirSpace()
+for number, name, lat, lon in [(1, "GODOX", 41.0, 2.0), (2, "KERIP", 41.5, 2.5), (3, "LOTOS", 42.0, 3.0),
+                               (4, "BCN.D", 41.3, 2.1), (5, "PMI.A", 39.5, 2.7), (6, "MAD.D", 40.4, -3.6)]:
+    a.add_point(NavPoint(number, name, lat, lon))
+for origin, destination in [(4, 1), (1, 2), (2, 3), (3, 5)]:
+    a.add_segment(origin, destination)
+for name, sids, stars in [("LEBL", [4], [4]), ("LEPA", [5], [5]), ("LEMD", [6], [6])]:
+    airport = NavAirport(name)
+    airport.sids = [a.nav_points[n] for n in sids]
+    airport.stars = [a.nav_points[n] for n in stars]
+    a.nav_airports[name] = airport
+
+m = AirportMatrix.compute(a, processes=1)
+print(m, m.recomputed)  # AirportMatrix(3 airports, metric=great_circle) 3
+print([p.name for p in m.route("LEBL", "LEPA").nodes])  # ['BCN.D', 'GODOX', 'KERIP', 'LOTOS', 'PMI.A']
+print(abs(m.distance("LEBL", "LEPA") - a.find_shortest_path("LEBL", "LEPA").cost) < 1e-9)  # True
+print(m.distance("LEBL", "LEMD"), m.route("LEBL", "LEMD"), m.distance("LEBL", "XXXX"))  # inf None None
+
+# Una arista nueva solo recalcula los orígenes cuyo árbol mejora
+a.add_segment(6, 4)
+print(m.is_stale(), m.refresh(processes=1), m.is_stale())  # True 3 False
+a.add_segment(1, 3)
+print(m.refresh(processes=1), [p.name for p in m.route("LEBL", "LEPA").nodes])  # 3 ['BCN.D', 'GODOX', 'LOTOS', 'PMI.A']
+fresh = AirportMatrix.compute(a, processes=1)
+print(all(x == y for x, y in zip(m.distances, fresh.distances)))  # True
+print(m.refresh(processes=1))  # 0 (sin cambios desde el último refresh)
+
+with tempfile.TemporaryDirectory() as directory:
+    m.to_csv(os.path.join(directory, "matrix.csv"))
+    with open(os.path.join(directory, "matrix.csv")) as f:
+        print(f.readline().strip(), f.readline().split(",")[:2])  # origin,LEBL,LEPA,LEMD ['LEBL', '0.000000']
+    m.to_npy(os.path.join(directory, "matrix.npy"))
+    with open(os.path.join(directory, "matrix.npy"), 'rb') as f:
+        data = f.read()
+    print(data[:6], len(data) == 128 + 9 * 8)  # b'\x93NUMPY' True
@@ -0,0 +1,29 @@
+from airSpace import AirSpace
+from navPoint import NavPoint
+
+
+def build(points, segments):
+    airspace = AirSpace()
+    for number, name, lat, lon in points:
+        airspace.add_point(NavPoint(number, name, lat, lon))
+    for origin, destination in segments:
+        airspace.add_segment(origin, destination)
+    return airspace
+
+
+# Dos espacios aéreos distintos: uno de tres puntos y otro de cinco
+small = build([(1, "GODOX", 41.0, 2.0), (2, "KERIP", 41.5, 2.5), (3, "LOTOS", 42.0, 3.0)],
+              [(1, 2), (2, 3)])
+large = build([(1, "ALPHA", 40.0, 0.0), (2, "BRAVO", 40.0, 1.0), (3, "CHARL", 40.0, 2.0),
+               (4, "DELTA", 40.0, 3.0), (5, "ECHOO", 40.0, 4.0)],
+              [(1, 2), (2, 3), (3, 4), (4, 5)])
+
+# Lotes abiertos a la vez y recorridos intercalados: cada uno usa su propio grafo
+first = small.route_batch([("GODOX", "LOTOS")] * 3, processes=1, chunk_size=1)
+second = large.route_batch([("ALPHA", "ECHOO")] * 3, processes=1, chunk_size=1)
+for a, b in zip(first, second):
+    print([p.name for p in a.path.nodes], len(b.path.nodes), b.error)
+# ['GODOX', 'KERIP', 'LOTOS'] 5 None (tres veces)
+
+# Un lote de un espacio aéreo no ve los puntos del otro
+print(next(small.route_batch([("ALPHA", "ECHOO")], processes=1)).error)  # unknown point ALPHA
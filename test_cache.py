@@ -0,0 +1,12 @@
+from cache import LRUCache
+
+c = LRUCache(maxsize=2)
+c.put("LEBL", 1)
+c.put("LEMD", 2)
+print(c.get("LEBL"))  # 1 (LEBL pasa a ser la más reciente)
+c.put("LEPA", 3)  # se descarta LEMD
+print("LEMD" in c, "LEBL" in c, "LEPA" in c)  # False True True
+print(c.get("LEMD"))  # None
+print(c)  # LRUCache(size=2/2, hits=1, misses=1)
+print(c.items())  # [('LEBL', 1), ('LEPA', 3)]
+print(c.pop("LEBL"), c.pop("LEBL"), len(c))  # 1 None 1
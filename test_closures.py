@@ -0,0 +1,35 @@
+from airSpace import AirSpace
+from navPoint import NavPoint
+
+a = AirSpace()
+for number, name, lat, lon in [(1, "GODOX", 41.0, 2.0), (2, "KERIP", 41.5, 2.5),
+                               (3, "LOTOS", 42.0, 3.0), (4, "MAMES", 41.0, 3.0)]:
+    a.add_point(NavPoint(number, name, lat, lon))
+a.add_segment(1, 2)
+a.add_segment(2, 3)
+a.add_segment(1, 4)
+a.add_segment(4, 3)
+
+print([p.name for p in a.find_shortest_path("GODOX", "LOTOS").nodes])  # ['GODOX', 'KERIP', 'LOTOS']
+a.find_shortest_path("GODOX", "MAMES")
+
+# Cerrar un segmento de la ruta cacheada la repara; la otra ruta se conserva
+print(a.close_segment(2, 3), a.close_segment(3, 2), a.last_repair)  # True False (1, 1)
+hits = a.route_cache.hits
+route = a.find_shortest_path("GODOX", "LOTOS")
+print([p.name for p in route.nodes], a.route_cache.hits == hits + 1)  # ['GODOX', 'MAMES', 'LOTOS'] True
+print(route.cost == a.find_shortest_path("GODOX", "LOTOS", method="astar").cost)  # True
+
+# La jerarquía se personaliza con los pesos cerrados, sin volver a contraer
+print(a.find_shortest_path("GODOX", "LOTOS", method="ch").cost == route.cost)  # True
+
+# Sin ningún camino abierto el destino deja de ser alcanzable
+a.close_segment(4, 3)
+print(a.find_shortest_path("GODOX", "LOTOS"), a.is_reachable("GODOX", "LOTOS"))  # None False
+print(len(a.reachable_nodes("GODOX")))  # 3
+
+# Al reabrir vuelve la ruta original
+a.reopen_segment(4, 3)
+a.reopen_segment(2, 3)
+print([p.name for p in a.find_shortest_path("GODOX", "LOTOS").nodes], a.closed_segments)  # ['GODOX', 'KERIP', 'LOTOS'] set()
+print(a.reopen_segment(2, 3))  # False
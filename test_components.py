@@ -0,0 +1,20 @@
+from airSpace import AirSpace
+from navPoint import NavPoint
+
+a = AirSpace()
+for number, name, lat, lon in [(1, "GODOX", 41.0, 2.0), (2, "KERIP", 41.5, 2.5),
+                               (3, "LOTOS", 42.0, 3.0), (4, "MAMES", 40.0, 1.0)]:
+    a.add_point(NavPoint(number, name, lat, lon))
+a.add_segment(1, 2)
+print(a.components.count)  # 3 (GODOX-KERIP, LOTOS, MAMES)
+print(a.is_reachable("GODOX", "KERIP"), a.is_reachable("GODOX", "LOTOS"))  # True False
+print(a.find_shortest_path("GODOX", "LOTOS"), a.last_expanded)  # None 0
+
+reachable = a.reachable_nodes("KERIP")
+print(len(reachable), a.nav_points[1] in reachable, a.nav_points[3] in reachable)  # 2 True False
+
+# Arista de un solo sentido: misma componente, pero solo alcanzable en ese sentido
+a.nav_points[2].add_neighbor(a.nav_points[3])
+print(a.components.symmetric())  # False
+print(a.is_reachable("GODOX", "LOTOS"), a.is_reachable("LOTOS", "GODOX"))  # True False
+print(sorted(p.name for p in a.reachable_nodes("LOTOS")))  # ['LOTOS']
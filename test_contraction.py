@@ -0,0 +1,27 @@
+import os
+import tempfile
+from adjacency import Adjacency
+from contraction import ContractionHierarchy
+
+# Cuadrado 0-1-2-3 con una diagonal 0-2
+lats = [41.0, 41.0, 42.0, 42.0]
+lons = [1.0, 2.0, 2.0, 1.0]
+sources = [0, 1, 1, 2, 2, 3, 3, 0, 0, 2]
+destinations = [1, 0, 2, 1, 3, 2, 0, 3, 2, 0]
+adj = Adjacency(lats, lons, sources, destinations)
+
+ch = ContractionHierarchy.build(adj, "great_circle")
+print("Rangos:", list(ch.rank))
+print("Atajos:", ch.shortcut_count)
+
+result = ch.query(1, 3)
+print("Ruta 1 -> 3:", result.nodes, "coste: {:.2f}".format(result.cost))  # 3 nodos, pasa por 0 o por 2
+
+descriptor, filename = tempfile.mkstemp(suffix=".ch")
+os.close(descriptor)
+try:
+    ch.save(filename)
+    loaded = ContractionHierarchy.load(filename)
+    print("Ruta tras cargar:", loaded.query(1, 3).nodes)
+finally:
+    os.remove(filename)
@@ -1,5 +1,5 @@
 from graph import Graph
-from node import Node
+from node import Node, AddNeighbor
 
 
 def CreateGraph_1():
@@ -92,3 +92,32 @@ def CreateGraph_FromFile():
     print(n.name)
 
 
+# Vecinos editados fuera del grafo sin cambiar su número: el conjunto no queda desfasado
+G3 = Graph()
+for name, x, y in (("X", 0, 0), ("Y", 1, 0), ("Z", 0, 1)):
+    G3.add_node(Node(name, x, y))
+G3.connect("X", "Y")
+x = G3.get_node_by_name("X")
+x.neighbors.remove(G3.get_node_by_name("Y"))
+AddNeighbor(x, G3.get_node_by_name("Z"))
+print(G3.connect("X", "Y"), G3.connect("X", "Z"), [n.name for n in x.neighbors])  # True False ['Z', 'Y']
+
+# Simetría llevada al conectar, sin recorrer todas las aristas en cada búsqueda bidireccional
+print(G3.is_symmetric())  # False
+G3.connect("Y", "X")
+G3.connect("Z", "X")
+print(G3.is_symmetric(), [n.name for n in G3.FindShortestPath("Y", "Z", bidirectional=True).nodes])
+# True ['Y', 'X', 'Z']
+AddNeighbor(G3.get_node_by_name("Y"), G3.get_node_by_name("Z"))
+print(G3.is_symmetric())  # False
+
+# Nodos que llegan ya enlazados (A -> B y C -> B con AddNeighbor): no es simétrico y no hay
+# ruta A -> C en ningún sentido de búsqueda
+a, b, c = Node("A", 0, 0), Node("B", 1, 1), Node("C", 2, 0)
+AddNeighbor(a, b)
+AddNeighbor(c, b)
+G4 = Graph()
+for node in (a, b, c):
+    G4.add_node(node)
+print(G4.is_symmetric(), G4.FindShortestPath("A", "C", bidirectional=True), G4.FindShortestPath("A", "C"))
+# False None None
@@ -0,0 +1,23 @@
+import os
+import tempfile
+from airSpace import AirSpace
+
+with tempfile.TemporaryDirectory() as directory:
+    nav_file = os.path.join(directory, "nav.txt")
+    seg_file = os.path.join(directory, "seg.txt")
+    aer_file = os.path.join(directory, "aer.txt")
+    kml_file = os.path.join(directory, "flights.kml")
+    with open(nav_file, 'w') as f:
+        f.write("1 LEBL.D 41.3 2.1\n2 LEBL.A 41.3 2.2\n3 LEMD.D 40.5 -3.6\n4 LEMD.A 40.5 -3.5\n"
+                "5 LEPA.D 39.5 2.7\n6 LEPA.A 39.5 2.8\n")
+    with open(seg_file, 'w') as f:
+        f.write("1 4 480.0\n3 2 480.0\n")  # LEPA queda aislado
+    with open(aer_file, 'w') as f:
+        f.write("LEBL\nLEBL.D\nLEBL.A\nLEMD\nLEMD.D\nLEMD.A\nLEPA\nLEPA.D\nLEPA.A\n")
+
+    a = AirSpace()
+    a.load_from_files(nav_file, seg_file, aer_file, snapshot=False)
+    # Solo hay dos pares con ruta: se generan esos vuelos en lugar de buscar seis para siempre
+    a.export_surprise_kml(kml_file, num_flights=6)
+    with open(kml_file) as f:
+        print(f.read().count("<name>Flight "))  # 2
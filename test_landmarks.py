@@ -0,0 +1,14 @@
+from adjacency import Adjacency
+from landmarks import Landmarks
+
+# Camino 0 - 1 - 2 - 3 de oeste a este
+lats = [41.0, 41.0, 41.0, 41.0]
+lons = [0.0, 1.0, 2.0, 3.0]
+adj = Adjacency(lats, lons, [0, 1, 1, 2, 2, 3], [1, 0, 2, 1, 3, 2])
+
+for strategy in ("farthest", "avoid"):
+    lm = Landmarks.build(adj, count=2, strategy=strategy)
+    h = lm.heuristic_to(3)
+    print(strategy, "landmarks:", lm.landmarks)
+    print("  cota 0 -> 3: {:.2f} km".format(h(0)))  # cercana a la distancia real (~252 km)
+    print("  distancia real 0 -> 3: {:.2f} km".format(sum(adj.weight(i, i + 1) for i in range(3))))
@@ -0,0 +1,36 @@
+import os
+import tempfile
+from airSpace import AirSpace
+from loader import read_columns, LoadReport
+
+with tempfile.TemporaryDirectory() as directory:
+    nav_file = os.path.join(directory, "nav.txt")
+    seg_file = os.path.join(directory, "seg.txt")
+    aer_file = os.path.join(directory, "aer.txt")
+    with open(nav_file, 'w') as f:
+        f.write("1 GODOX 41.0 2.0\n2 KERIP 41.5 2.5\n3 LOTOS 42.0 3.0\n4 MAMES\n5 BCN.D 41.3 2.1\n")
+    with open(seg_file, 'w') as f:
+        f.write("1 2 70.5\n2 3 x\n2 3 65.0\n3 9 10.0\n5 1 12.0\n")
+    with open(aer_file, 'w') as f:
+        f.write("LEBL\nBCN.D\nBCN.A\n")
+
+    report = LoadReport()
+    numbers, names, lats, lons = read_columns(nav_file, ('l', str, 'd', 'd'), report)
+    print(list(numbers), names)  # [1, 2, 3, 5] ['GODOX', 'KERIP', 'LOTOS', 'BCN.D']
+    print(report.count("malformed row"))  # 1
+
+    a = AirSpace()
+    a.load_from_files(nav_file, seg_file, aer_file)
+    print(len(a.nav_points), len(a.nav_segments))  # 4 3
+    print(a.load_report.count("malformed row"), a.load_report.count("unknown endpoint"))  # 2 1
+    print(a.load_report.ignored["unknown endpoint"][1][0][1:])  # (4, '3 → 9')
+    print(len(a.nav_airports["LEBL"].sids), len(a.nav_airports["LEBL"].stars))  # 1 0
+    print([p.name for p in a.find_shortest_path("BCN.D", "LOTOS").nodes])  # ['BCN.D', 'GODOX', 'KERIP', 'LOTOS']
+
+    # Misma cantidad total de campos pero filas descuadradas: "5 1" es una fila corta, no el
+    # final de un segmento 4 -> 5
+    with open(seg_file, 'w') as f:
+        f.write("1 2 30.0 4\n5 1\n")
+    report = LoadReport()
+    print([list(column) for column in read_columns(seg_file, ('l', 'l', 'd'), report)], report.count("malformed row"))
+    # [[1], [2], [30.0]] 1
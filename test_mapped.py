@@ -0,0 +1,35 @@
+import os
+import tempfile
+from airSpace import AirSpace
+from mapped import MappedAirSpace
+from snapshot import snapshot_path
+
+with tempfile.TemporaryDirectory() as directory:
+    nav_file = os.path.join(directory, "nav.txt")
+    seg_file = os.path.join(directory, "seg.txt")
+    aer_file = os.path.join(directory, "aer.txt")
+    with open(nav_file, 'w') as f:
+        f.write("1 GODOX 41.0 2.0\n2 KERIP 41.5 2.5\n3 LOTOS 42.0 3.0\n4 BCN.D 41.3 2.1\n"
+                "5 MAMES 40.0 1.0\n6 PMI.A 39.5 2.7\n")
+    with open(seg_file, 'w') as f:
+        f.write("1 2 70.5\n2 3 65.0\n4 1 12.0\n3 6 300.0\n")
+    with open(aer_file, 'w') as f:
+        f.write("LEBL\nBCN.D\nLEPA\nPMI.A\n")
+
+    a = AirSpace()
+    a.load_from_files(nav_file, seg_file, aer_file)  # escribe el snapshot
+
+    with MappedAirSpace(snapshot_path(nav_file)) as m:
+        print(len(m), m.find_point_by_name("LOTOS").number, m.find_point_by_name("NOPE"))  # 6 3 None
+        path = m.find_shortest_path("BCN.D", "LOTOS")
+        print([p.name for p in path.nodes], round(path.cost, 6) == round(a.find_shortest_path("BCN.D", "LOTOS").cost, 6))
+        # ['BCN.D', 'GODOX', 'KERIP', 'LOTOS'] True
+        print(m.find_shortest_path("GODOX", "MAMES"))  # None (otra componente)
+        print([p.name for p in m.find_shortest_path("LEBL", "LEPA").nodes])  # ['BCN.D', 'GODOX', 'KERIP', 'LOTOS', 'PMI.A']
+
+        reachable = m.reachable_nodes("KERIP")
+        print(len(reachable), m.find_point_by_name("GODOX") in reachable, m.find_point_by_name("MAMES") in reachable)  # 5 True False
+        print(m.is_reachable("PMI.A", "BCN.D"), m.is_reachable("MAMES", "BCN.D"))  # True False
+
+        results = list(m.route_batch([("GODOX", "LOTOS"), ("GODOX", "MAMES"), ("NOPE", "LOTOS")], processes=1))
+        print([r.error for r in results])  # [None, 'no route', 'unknown point NOPE']
@@ -0,0 +1,49 @@
+from airSpace import AirSpace
+from navPoint import NavPoint
+import metrics
+
+# Dos caminos de GODOX a LOTOS: por el norte (KERIP, más corto) y por el sur (MAMES)
+a = AirSpace()
+for number, name, lat, lon in [(1, "GODOX", 41.0, 1.0), (2, "KERIP", 41.3, 2.0),
+                               (3, "LOTOS", 41.0, 3.0), (4, "MAMES", 40.5, 2.0)]:
+    a.add_point(NavPoint(number, name, lat, lon))
+for origin, destination in [(1, 2), (2, 3), (1, 4), (4, 3)]:
+    a.add_segment(origin, destination)
+
+names = lambda path: [p.name for p in path.nodes]
+print(names(a.find_shortest_path("GODOX", "LOTOS")))  # ['GODOX', 'KERIP', 'LOTOS']
+
+# Tiempo con viento: un chorro del oeste que solo sopla al sur de 41º hace más rápido el camino sur
+a.add_metric("time", metrics.wind_time(800, lambda lat, lon: (250.0, 0.0) if lat < 41.0 else (0.0, 0.0)))
+route = a.find_shortest_path("GODOX", "LOTOS", metric="time")
+print(names(route), round(route.cost, 1))  # ['GODOX', 'MAMES', 'LOTOS'] 12.2
+
+# Tasas de ruta por zona y una combinación de métricas
+a.add_metric("charges", metrics.route_charges(lambda lat, lon: 90.0 if lat < 41.0 else 40.0))
+print(names(a.find_shortest_path("GODOX", "LOTOS", metric="charges")))  # ['GODOX', 'KERIP', 'LOTOS']
+a.add_metric("cost", metrics.combination({"time": 10.0, "charges": 1.0}))
+print(names(a.find_shortest_path("GODOX", "LOTOS", metric="cost")))  # ['GODOX', 'KERIP', 'LOTOS']
+
+# Jerarquía y landmarks se personalizan por métrica a partir de lo preparado una vez
+for method in ("ch", "alt"):
+    print(method, a.find_shortest_path("GODOX", "LOTOS", metric="time", method=method).cost == route.cost)  # True
+print(a.hierarchy.metric, sorted(a.hierarchies))  # great_circle ['time']
+
+# Vientos nuevos: se sustituyen los pesos y lo preparado para esa métrica
+a.add_metric("time", metrics.wind_time(800))
+print(names(a.find_shortest_path("GODOX", "LOTOS", metric="time")), sorted(a.hierarchies))  # ['GODOX', 'KERIP', 'LOTOS'] []
+print(a.adjacency.weight(0, 1, "cost") == 10 * a.adjacency.weight(0, 1, "time") + a.adjacency.weight(0, 1, "charges"))  # True
+
+# Al cambiar la topología las métricas se recalculan sobre la nueva adyacencia
+a.add_segment(1, 3)
+print(names(a.find_shortest_path("GODOX", "LOTOS", metric="cost")))  # ['GODOX', 'LOTOS']
+
+try:
+    a.remove_metric("charges")
+except ValueError as e:
+    print(e)  # Metric charges is used by cost
+print(a.remove_metric("cost"), a.remove_metric("charges"), a.remove_metric("charges"))  # True True False
+try:
+    a.find_shortest_path("GODOX", "LOTOS", metric="charges")
+except ValueError as e:
+    print(e)  # Unknown metric: charges
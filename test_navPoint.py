@@ -1,4 +1,5 @@
 from navPoint import NavPoint
+from airSpace import AirSpace
 
 # Crear dos puntos de navegación
 n1 = NavPoint(1001, "GODOX", 39.3725, 1.410833)
@@ -15,4 +16,14 @@ print("Intentando añadir de nuevo:", n1.add_neighbor(n2))       # False
 print("Vecinos de GODOX:", n1.neighbors)
 
 # Probar el método get_coords
-print("Coordenadas de GODOX:", n1.get_coords())
\ No newline at end of file
+print("Coordenadas de GODOX:", n1.get_coords())
+# Dentro de un AirSpace solo se enlaza con puntos del mismo espacio aéreo
+a, b = AirSpace(), AirSpace()
+a.add_point(n1)
+b.add_point(n2)
+for other in (n2, NavPoint(1003, "LOTOS", 41.0, 2.0)):
+    try:
+        n1.add_neighbor(other)
+    except ValueError as e:
+        print(e)  # Point not in this airspace: KERIP / LOTOS
+print(a.adjacency.targets, a.components.count)  # array('l') 1
@@ -0,0 +1,53 @@
+from airSpace import AirSpace
+from navPoint import NavPoint
+from navAirport import NavAirport
+
+a = AirSpace(route_cache_size=4)
+for number, name, lat, lon in [(1, "GODOX", 41.0, 2.0), (2, "KERIP", 41.5, 2.5),
+                               (3, "LOTOS", 42.0, 3.0), (4, "MAMES", 40.0, 1.0)]:
+    a.add_point(NavPoint(number, name, lat, lon))
+a.add_segment(1, 2)
+a.add_segment(2, 3)
+
+first = a.find_shortest_path("GODOX", "LOTOS")
+again = a.find_shortest_path("GODOX", "LOTOS")
+print(a.route_cache.hits, a.route_cache.misses, a.last_expanded)  # 1 1 0
+print(again is not first, again.cost == first.cost)  # True True
+
+# Grafo simétrico: la ruta inversa se sirve desde la cacheada
+back = a.find_shortest_path("LOTOS", "GODOX")
+print([p.name for p in back.nodes], a.route_cache.hits)  # ['LOTOS', 'KERIP', 'GODOX'] 2
+print(back.segment_costs == first.segment_costs[::-1])  # True
+
+# Sin ruta también se cachea; con un método explícito no se usa la caché
+print(a.find_shortest_path("GODOX", "MAMES"), a.find_shortest_path("GODOX", "MAMES"))  # None None
+print(a.route_cache.hits, a.route_cache.misses)  # 3 2
+a.find_shortest_path("GODOX", "LOTOS", method="astar")
+print(a.route_cache.hits, a.route_cache.misses)  # 3 2
+
+# Editar el grafo invalida las rutas anteriores
+version = a.version
+a.add_segment(1, 3)
+print(a.version > version)  # True
+print([p.name for p in a.find_shortest_path("GODOX", "LOTOS").nodes], a.route_cache.misses)  # ['GODOX', 'LOTOS'] 3
+a.add_segment(1, 4)
+print([p.name for p in a.find_shortest_path("GODOX", "MAMES").nodes])  # ['GODOX', 'MAMES']
+
+# Arista de un solo sentido: ya no se sirve la inversa
+a.nav_points[4].add_neighbor(a.nav_points[2])
+a.find_shortest_path("KERIP", "MAMES")
+a.find_shortest_path("MAMES", "KERIP")
+print(a.route_cache.misses)  # 6
+
+# Aeropuertos: find_shortest_path y airport_paths_from comparten las entradas
+for name, sid, star in [("LEBL", 1, 1), ("LEPA", 3, 3)]:
+    airport = NavAirport(name)
+    airport.sids.append(a.nav_points[sid])
+    airport.stars.append(a.nav_points[star])
+    a.nav_airports[name] = airport
+route = a.find_shortest_path("LEBL", "LEPA")
+paths = a.airport_paths_from("LEBL", ["LEPA"])
+print(paths["LEPA"].cost == route.cost, a.route_cache.hits, len(a.tree_cache))  # True 4 0
+
+a.clear()
+print(a.find_shortest_path("GODOX", "LOTOS"), len(a.route_cache) <= 4)  # None True
@@ -0,0 +1,53 @@
+import os
+import tempfile
+from airSpace import AirSpace
+from route_store import RouteStore
+
+with tempfile.TemporaryDirectory() as directory:
+    nav_file = os.path.join(directory, "nav.txt")
+    seg_file = os.path.join(directory, "seg.txt")
+    aer_file = os.path.join(directory, "aer.txt")
+    with open(nav_file, 'w') as f:
+        f.write("1 GODOX 41.0 2.0\n2 KERIP 41.5 2.5\n3 LOTOS 42.0 3.0\n4 BCN.D 41.3 2.1\n5 PMI.A 39.5 2.7\n6 MAMES 40.0 1.0\n")
+    with open(seg_file, 'w') as f:
+        f.write("1 2 70.5\n2 3 65.0\n4 1 12.0\n3 5 20.0\n")
+    with open(aer_file, 'w') as f:
+        f.write("LEBL\nBCN.D\nLEPA\nPMI.A\n")
+
+    a = AirSpace()
+    a.load_from_files(nav_file, seg_file, aer_file, route_store=True)
+    route = a.find_shortest_path("BCN.D", "LOTOS")
+    a.find_shortest_path("LEBL", "LEPA")
+    a.find_shortest_path("GODOX", "MAMES")  # sin ruta: también se guarda
+    a.close_route_store()  # espera a las escrituras pendientes
+    print(os.path.exists(nav_file + ".routes"))  # True
+
+    # Nueva sesión sobre el mismo dataset: las rutas conocidas salen del almacén sin buscar
+    b = AirSpace()
+    b.load_from_files(nav_file, seg_file, aer_file, route_store=True)
+    path = b.find_shortest_path("BCN.D", "LOTOS")
+    print([p.name for p in path.nodes], path.cost == route.cost, b.last_expanded)  # ['BCN.D', 'GODOX', 'KERIP', 'LOTOS'] True 0
+    print([p.name for p in b.find_shortest_path("LEBL", "LEPA").nodes])  # ['BCN.D', 'GODOX', 'KERIP', 'LOTOS', 'PMI.A']
+    print(b.find_shortest_path("GODOX", "MAMES"), b.route_store.hits, b.route_store.misses)  # None 3 0
+    print(len(b.route_store))  # 3
+
+    # Tras editar el grafo el almacén deja de consultarse
+    b.add_segment(1, 3)
+    print([p.name for p in b.find_shortest_path("BCN.D", "LOTOS").nodes], b.route_store.hits)  # ['BCN.D', 'GODOX', 'LOTOS'] 3
+    b.close_route_store()
+
+    # Otro dataset en los mismos ficheros: las rutas del anterior se borran al abrir
+    with open(seg_file, 'a') as f:
+        f.write("1 6 90.0\n")
+    c = AirSpace()
+    c.load_from_files(nav_file, seg_file, aer_file, route_store=True)
+    c.route_store.flush()
+    print(c.route_store.collected, len(c.route_store))  # 3 0
+    print([p.name for p in c.find_shortest_path("GODOX", "MAMES").nodes])  # ['GODOX', 'MAMES']
+    c.close_route_store()
+
+    store = RouteStore(os.path.join(directory, "other.routes"), "abc")
+    store.put("file", "points", "A", "B", [1, 2])
+    store.flush()
+    print(list(store.get("file", "points", "A", "B")), store.get("file", "points", "B", "A"))  # [1, 2] None
+    store.close()
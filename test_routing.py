@@ -0,0 +1,15 @@
+import routing
+from adjacency import Adjacency
+
+# Cuadrado 0-1-2-3 con la diagonal 0-2: tres caminos simples de 0 a 2
+latitudes = [41.0, 41.0, 42.0, 42.0]
+longitudes = [2.0, 3.0, 3.0, 2.0]
+edges = [(0, 1), (1, 2), (2, 3), (3, 0), (0, 2)]
+sources = [u for u, v in edges] + [v for u, v in edges]
+destinations = [v for u, v in edges] + [u for u, v in edges]
+a = Adjacency(latitudes, longitudes, sources, destinations)
+
+to_target = routing.dijkstra(a.reverse(), 2)[0]
+routes = routing.k_shortest(a, 0, 2, 5, to_target)
+print([r.nodes for r in routes])  # [[0, 2], [0, 3, 2], [0, 1, 2]]
+print([round(r.cost, 1) for r in routes])  # [138.9, 193.8, 195.1]
@@ -0,0 +1,42 @@
+import os
+import tempfile
+from airSpace import AirSpace
+
+with tempfile.TemporaryDirectory() as directory:
+    nav_file = os.path.join(directory, "nav.txt")
+    seg_file = os.path.join(directory, "seg.txt")
+    aer_file = os.path.join(directory, "aer.txt")
+    with open(nav_file, 'w') as f:
+        f.write("1 GODOX 41.0 2.0\n2 KERIP 41.5 2.5\n3 LOTOS 42.0 3.0\n4 BCN.D 41.3 2.1\n")
+    with open(seg_file, 'w') as f:
+        f.write("1 2 70.5\n2 3 65.0\n4 1 12.0\n")
+    with open(aer_file, 'w') as f:
+        f.write("LEBL\nBCN.D\n")
+
+    a = AirSpace()
+    a.load_from_files(nav_file, seg_file, aer_file)  # lee el texto y escribe nav.txt.snapshot
+    print(os.path.exists(nav_file + ".snapshot"))  # True
+
+    b = AirSpace()
+    b.load_from_files(nav_file, seg_file, aer_file)  # carga el snapshot
+    print([p.name for p in b.find_shortest_path("BCN.D", "LOTOS").nodes])  # ['BCN.D', 'GODOX', 'KERIP', 'LOTOS']
+    print([p.name for p in b.nav_airports["LEBL"].sids])  # ['BCN.D']
+    print(b.is_reachable("LOTOS", "BCN.D"), len(b.nav_segments))  # True 3
+
+    # Tras cargar un snapshot se puede seguir editando el grafo
+    b.add_segment(3, 4)
+    print([p.name for p in b.find_shortest_path("BCN.D", "LOTOS").nodes])  # ['BCN.D', 'LOTOS']
+
+    # Un cambio en un fichero fuente invalida el snapshot
+    with open(seg_file, 'a') as f:
+        f.write("1 3 20.0\n")
+    c = AirSpace()
+    c.load_from_files(nav_file, seg_file, aer_file)
+    print(len(c.nav_segments), [p.name for p in c.find_shortest_path("GODOX", "LOTOS").nodes])  # 4 ['GODOX', 'LOTOS']
+
+    # Un snapshot dañado se ignora y se reescribe
+    with open(nav_file + ".snapshot", 'r+b') as f:
+        f.truncate(100)
+    d = AirSpace()
+    d.load_from_files(nav_file, seg_file, aer_file)
+    print(len(d.nav_segments))  # 4
@@ -0,0 +1,17 @@
+from spatial import SpatialIndex
+
+# Barcelona, Girona, Madrid, Palma
+s = SpatialIndex([41.30, 41.90, 40.47, 39.55], [2.08, 2.76, -3.56, 2.73])
+print(s.nearest(41.4, 2.2))  # (0, ~15 km): Barcelona
+print([node for node, km in s.k_nearest(41.4, 2.2, 3)])  # [0, 1, 3]
+print(sorted(s.within(41.4, 2.2, 100)))  # [0, 1]
+
+s.update(4, 41.45, 2.25)  # punto nuevo, sin reconstruir el árbol
+s.update(1, 40.0, 0.0)  # Girona se mueve
+print(s.nearest(41.4, 2.2)[0], sorted(s.within(41.4, 2.2, 100)))  # 4 [0, 4]
+
+from spatial import GridIndex
+
+g = GridIndex.points([41.30, 41.90, 40.47, 39.55], [2.08, 2.76, -3.56, 2.73])
+print(list(g.query(41.0, 1.5, 42.5, 3.5)))  # [0, 1]
+print(list(g.query(39.0, 2.0, 42.0, -3.0)))  # [0, 1, 2, 3] (cruza el antimeridiano)
@@ -0,0 +1,51 @@
+import os
+import tempfile
+from airSpace import AirSpace
+from tiles import build_tiles, TiledAirSpace
+
+with tempfile.TemporaryDirectory() as directory:
+    nav_file = os.path.join(directory, "nav.txt")
+    seg_file = os.path.join(directory, "seg.txt")
+    aer_file = os.path.join(directory, "aer.txt")
+    with open(nav_file, 'w') as f:
+        f.write("1 GODOX 41.0 2.0\n2 KERIP 41.5 2.5\n3 LOTOS 42.0 3.0\n4 BCN.D 41.3 2.1\n"
+                "5 MAMES 40.0 1.0\n6 PMI.A 39.5 2.7\n")
+    with open(seg_file, 'w') as f:
+        f.write("1 2 70.5\n2 3 65.0\n4 1 12.0\n3 6 300.0\n")
+    with open(aer_file, 'w') as f:
+        f.write("LEBL\nBCN.D\nLEPA\nPMI.A\n")
+
+    a = AirSpace()
+    a.load_from_files(nav_file, seg_file, aer_file, snapshot=False)
+    print(build_tiles(a, os.path.join(directory, "tiles"), cell_size=0.5))  # 5 (GODOX y BCN.D comparten tesela)
+
+    with TiledAirSpace(os.path.join(directory, "tiles"), max_tiles=2) as t:
+        print(t.tiles_loaded)  # 0 (nada cargado al abrir)
+        path = t.find_shortest_path("BCN.D", "LOTOS")
+        print([p.name for p in path.nodes], abs(path.cost - a.find_shortest_path("BCN.D", "LOTOS").cost) < 1e-9)
+        # ['BCN.D', 'GODOX', 'KERIP', 'LOTOS'] True
+        print(len(t.tile_cache) <= 2, t.tiles_loaded)  # True 3 (caché acotada, cada tesela una vez)
+        print([p.name for p in t.find_shortest_path("LEBL", "LEPA").nodes])  # ['BCN.D', 'GODOX', 'KERIP', 'LOTOS', 'PMI.A']
+        print(t.find_shortest_path("GODOX", "MAMES"))  # None
+
+        t.tile_cache.clear()
+        print(sorted(t.points[node].name for node in t.points_in_bbox(40.9, 1.9, 41.6, 2.6)), len(t.tile_cache))
+        # ['BCN.D', 'GODOX', 'KERIP'] 2
+
+    # Alcanzabilidad desde el índice de componentes y consulta local con caché de una tesela
+    with TiledAirSpace(os.path.join(directory, "tiles"), max_tiles=1) as t:
+        reachable = t.reachable_nodes("GODOX")
+        print(len(reachable), t.is_reachable("BCN.D", "PMI.A"), t.is_reachable("GODOX", "MAMES"), t.tiles_loaded)
+        # 5 True False 0
+        print([p.name for p in t.find_shortest_path("BCN.D", "GODOX").nodes], t.tiles_loaded, len(t.tile_cache))
+        # ['BCN.D', 'GODOX'] 1 1 (solo la tesela que comparten)
+        t.find_shortest_path("BCN.D", "LOTOS")
+        print(t.tiles_loaded, len(t.tile_cache))  # 3 1 (KERIP y LOTOS; ninguna recarga con max_tiles=1)
+
+    # Segmento cerrado al construir: las teselas no lo incluyen y la componente se parte
+    a.close_segment(1, 2)
+    build_tiles(a, os.path.join(directory, "closed"), cell_size=0.5)
+    with TiledAirSpace(os.path.join(directory, "closed")) as t:
+        print(t.find_shortest_path("BCN.D", "LOTOS"), a.find_shortest_path("BCN.D", "LOTOS"))  # None None
+        print(t.is_reachable("BCN.D", "LOTOS"), sorted(p.name for p in t.reachable_nodes("BCN.D")))
+        # False ['BCN.D', 'GODOX']
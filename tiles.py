@@ -0,0 +1,320 @@
+import os
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from math import cos, radians
+from adjacency import Adjacency, DEFAULT_METRIC
+from cache import LRUCache
+from components import Components
+from mapped import MappedAirSpace, MappedPoints, NameTable
+from snapshot import Snapshot, source_stats, pack_strings, unpack_strings
+
+INDEX_FILE = "index.snapshot"
+DEFAULT_CELL_SIZE = 2.0  # grados
+DEFAULT_MAX_TILES = 64
+
+
+def tile_path(directory, key):
+    return os.path.join(directory, f"tile_{key[0]}_{key[1]}.snapshot")
+
+
+def tile_key(latitude, longitude, cell_size):
+    return int(latitude // cell_size), int(longitude // cell_size)
+
+
+def build_tiles(airspace, directory, cell_size=DEFAULT_CELL_SIZE):
+    # Reparte un AirSpace cargado en teselas de cell_size grados. Los nodos se renumeran para
+    # que los de cada tesela (y sus aristas de salida) ocupen un rango contiguo de ids; cada
+    # tesela es un snapshot con sus columnas y el índice guarda los rangos, los nombres, las
+    # componentes y los aeropuertos
+    adjacency = airspace.adjacency
+    closed = adjacency.closed if airspace.closed_segments else None
+    labels, one_way = _open_components(airspace, closed)
+    cells = {}
+    for node in range(adjacency.node_count):
+        key = tile_key(adjacency.latitudes[node], adjacency.longitudes[node], cell_size)
+        cells.setdefault(key, []).append(node)
+    keys = sorted(cells)
+    order = [node for key in keys for node in cells[key]]
+    new_id = array('l', [0]) * adjacency.node_count
+    for position, node in enumerate(order):
+        new_id[node] = position
+
+    os.makedirs(directory, exist_ok=True)
+    build = time.time_ns()  # las teselas deben venir de la misma construcción que el índice
+    node_starts, edge_starts = array('l', [0]), array('l', [0])
+    for key in keys:
+        nodes = cells[key]
+        offsets, targets = array('l', [edge_starts[-1]]), array('l')
+        weights = {metric: array('d') for metric in adjacency.metrics}
+        for u in nodes:
+            edges = range(adjacency.offsets[u], adjacency.offsets[u + 1])
+            if closed is not None:
+                edges = [k for k in edges if not closed[k]]
+            targets.extend(new_id[adjacency.targets[k]] for k in edges)
+            for metric, values in adjacency.metrics.items():
+                weights[metric].extend(values[k] for k in edges)
+            offsets.append(edge_starts[-1] + len(targets))
+        arrays = {
+            "numbers": array('l', (airspace.point_list[u].number for u in nodes)),
+            "latitudes": array('d', (adjacency.latitudes[u] for u in nodes)),
+            "longitudes": array('d', (adjacency.longitudes[u] for u in nodes)),
+            "lat_rad": array('d', (adjacency.lat_rad[u] for u in nodes)),
+            "lon_rad": array('d', (adjacency.lon_rad[u] for u in nodes)),
+            "cos_lat": array('d', (adjacency.cos_lat[u] for u in nodes)),
+            "offsets": offsets, "targets": targets,
+        }
+        for metric, values in weights.items():
+            arrays[f"weights:{metric}"] = values
+        Snapshot.capture({"tile": list(key), "build": build}, arrays, None, None).save(tile_path(directory, key))
+        node_starts.append(node_starts[-1] + len(nodes))
+        edge_starts.append(offsets[-1])
+
+    points = [airspace.point_list[node] for node in order]
+    name_offsets, names = pack_strings(p.name for p in points)
+    airports = list(airspace.nav_airports.values())
+    # Componentes en el índice: etiqueta de cada nodo y nodos agrupados por etiqueta, para
+    # responder a la alcanzabilidad sin cargar teselas
+    node_labels = array('l', (labels[node] for node in order))
+    component_order = array('l', sorted(range(len(order)), key=node_labels.__getitem__))
+    component_labels, component_starts = array('l'), array('l')
+    for position, node in enumerate(component_order):
+        if not component_labels or node_labels[node] != component_labels[-1]:
+            component_labels.append(node_labels[node])
+            component_starts.append(position)
+    component_starts.append(len(component_order))
+    procedures = lambda group: [new_id[p.id] for a in airports for p in getattr(a, group) if p.airspace is airspace]
+    arrays = {
+        "node_starts": node_starts, "edge_starts": edge_starts,
+        "name_offsets": name_offsets, "names": names,
+        "name_order": array('l', (new_id[p.id] for p in sorted(airspace.name_index.values(),
+                                                              key=lambda p: p.name.encode('utf-8')))),
+        "labels": node_labels, "component_order": component_order,
+        "component_labels": component_labels, "component_starts": component_starts,
+        "airport_names": pack_strings(a.name for a in airports)[1],
+        "sid_counts": array('l', (sum(p.airspace is airspace for p in a.sids) for a in airports)),
+        "sids": array('l', procedures("sids")),
+        "star_counts": array('l', (sum(p.airspace is airspace for p in a.stars) for a in airports)),
+        "stars": array('l', procedures("stars")),
+    }
+    header = {"build": build, "cell_size": cell_size, "tiles": [list(key) for key in keys],
+              "metrics": list(adjacency.metrics), "heuristic_scales": adjacency.heuristic_scales,
+              "one_way": one_way}
+    sources = source_stats(airspace.source_files) if airspace.source_files else None
+    Snapshot.capture(header, arrays, sources, airspace.fingerprint()).save(os.path.join(directory, INDEX_FILE))
+    return len(keys)
+
+
+def _open_components(airspace, closed):
+    # (etiqueta de cada nodo, aristas sin inversa) del grafo que se guarda. Las aristas cerradas
+    # no se escriben en las teselas: cerrar segmentos puede partir una componente, así que
+    # entonces se recalculan sobre las aristas abiertas
+    if closed is None:
+        return airspace.components.labels(), airspace.components.one_way
+    adjacency = airspace.adjacency
+    components = Components(adjacency.node_count)
+    edges = {(u, adjacency.targets[k]) for u in range(adjacency.node_count)
+             for k in range(adjacency.offsets[u], adjacency.offsets[u + 1]) if not closed[k]}
+    for u, v in edges:
+        components.union(u, v)
+    return components.labels(), sum(1 for u, v in edges if (v, u) not in edges)
+
+
+class TileColumn:
+    # Columna global repartida entre teselas: el índice global se traduce a (tesela, posición
+    # local) y la tesela se carga si no está en la caché. Recuerda el último rango usado, que
+    # es casi siempre el siguiente (aristas de un mismo nodo, vecinos de la misma zona).
+    # extra = 1 para columnas con una entrada final por tesela (offsets)
+    def __init__(self, space, starts, name, extra=0):
+        self.space = space
+        self.starts = starts
+        self.name = name
+        self.extra = extra
+        self._low = self._high = 0
+        self._values = None
+
+    def __len__(self):
+        return self.starts[-1]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if self._low <= index < self._high:
+            return self._values[index - self._low]
+        if not 0 <= index < len(self) + self.extra:
+            raise IndexError(index)
+        tile = min(bisect_right(self.starts, index) - 1, len(self.starts) - 2)
+        self._values = self.space.tile(tile)[self.name]
+        self._low = self.starts[tile]
+        self._high = self.starts[tile + 1] + self.extra
+        return self._values[index - self._low]
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class TiledAirSpace(MappedAirSpace):
+    # Espacio aéreo de solo lectura que carga las teselas al llegar a ellas la búsqueda (o la
+    # vista del GUI), con una caché LRU acotada a max_tiles. Las columnas por tesela se
+    # presentan como columnas globales, así que el grafo y los algoritmos son los mismos que
+    # con todo cargado. Nombres, componentes y aeropuertos están en el índice y no cargan
+    # teselas. Durante una consulta las teselas que toca quedan fijadas (pinned_tiles): la LRU
+    # acota lo que se conserva entre consultas y cada tesela se carga como mucho una vez por
+    # consulta, en lugar de expulsarse y recargarse cuando la búsqueda pasa de max_tiles
+    def __init__(self, directory, metric=DEFAULT_METRIC, max_tiles=DEFAULT_MAX_TILES):
+        self.filename = directory
+        self.directory = directory
+        self.metric = metric
+        self.tile_cache = LRUCache(max_tiles)
+        self.tiles_loaded = 0
+        self._pinned = None
+        self.snapshot = Snapshot.map(os.path.join(directory, INDEX_FILE))
+        header, sections = self.snapshot.header, self.snapshot.arrays
+        if "component_order" not in sections:
+            self.snapshot.close()
+            raise ValueError(f"Tiles in {directory} predate the component index; rebuild them with build_tiles")
+        self.build = header["build"]
+        self.cell_size = header["cell_size"]
+        self.tile_keys = [tuple(key) for key in header["tiles"]]
+        self.tile_by_key = {key: tile for tile, key in enumerate(self.tile_keys)}
+        nodes, edges = sections["node_starts"], sections["edge_starts"]
+
+        column = lambda starts, name, extra=0: TileColumn(self, starts, name, extra)
+        self.adjacency = Adjacency.from_arrays(
+            column(nodes, "latitudes"), column(nodes, "longitudes"),
+            column(nodes, "offsets", 1), column(edges, "targets"),
+            {name: column(edges, f"weights:{name}") for name in header["metrics"]},
+            header["heuristic_scales"],
+            (column(nodes, "lat_rad"), column(nodes, "lon_rad"), column(nodes, "cos_lat")))
+        self.labels = sections["labels"]
+        self.component_order = sections["component_order"]
+        self.component_labels = sections["component_labels"]
+        self.component_starts = sections["component_starts"]
+        self.one_way = header["one_way"]
+        self.names = NameTable(sections["name_offsets"], sections["names"], sections["name_order"])
+        self.points = MappedPoints(column(nodes, "numbers"), self.names,
+                                   column(nodes, "latitudes"), column(nodes, "longitudes"))
+
+        self.airports = {}
+        sids, stars = iter(sections["sids"]), iter(sections["stars"])
+        for name, sid_count, star_count in zip(unpack_strings(sections["airport_names"]),
+                                               sections["sid_counts"], sections["star_counts"]):
+            self.airports[name] = ([next(sids) for _ in range(sid_count)],
+                                   [next(stars) for _ in range(star_count)])
+        self.last_expanded = 0
+
+    def tile(self, tile):
+        pinned = self._pinned
+        if pinned is not None and tile in pinned:
+            return pinned[tile]
+        arrays = self.tile_cache.get(tile)
+        if arrays is None:
+            snapshot = Snapshot.load(tile_path(self.directory, self.tile_keys[tile]))
+            if snapshot.header.get("build") != self.build:
+                raise ValueError(f"Tile {self.tile_keys[tile]} does not belong to the index in {self.directory}")
+            arrays = snapshot.arrays
+            self.tiles_loaded += 1
+            if pinned is None:
+                self.tile_cache.put(tile, arrays)
+        if pinned is not None:
+            pinned[tile] = arrays
+        return arrays
+
+    @contextmanager
+    def pinned_tiles(self):
+        # Reentrante: solo la consulta más externa suelta las teselas fijadas, que pasan entonces
+        # a la LRU (así una carga a mitad de consulta no expulsa otra tesela que aún hará falta)
+        if self._pinned is not None:
+            yield
+            return
+        self._pinned = pinned = {}
+        try:
+            yield
+        finally:
+            self._pinned = None
+            for tile, arrays in pinned.items():
+                self.tile_cache.put(tile, arrays)
+
+    def close(self):
+        self.tile_cache.clear()
+        super().close()
+
+    def _component(self, node):
+        # Rango de la componente en el índice, sin recorrer las teselas
+        position = bisect_left(self.component_labels, self.labels[node])
+        start, end = self.component_starts[position], self.component_starts[position + 1]
+        return array('l', self.component_order[start:end])
+
+    def reachable_nodes(self, start_name):
+        with self.pinned_tiles():
+            return super().reachable_nodes(start_name)
+
+    def is_reachable(self, origin_name, destination_name):
+        with self.pinned_tiles():
+            return super().is_reachable(origin_name, destination_name)
+
+    def find_shortest_path(self, origin_name, destination_name, metric=None):
+        with self.pinned_tiles():
+            return super().find_shortest_path(origin_name, destination_name, metric)
+
+    def find_airport_route(self, origin_airport, destination_airport, metric=None):
+        with self.pinned_tiles():
+            return super().find_airport_route(origin_airport, destination_airport, metric)
+
+    def bounds(self):
+        # (lat mín, lon mín, lat máx, lon máx) de las teselas, sin cargarlas
+        rows = [row for row, _ in self.tile_keys]
+        columns = [column for _, column in self.tile_keys]
+        size = self.cell_size
+        return min(rows) * size, min(columns) * size, (max(rows) + 1) * size, (max(columns) + 1) * size
+
+    def tiles_in_bbox(self, min_lat, min_lon, max_lat, max_lon):
+        if min_lon > max_lon:
+            # Caja que cruza el antimeridiano
+            return (self.tiles_in_bbox(min_lat, min_lon, max_lat, 180.0) +
+                    self.tiles_in_bbox(min_lat, -180.0, max_lat, max_lon))
+        low, high = tile_key(min_lat, min_lon, self.cell_size), tile_key(max_lat, max_lon, self.cell_size)
+        return [tile for (row, column), tile in self.tile_by_key.items()
+                if low[0] <= row <= high[0] and low[1] <= column <= high[1]]
+
+    def points_in_bbox(self, min_lat, min_lon, max_lat, max_lon):
+        # ids de los puntos dentro de la caja; solo se cargan las teselas que la cortan
+        found = array('l')
+        starts = self.snapshot.arrays["node_starts"]
+        with self.pinned_tiles():
+            for tile in sorted(set(self.tiles_in_bbox(min_lat, min_lon, max_lat, max_lon))):
+                arrays = self.tile(tile)
+                for local, (lat, lon) in enumerate(zip(arrays["latitudes"], arrays["longitudes"])):
+                    inside_lon = (min_lon <= lon <= max_lon if min_lon <= max_lon
+                                  else lon >= min_lon or lon <= max_lon)
+                    if min_lat <= lat <= max_lat and inside_lon:
+                        found.append(starts[tile] + local)
+        return found
+
+    def nearest_point(self, latitude, longitude):
+        # Punto más cercano entre la tesela del clic y sus vecinas (el GUI no necesita más)
+        size, adjacency = self.cell_size, self.adjacency
+        scale = cos(radians(latitude)) ** 2
+        with self.pinned_tiles():
+            nodes = self.points_in_bbox(latitude - size, longitude - size, latitude + size, longitude + size)
+            if not nodes:
+                return None
+            return self.points[min(nodes, key=lambda node: (adjacency.latitudes[node] - latitude) ** 2 +
+                                   scale * (adjacency.longitudes[node] - longitude) ** 2)]
+
+    def segment_lines(self, min_lat, min_lon, max_lat, max_lon):
+        # Coordenadas (separadas por NaN, como Adjacency.segment_lines) de los segmentos con
+        # algún extremo dentro de la caja, para dibujar solo la vista actual
+        adjacency = self.adjacency
+        xs, ys = [], []
+        with self.pinned_tiles():
+            nodes = self.points_in_bbox(min_lat, min_lon, max_lat, max_lon)
+            inside = set(nodes)
+            for u in nodes:
+                for k in range(adjacency.offsets[u], adjacency.offsets[u + 1]):
+                    v = adjacency.targets[k]
+                    if v not in inside or u < v or u not in adjacency.neighbors(v):
+                        xs += (adjacency.longitudes[u], adjacency.longitudes[v], float('nan'))
+                        ys += (adjacency.latitudes[u], adjacency.latitudes[v], float('nan'))
+        return xs, ys